@@ -2,11 +2,16 @@
 Sublime commands related to development and debugging.
 """
 
+import pprint
+
 from sublime_plugin import WindowCommand
 
-from ..util import debug, reload
+from ..util import debug, perf, reload
+from ...core import cat_file, git_dir, git_refs, status_snapshot, store
+from ...core.git_command import git_single_flight
+from ...core.runtime import CANCELLATION_STATS, git_scheduler, task_scheduler
 from ...core.settings import GitSavvySettings
-from ...core.view import replace_view_content
+from ...core.view import replace_view_content, VIEW_UPDATE_STATS
 
 
 class GsReloadModulesDebug(WindowCommand):
@@ -54,3 +59,43 @@ class GsViewGitLog(WindowCommand):
         view.set_scratch(True)
         view.settings().set("syntax", "Packages/JavaScript/JSON.sublime-syntax")
         replace_view_content(view, log)
+
+
+class GsPerformanceReport(WindowCommand):
+
+    """
+    Displays git latencies per subcommand and repository, and the
+    counters of our process caches.
+    """
+
+    def run(self):
+        by_subcommand, by_repo = perf.git_latencies()
+        lines = perf.format_table("GIT LATENCY PER SUBCOMMAND", by_subcommand)
+        lines += [""]
+        lines += perf.format_table("GIT LATENCY PER REPOSITORY", by_repo)
+        lines += ["", "COUNTERS", ""]
+        persistent_tier = store.persistent_tier()
+        for name, stats in (
+            ("cat-file servers", cat_file.stats()),
+            ("repo root lookups", git_dir.stats()),
+            ("ref reads", git_refs.stats()),
+            ("memoized repo queries", dict(store.MEMO_STATS)),
+            ("status snapshots", status_snapshot.stats()),
+            ("repo cache", store.cache.stats()),
+            ("persistent cache", (
+                dict(persistent_tier.stats, bytes=persistent_tier.size())
+                if persistent_tier else "disabled"
+            )),
+            ("shared git processes", git_single_flight.stats()),
+            ("cancellation", dict(CANCELLATION_STATS)),
+            ("scheduler", git_scheduler.stats()),
+            ("task queues", task_scheduler.stats()),
+            ("view updates", dict(VIEW_UPDATE_STATS)),
+        ):
+            lines.append("  {}:".format(name))
+            lines += ["    " + line for line in pprint.pformat(stats, width=72).splitlines()]
+
+        view = self.window.new_file()
+        view.set_scratch(True)
+        view.set_name("GitSavvy Performance")
+        replace_view_content(view, "\n".join(lines) + "\n")
@@ -4,6 +4,8 @@ import sublime
 from sublime_plugin import EventListener, WindowCommand
 
 from . import util
+from ..core import git_watcher
+from ..core.runtime import cancel_tokens_of
 from ..core.settings import SettingsMixin
 from ..core.utils import focus_view
 
@@ -37,9 +39,15 @@ class GsInterfaceFocusEventListener(EventListener):
             return
 
         # status bar is handled by GsStatusBarEventListener
-        util.view.refresh_gitsavvy(view, refresh_status_bar=False)
+        util.view.refresh_gitsavvy(view, refresh_status_bar=False, only_if_changed=True)
+
+    def on_post_save(self, view):
+        repo_path = view.settings().get("git_savvy.repo_path")
+        if repo_path and git_watcher.is_watched(repo_path):
+            git_watcher.notify(repo_path, {git_watcher.WORKTREE})
 
     def on_close(self, view):
+        cancel_tokens_of(view.id())
         util.view.handle_closed_view(view)
 
 
@@ -1,4 +1,4 @@
-from collections import OrderedDict
+from functools import lru_cache
 from textwrap import dedent
 import re
 
@@ -12,13 +12,15 @@ from ..core.utils import focus_view
 
 MYPY = False
 if MYPY:
-    from typing import Dict, Optional
+    from typing import Callable, Dict, FrozenSet, List, Mapping, Optional, Tuple
+    Segment = Tuple[Optional[str], str]
 
 
 interfaces = {}  # type: Dict[sublime.ViewId, Interface]
 edit_views = {}
 subclasses = []
 
+TEMPLATE_SLOT = re.compile(r"\{(<+ )?(\w+)\}")
 EDIT_DEFAULT_HELP_TEXT = "## To finalize your edit, press {super_key}+Enter.  To cancel, close the view.\n"
 
 
@@ -134,59 +136,10 @@ class Interface():
         template, add regions to `self.regions` with the key, start, and
         end of each partial.
         """
-        rendered = self.template
-
-        keyed_content = self.get_keyed_content()
-        for key, new_content in keyed_content.items():
-            new_content_len = len(new_content)
-            pattern = re.compile(r"\{(<+ )?" + key + r"\}")
-
-            match = pattern.search(rendered)
-            while match:
-                start, end = match.span()
-                backspace_group = match.groups()[0]
-                backspaces = backspace_group.count("<") if backspace_group else 0
-                start -= backspaces
-
-                rendered = rendered[:start] + new_content + rendered[end:]
-
-                self.adjust(start, end - start, new_content_len)
-                if new_content_len:
-                    self.regions[key] = [start, start + new_content_len]
-
-                match = pattern.search(rendered)
-
-        return rendered
-
-    def adjust(self, idx, orig_len, new_len):
-        """
-        When interpolating template variables, update region ranges for previously-evaluated
-        variables, that are situated later on in the output/template string.
-        """
-        shift = new_len - orig_len
-        for key, region in self.regions.items():
-            if region[0] > idx:
-                region[0] += shift
-                region[1] += shift
-            elif region[1] > idx or region[0] == idx:
-                region[1] += shift
-
-    def get_keyed_content(self):
-        keyed_content = OrderedDict(
-            (key, render_fn())
-            for key, render_fn in self.partials.items()
-        )
-
-        for key in keyed_content:
-            output = keyed_content[key]
-            if isinstance(output, tuple):
-                sub_template, complex_partials = output
-                keyed_content[key] = sub_template
-
-                for render_fn in complex_partials:
-                    keyed_content[render_fn.key] = render_fn()
-
-        return keyed_content
+        chunks = []  # type: List[str]
+        self.regions = {}
+        render_compiled(self.template, self.partials, chunks, self.regions, 0)
+        return "".join(chunks)
 
     def update(self, key, content):
         self.view.run_command("gs_update_region", {
@@ -225,6 +178,64 @@ class Interface():
         pass
 
 
+@lru_cache(maxsize=64)
+def compile_template(template, keys):
+    # type: (str, FrozenSet[str]) -> Tuple[Segment, ...]
+    """
+    Split `template` into its static text and the slots for the partials
+    in `keys`, e.g. `((None, "BRANCH: "), ("branch_status", ""), ...)`.
+    Placeholders for other keys stay literal text.  A `{<< key}` deletes
+    the two characters before it, we strip them from the static text
+    here once instead of from the output on every render.
+    """
+    segments = []  # type: List[Segment]
+    pos = 0
+    for match in TEMPLATE_SLOT.finditer(template):
+        key = match.group(2)
+        if key not in keys:
+            continue
+        static = template[pos:match.start()]
+        backspaces = match.group(1).count("<") if match.group(1) else 0
+        segments.append((None, static[:len(static) - backspaces]))
+        segments.append((key, ""))
+        pos = match.end()
+    segments.append((None, template[pos:]))
+    return tuple(segments)
+
+
+def render_compiled(template, partials, chunks, regions, offset):
+    # type: (str, Mapping[str, Callable], List[str], Dict[str, List[int]], int) -> int
+    """
+    Render `template` by appending to `chunks` and record the `[start, end]`
+    of each non-empty partial in `regions`.  A partial can return a tuple
+    `(sub_template, complex_partials)` which we render in place.  Return
+    the offset after the rendered text.
+    """
+    for key, text in compile_template(template, frozenset(partials)):
+        if key is None:
+            chunks.append(text)
+            offset += len(text)
+            continue
+
+        start = offset
+        output = partials[key]()
+        if isinstance(output, tuple):
+            sub_template, complex_partials = output
+            offset = render_compiled(
+                sub_template,
+                {render_fn.key: render_fn for render_fn in complex_partials},
+                chunks,
+                regions,
+                offset
+            )
+        else:
+            chunks.append(output)
+            offset += len(output)
+        if offset > start:
+            regions[key] = [start, offset]
+    return offset
+
+
 def partial(key):
     def decorator(fn):
         fn.key = key
@@ -235,31 +246,35 @@ def partial(key):
 class GsNewContentAndRegionsCommand(TextCommand):
 
     def run(self, edit, content, regions, nuke_cursors=False):
-        selections = self.view.sel()
+        draw_content_and_regions(self.view, edit, content, regions, nuke_cursors)
 
-        if selections and not nuke_cursors:
-            cursors_row_col = [self.view.rowcol(cursor.a) for cursor in selections]
-        else:
-            cursors_row_col = [(0, 0)]
 
-        selections.clear()
+def draw_content_and_regions(view, edit, content, regions, nuke_cursors=False):
+    selections = view.sel()
 
-        is_read_only = self.view.is_read_only()
-        self.view.set_read_only(False)
-        self.view.replace(edit, sublime.Region(0, self.view.size()), content)
-        self.view.set_read_only(is_read_only)
+    if selections and not nuke_cursors:
+        cursors_row_col = [view.rowcol(cursor.a) for cursor in selections]
+    else:
+        cursors_row_col = [(0, 0)]
+
+    selections.clear()
+
+    is_read_only = view.is_read_only()
+    view.set_read_only(False)
+    view.replace(edit, sublime.Region(0, view.size()), content)
+    view.set_read_only(is_read_only)
 
-        for row, col in cursors_row_col:
-            pt = self.view.text_point(row, col)
-            selections.add(sublime.Region(pt, pt))
+    for row, col in cursors_row_col:
+        pt = view.text_point(row, col)
+        selections.add(sublime.Region(pt, pt))
 
-        for key, region_range in regions.items():
-            a, b = region_range
-            self.view.add_regions("git_savvy_interface." + key, [sublime.Region(a, b)])
+    for key, region_range in regions.items():
+        a, b = region_range
+        view.add_regions("git_savvy_interface." + key, [sublime.Region(a, b)])
 
-        if self.view.settings().get("git_savvy.interface"):
-            self.view.run_command("gs_handle_vintageous")
-            self.view.run_command("gs_handle_arrow_keys")
+    if view.settings().get("git_savvy.interface"):
+        view.run_command("gs_handle_vintageous")
+        view.run_command("gs_handle_arrow_keys")
 
 
 class GsUpdateRegionCommand(TextCommand):
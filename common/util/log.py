@@ -1,8 +1,17 @@
 import re
+import threading
+import time
+
 import sublime
 
 
+MYPY = False
+if MYPY:
+    from typing import Callable, List, Optional
+
+
 ANSI_ESCAPE_RE = re.compile(r'\x1B\[[0-?]*[ -/]*[@-~]')
+FRAME_INTERVAL = 16  # [ms]
 
 
 def normalize(string):
@@ -29,3 +38,46 @@ def panel_append(message, run_async=True):
         )
     else:
         view.run_command("gs_append_panel", {"msg": message})
+
+
+class PanelAppender:
+    """
+    Collect output for the panel and append it in batches, at most once
+    per `interval` milliseconds, instead of running one text command per
+    line.  Call `flush` when done to write out what is still pending.
+    """
+
+    def __init__(self, interval=FRAME_INTERVAL, sink=None):
+        # type: (int, Optional[Callable[[str], None]]) -> None
+        self.interval = interval
+        self.sink = sink or (lambda message: panel_append(message, run_async=False))
+        self.flushes = 0
+        self._pending = []  # type: List[str]
+        self._scheduled = False
+        self._last_flush = 0.0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+
+    def append(self, message):
+        # type: (str) -> None
+        with self._lock:
+            self._pending.append(message)
+            if self._scheduled:
+                return
+            self._scheduled = True
+            elapsed = (time.monotonic() - self._last_flush) * 1000
+        sublime.set_timeout_async(self.flush, int(max(0, self.interval - elapsed)))
+
+    def flush(self):
+        # type: () -> None
+        # Serialize flushes so that batches are written in order.
+        with self._flush_lock:
+            with self._lock:
+                self._scheduled = False
+                if not self._pending:
+                    return
+                message = "".join(self._pending)
+                self._pending = []
+                self._last_flush = time.monotonic()
+            self.flushes += 1
+            self.sink(message)
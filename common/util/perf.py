@@ -0,0 +1,133 @@
+"""
+Always-on latency aggregation for git processes.
+
+Every git call is recorded into fixed-size, log-scaled histograms, one
+per subcommand and one per repository, so the cost of recording does not
+depend on how long the editor runs.  Percentiles are estimated from the
+bucket bounds.
+"""
+
+import threading
+
+
+MYPY = False
+if MYPY:
+    from typing import Dict, List, Optional, Tuple
+
+
+# 0.5ms, 1ms, 2ms, ... ~65s; everything slower goes into the last bucket.
+BUCKET_BOUNDS = tuple(0.0005 * 2 ** n for n in range(18))
+
+
+class LatencyHistogram:
+    __slots__ = ("buckets", "count", "total", "max", "bytes_out")
+
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.bytes_out = 0
+
+    def add(self, seconds, bytes_out=0):
+        # type: (float, int) -> None
+        for index, bound in enumerate(BUCKET_BOUNDS):
+            if seconds <= bound:
+                break
+        else:
+            index = len(BUCKET_BOUNDS)
+        self.buckets[index] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.bytes_out += bytes_out
+
+    def percentile(self, p):
+        # type: (float) -> float
+        """
+        Return the upper bound of the bucket holding the `p`th percentile,
+        but never more than the maximum we have actually seen.
+        """
+        if not self.count:
+            return 0.0
+        rank = p / 100 * self.count
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if seen >= rank and count:
+                break
+        bound = BUCKET_BOUNDS[index] if index < len(BUCKET_BOUNDS) else self.max
+        return min(bound, self.max)
+
+    def summary(self):
+        # type: () -> Dict[str, float]
+        return {
+            "count": self.count,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "max": self.max,
+            "total": self.total,
+            "bytes_out": self.bytes_out,
+        }
+
+
+_lock = threading.Lock()
+_by_subcommand = {}  # type: Dict[str, LatencyHistogram]
+_by_repo = {}  # type: Dict[str, LatencyHistogram]
+
+
+def record_git(subcommand, repo_path, seconds, bytes_out=0):
+    # type: (Optional[str], Optional[str], float, int) -> None
+    with _lock:
+        for table, key in ((_by_subcommand, subcommand), (_by_repo, repo_path)):
+            try:
+                histogram = table[key or "?"]
+            except KeyError:
+                histogram = table[key or "?"] = LatencyHistogram()
+            histogram.add(seconds, bytes_out)
+
+
+def git_latencies():
+    # type: () -> Tuple[Dict[str, Dict[str, float]], Dict[str, Dict[str, float]]]
+    """
+    Return the summaries `(by_subcommand, by_repo)`.
+    """
+    with _lock:
+        return (
+            {key: h.summary() for key, h in _by_subcommand.items()},
+            {key: h.summary() for key, h in _by_repo.items()},
+        )
+
+
+def reset():
+    # type: () -> None
+    with _lock:
+        _by_subcommand.clear()
+        _by_repo.clear()
+
+
+def format_table(title, rows):
+    # type: (str, Dict[str, Dict[str, float]]) -> List[str]
+    lines = [
+        title,
+        "",
+        "  {:<40} {:>7} {:>9} {:>9} {:>9} {:>10} {:>10}".format(
+            "", "count", "p50", "p95", "max", "total", "bytes out"),
+    ]
+    for key, s in sorted(rows.items(), key=lambda item: -item[1]["total"]):
+        lines.append(
+            "  {:<40} {:>7} {:>7.1f}ms {:>7.1f}ms {:>7.1f}ms {:>9.2f}s {:>10}".format(
+                key[-40:], s["count"], s["p50"] * 1000, s["p95"] * 1000,
+                s["max"] * 1000, s["total"], format_bytes(int(s["bytes_out"]))
+            )
+        )
+    return lines
+
+
+def format_bytes(size):
+    # type: (int) -> str
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return "{}{}".format(size, unit)
+        size //= 1024
+    return "{}GB".format(size)
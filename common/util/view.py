@@ -1,12 +1,24 @@
 import bisect
 
 import sublime
+from ...core import git_watcher
+from ...core.git_watcher import ALL_CHANGES, HEAD, INDEX, REFS, WORKTREE
 from ...core.settings import GitSavvySettings
 
 
 MYPY = False
 if MYPY:
-    from typing import Optional
+    from typing import AbstractSet, Optional
+
+
+# The parts of the repository state each kind of view renders.
+INTERFACE_INPUTS = {
+    "status": ALL_CHANGES,
+    "rebase": frozenset((INDEX, HEAD, REFS)),
+    "branch": frozenset((HEAD, REFS)),
+    "tags": frozenset((REFS,)),
+}
+LOG_GRAPH_INPUTS = frozenset((HEAD, REFS))
 
 
 ##############
@@ -68,14 +80,19 @@ def refresh_gitsavvy_interfaces(
     window,
     refresh_sidebar=False,
     refresh_status_bar=True,
-    interface_reset_cursor=False
+    interface_reset_cursor=False,
+    repo_path=None,
+    changes=None
 ):
-    # type: (Optional[sublime.Window], bool, bool, bool) -> None
+    # type: (Optional[sublime.Window], bool, bool, bool, Optional[str], Optional[AbstractSet[str]]) -> None
     """
     Looks for GitSavvy interface views in the current window and refresh them.
 
     Note that it only refresh visible views.
     Other views will be refreshed when activated.
+
+    If `changes` are given, only refresh the views of `repo_path` which
+    render any of them.
     """
     if window is None:
         return
@@ -84,37 +101,47 @@ def refresh_gitsavvy_interfaces(
         window.run_command("refresh_folder_list")
     if refresh_status_bar:
         av = window.active_view()
-        if av:
+        if av and (changes is None or av.settings().get("git_savvy.repo_path") == repo_path):
             av.run_command("gs_update_status_bar")
 
     for group in range(window.num_groups()):
         view = window.active_view_in_group(group)
-        if view.settings().get("git_savvy.interface") is not None:
-            view.run_command("gs_interface_refresh", {"nuke_cursors": interface_reset_cursor})
-
-        if view.settings().get("git_savvy.log_graph_view", False):
-            view.run_command("gs_log_graph_refresh")
+        if not view:
+            continue
+        inputs = view_inputs(view)
+        if inputs is None:
+            continue
+        if changes is not None and (
+            view.settings().get("git_savvy.repo_path") != repo_path
+            or not inputs & changes
+        ):
+            continue
+        _refresh_view(view, inputs, interface_reset_cursor)
 
 
 def refresh_gitsavvy(
     view,
     refresh_sidebar=False,
     refresh_status_bar=True,
-    interface_reset_cursor=False
+    interface_reset_cursor=False,
+    only_if_changed=False
 ):
-    # type: (Optional[sublime.View], bool, bool, bool) -> None
+    # type: (Optional[sublime.View], bool, bool, bool, bool) -> None
     """
     Called after GitSavvy action was taken that may have effected the
     state of the Git repo.
+
+    With `only_if_changed`, skip views the repository watcher knows are
+    still up-to-date.
     """
     if view is None:
         return
 
-    if view.settings().get("git_savvy.interface") is not None:
-        view.run_command("gs_interface_refresh", {"nuke_cursors": interface_reset_cursor})
-
-    if view.settings().get("git_savvy.log_graph_view", False):
-        view.run_command("gs_log_graph_refresh")
+    inputs = view_inputs(view)
+    if inputs is not None:
+        up_to_date = _watch_and_check_up_to_date(view, inputs)
+        if not (only_if_changed and up_to_date):
+            _refresh_view(view, inputs, interface_reset_cursor)
 
     if view.window() and refresh_status_bar:
         view.run_command("gs_update_status_bar")
@@ -124,6 +151,69 @@ def refresh_gitsavvy(
         window.run_command("refresh_folder_list")
 
 
+def view_inputs(view):
+    # type: (sublime.View) -> Optional[AbstractSet[str]]
+    """
+    Return the kinds of repository changes `view` depends on, or `None`
+    if it is not a view we can refresh.
+    """
+    settings = view.settings()
+    interface_type = settings.get("git_savvy.interface")
+    if interface_type is not None:
+        return INTERFACE_INPUTS.get(interface_type, ALL_CHANGES)
+    if settings.get("git_savvy.log_graph_view", False):
+        return LOG_GRAPH_INPUTS
+    return None
+
+
+def _watch_and_check_up_to_date(view, inputs):
+    # type: (sublime.View, AbstractSet[str]) -> bool
+    """
+    Start watching the repository of `view`, and tell if it did not change
+    since the view has been rendered.
+    """
+    settings = view.settings()
+    repo_path = settings.get("git_savvy.repo_path")
+    if not repo_path or not GitSavvySettings(view.window() or sublime.active_window()).get("watch_repositories", True):
+        return False
+    if not git_watcher.watch(repo_path):
+        return False
+    # The working tree is not watched.
+    if WORKTREE in inputs:
+        return False
+    return settings.get("git_savvy.seen_generation") == git_watcher.generation(repo_path, inputs)
+
+
+def _refresh_view(view, inputs, interface_reset_cursor=False):
+    # type: (sublime.View, AbstractSet[str], bool) -> None
+    settings = view.settings()
+    repo_path = settings.get("git_savvy.repo_path")
+    if repo_path:
+        settings.set("git_savvy.seen_generation", git_watcher.generation(repo_path, inputs))
+
+    if settings.get("git_savvy.interface") is not None:
+        view.run_command("gs_interface_refresh", {"nuke_cursors": interface_reset_cursor})
+    elif settings.get("git_savvy.log_graph_view", False):
+        view.run_command("gs_log_graph_refresh")
+
+
+def on_repo_changed(repo_path, changes):
+    # type: (str, AbstractSet[str]) -> None
+    """
+    Listener for the repository watcher; called from its thread.
+    """
+    def refresh():
+        for window in sublime.windows():
+            refresh_gitsavvy_interfaces(
+                window,
+                # Saving a file already updates the status bar.
+                refresh_status_bar=bool(changes - {WORKTREE}),
+                repo_path=repo_path,
+                changes=changes
+            )
+    sublime.set_timeout(refresh)
+
+
 def handle_closed_view(view):
     # type: (sublime.View) -> None
     if view.settings().get("git_savvy.interface") is not None:
@@ -0,0 +1,275 @@
+"""
+Long-lived `git cat-file --batch` processes.
+
+Reading a blob, tree or commit through `git show` or `git ls-tree` costs
+a process spawn per read.  Instead we keep one `--batch` (contents) and
+one `--batch-check` (object info) process per repository around, feed
+them object names on stdin and read the answers back.  Requests from
+multiple threads are serialized on a lock per process.  Crashed
+processes are restarted on the next request, and idle ones shut down
+after `IDLE_TIMEOUT` seconds.
+"""
+
+import os
+import subprocess
+import threading
+import time
+
+
+__all__ = (
+    "get_server",
+    "shutdown_all",
+    "stats",
+)
+
+
+MYPY = False
+if MYPY:
+    from typing import Dict, Mapping, Optional, Tuple
+    ObjectInfo = Tuple[str, str, int]  # (object_hash, object_type, size)
+    ObjectContents = Tuple[str, bytes]  # (object_type, contents)
+    ServerKey = Tuple[str, str]
+
+
+IDLE_TIMEOUT = 60.0  # [s]
+STATS = {
+    "requests": 0,
+    "spawns": 0,
+    "restarts": 0,
+    "idle_shutdowns": 0,
+}  # type: Dict[str, int]
+stats_lock = threading.Lock()
+
+
+def _count(key):
+    # type: (str) -> None
+    with stats_lock:
+        STATS[key] += 1
+
+
+def stats():
+    # type: () -> Dict[str, int]
+    with stats_lock:
+        return dict(STATS, servers=len(_servers))
+
+
+class BatchProcess:
+    """
+    Wrap a `git cat-file --batch` or `--batch-check` process.
+    """
+
+    def __init__(self, git_binary, repo_path, with_contents, env=None):
+        # type: (str, str, bool, Optional[Mapping[str, str]]) -> None
+        self.argv = [
+            git_binary,
+            "cat-file",
+            "--batch" if with_contents else "--batch-check"
+        ]
+        self.repo_path = repo_path
+        self.with_contents = with_contents
+        self.env = env
+        self.proc = None  # type: Optional[subprocess.Popen]
+        self.lock = threading.Lock()
+
+    def start(self):
+        # type: () -> subprocess.Popen
+        startupinfo = None
+        if os.name == "nt":
+            startupinfo = subprocess.STARTUPINFO()
+            startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+
+        self.proc = proc = subprocess.Popen(
+            self.argv,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            cwd=self.repo_path,
+            env=self.env,
+            startupinfo=startupinfo
+        )
+        _count("spawns")
+        return proc
+
+    def stop(self):
+        # type: () -> None
+        with self.lock:
+            self._stop()
+
+    def _stop(self):
+        # type: () -> None
+        proc, self.proc = self.proc, None
+        if proc is None:
+            return
+        try:
+            proc.stdin.close()  # type: ignore[union-attr]
+        except OSError:
+            pass
+        try:
+            proc.wait(1)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+        if proc.stdout:
+            proc.stdout.close()
+
+    def is_running(self):
+        # type: () -> bool
+        return self.proc is not None and self.proc.poll() is None
+
+    def request(self, object_name):
+        # type: (str) -> Optional[Tuple[bytes, Optional[bytes]]]
+        """
+        Ask for `object_name` and return `(header, contents)`, or `None`
+        if git reports the object as missing or ambiguous.  `contents`
+        is always `None` for `--batch-check` processes.
+
+        Raises `OSError` if the process died twice in a row.
+        """
+        with self.lock:
+            _count("requests")
+            for attempt in (1, 2):
+                proc = self.proc if self.is_running() else None
+                if proc is None:
+                    if self.proc is not None:
+                        _count("restarts")
+                        self._stop()
+                    proc = self.start()
+                try:
+                    return self._request(proc, object_name)
+                except (OSError, ValueError):
+                    self._stop()
+                    if attempt == 2:
+                        raise OSError("`{}` died unexpectedly".format(" ".join(self.argv[1:])))
+            raise AssertionError("unreachable")
+
+    def _request(self, proc, object_name):
+        # type: (subprocess.Popen, str) -> Optional[Tuple[bytes, Optional[bytes]]]
+        stdin, stdout = proc.stdin, proc.stdout
+        assert stdin and stdout
+        stdin.write(object_name.encode("utf-8") + b"\n")
+        stdin.flush()
+
+        header = stdout.readline()
+        if not header.endswith(b"\n"):
+            raise ValueError("Unexpected EOF")
+        header = header.rstrip(b"\n")
+        if header.endswith((b" missing", b" ambiguous")):
+            return None
+
+        if not self.with_contents:
+            return header, None
+
+        size = int(header.rsplit(b" ", 1)[1])
+        contents = stdout.read(size)
+        if len(contents) != size or stdout.read(1) != b"\n":
+            raise ValueError("Unexpected EOF")
+        return header, contents
+
+
+class ObjectServer:
+    """
+    Answer object reads for one repository.
+    """
+
+    def __init__(self, git_binary, repo_path, env=None):
+        # type: (str, str, Optional[Mapping[str, str]]) -> None
+        self.contents = BatchProcess(git_binary, repo_path, True, env)
+        self.info = BatchProcess(git_binary, repo_path, False, env)
+        self.last_used = time.monotonic()
+        self._reaper = None  # type: Optional[threading.Timer]
+        self._reaper_lock = threading.Lock()
+
+    def read_object(self, object_name):
+        # type: (str) -> Optional[ObjectContents]
+        """
+        Return `(object_type, contents)` for `object_name`, e.g. "HEAD:README.md",
+        or `None` if it does not exist.
+        """
+        if "\n" in object_name:
+            return None
+        self._touch()
+        rv = self.contents.request(object_name)
+        if rv is None:
+            return None
+        header, contents = rv
+        _, object_type, _ = header.decode("utf-8").rsplit(" ", 2)
+        return object_type, contents or b""
+
+    def object_info(self, object_name):
+        # type: (str) -> Optional[ObjectInfo]
+        """
+        Return `(object_hash, object_type, size)` for `object_name`,
+        or `None` if it does not exist.
+        """
+        if "\n" in object_name:
+            return None
+        self._touch()
+        rv = self.info.request(object_name)
+        if rv is None:
+            return None
+        object_hash, object_type, size = rv[0].decode("utf-8").rsplit(" ", 2)
+        return object_hash, object_type, int(size)
+
+    def shutdown(self):
+        # type: () -> None
+        with self._reaper_lock:
+            if self._reaper:
+                self._reaper.cancel()
+                self._reaper = None
+        self.contents.stop()
+        self.info.stop()
+
+    def _touch(self):
+        # type: () -> None
+        self.last_used = time.monotonic()
+        with self._reaper_lock:
+            if self._reaper is None:
+                self._schedule_reaper(IDLE_TIMEOUT)
+
+    def _schedule_reaper(self, timeout):
+        # type: (float) -> None
+        self._reaper = threading.Timer(timeout, self._reap)
+        self._reaper.daemon = True
+        self._reaper.start()
+
+    def _reap(self):
+        # type: () -> None
+        idle_for = time.monotonic() - self.last_used
+        with self._reaper_lock:
+            if idle_for < IDLE_TIMEOUT:
+                self._schedule_reaper(IDLE_TIMEOUT - idle_for)
+                return
+            self._reaper = None
+
+        if self.contents.is_running() or self.info.is_running():
+            _count("idle_shutdowns")
+        self.contents.stop()
+        self.info.stop()
+
+
+_servers = {}  # type: Dict[ServerKey, ObjectServer]
+_servers_lock = threading.Lock()
+
+
+def get_server(git_binary, repo_path, env=None):
+    # type: (str, str, Optional[Mapping[str, str]]) -> ObjectServer
+    """
+    Return the `ObjectServer` for `repo_path`, creating it on demand.
+    The processes itself are only spawned on the first request.
+    """
+    key = (git_binary, repo_path)
+    with _servers_lock:
+        try:
+            return _servers[key]
+        except KeyError:
+            server = _servers[key] = ObjectServer(git_binary, repo_path, env)
+            return server
+
+
+def shutdown_all():
+    # type: () -> None
+    with _servers_lock:
+        servers = list(_servers.values())
+        _servers.clear()
+    for server in servers:
+        server.shutdown()
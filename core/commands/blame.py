@@ -6,13 +6,21 @@ import sublime
 from sublime_plugin import TextCommand
 
 from .navigate import GsNavigate
+from .. import store
 from ..git_command import GitCommand
+from ..runtime import drop_if_cancelled, enqueue_on_ui, enqueue_on_worker, supersede
 from ..view import Position
 from ...common import util
 from .log import LogMixin
 from ..ui_mixins.quick_panel import PanelActionMixin
 
 
+MYPY = False
+if MYPY:
+    from typing import Iterable
+    from ..runtime import CancellationToken
+
+
 BlamedLine = namedtuple("BlamedLine", ("contents", "commit_hash", "orig_lineno", "final_lineno"))
 
 NOT_COMMITED_HASH = "0000000000000000000000000000000000000000"
@@ -96,8 +104,8 @@ class GsBlameCommand(BlameMixin, TextCommand, GitCommand):
         view.set_scratch(True)
         view.set_read_only(True)
 
+        # Also handles vintageous once the blame is drawn.
         view.run_command("gs_blame_refresh")
-        view.run_command("gs_handle_vintageous")
 
 
 class GsBlameCurrentFileCommand(LogMixin, TextCommand, GitCommand):
@@ -160,12 +168,32 @@ class GsBlameRefreshCommand(BlameMixin, TextCommand, GitCommand):
         if not within_what:
             within_what = self.savvy_settings.get("blame_detect_move_or_copy_within")
 
-        content = self.get_content(
+        # Take the token right away so that a still running blame is
+        # cancelled now, not when the worker gets to this one.
+        enqueue_on_worker(
+            self.run_async,
+            supersede(self.view.id(), "blame"),
             ignore_whitespace=settings.get("git_savvy.ignore_whitespace", False),
             detect_options=self._detect_move_or_copy_dict[within_what],
             commit_hash=commit_hash
         )
 
+    @drop_if_cancelled
+    def run_async(self, token, **kwargs):
+        # type: (CancellationToken, object) -> None
+        # A newer refresh or closing the view cancels this one.
+        token.raise_if_cancelled()
+        with token:
+            content = self.get_content(**kwargs)
+        token.raise_if_cancelled()
+        enqueue_on_ui(self.draw, content)
+
+    def draw(self, content):
+        # type: (str) -> None
+        if not self.view.is_valid():
+            return
+
+        settings = self.view.settings()
         # only if the content changes
         if content == self.view.substr(sublime.Region(0, self.view.size())):
             return
@@ -199,6 +227,9 @@ class GsBlameRefreshCommand(BlameMixin, TextCommand, GitCommand):
                     lambda: self.view.set_viewport_position(
                         (0, cursor_layout[1] - yoffset), animate=False), 100)
 
+        if was_empty:
+            self.view.run_command("gs_handle_vintageous")
+
     def get_content(self, ignore_whitespace=False, detect_options=None, commit_hash=None):
         if commit_hash:
             # git blame does not follow file name changes like git log, therefor we
@@ -210,12 +241,24 @@ class GsBlameRefreshCommand(BlameMixin, TextCommand, GitCommand):
         else:
             filename_at_commit = self.file_path
 
-        blame_porcelain = self.git(
+        blame_args = (
             "blame", "-p", '-w' if ignore_whitespace else None, detect_options,
             commit_hash, "--", filename_at_commit
         )
-        blame_porcelain = unicodedata.normalize('NFC', blame_porcelain)
-        blamed_lines, commits = self.parse_blame(blame_porcelain.split('\n'))
+        if commit_hash:
+            # The blame of a fixed commit only changes with the mailmap or
+            # `blame.ignoreRevsFile`, so keep it for this session only.
+            blame_porcelain = store.get_immutable(
+                self.repo_path,
+                blame_args,
+                lambda: list(self.git_streaming(*blame_args)),
+                persist=False
+            )  # type: Iterable[str]
+        else:
+            blame_porcelain = self.git_streaming(*blame_args)
+        blamed_lines, commits = self.parse_blame(
+            unicodedata.normalize('NFC', line) for line in blame_porcelain
+        )
 
         commit_infos = {
             commit_hash: self.short_commit_info(commit)
@@ -251,15 +294,14 @@ class GsBlameRefreshCommand(BlameMixin, TextCommand, GitCommand):
         return spacer.join(partitions_with_commits_iter)
 
     def parse_blame(self, blame_porcelain):
-        if blame_porcelain[-1] == '':
-            blame_porcelain = blame_porcelain[:-1]
-
         lines_iter = iter(blame_porcelain)
 
         blamed_lines = []
         commits = defaultdict(lambda: defaultdict(str))
 
         for line in lines_iter:
+            if not line:
+                continue
             commit_hash, orig_lineno, final_lineno, _ = \
                 re.match(r"([0-9a-f]{40}) (\d+) (\d+)( \d+)?", line).groups()
             commits[commit_hash]["short_hash"] = commit_hash[:COMMIT_HASH_LENGTH]
@@ -1,9 +1,8 @@
 import sublime
-import threading
 from sublime_plugin import WindowCommand
 
 from ..git_command import GitCommand
-from ..runtime import enqueue_on_worker
+from ..runtime import enqueue_on_worker, run_on_new_thread
 from ..ui_mixins.input_panel import show_single_line_input_panel
 from ..view import replace_view_content
 from ...common import util
@@ -75,6 +74,6 @@ class gs_custom(WindowCommand, GitCommand):
             util.view.refresh_gitsavvy_interfaces(self.window)
 
         if run_in_thread:
-            threading.Thread(target=program, daemon=True).start()
+            run_on_new_thread(program)
         else:
             enqueue_on_worker(program)
@@ -15,7 +15,7 @@ from .navigate import GsNavigate
 from ..fns import filter_, flatten
 from ..parse_diff import SplittedDiff
 from ..git_command import GitCommand, GitSavvyError
-from ..runtime import enqueue_on_ui, enqueue_on_worker
+from ..runtime import drop_if_cancelled, enqueue_on_ui, enqueue_on_worker, supersede
 from ..utils import flash, focus_view, line_indentation
 from ..view import replace_view_content, Position
 from ...common import util
@@ -177,6 +177,7 @@ class gs_diff_refresh(TextCommand, GitCommand):
         else:
             enqueue_on_worker(self.run_impl, sync)
 
+    @drop_if_cancelled
     def run_impl(self, runs_on_ui_thread):
         if self.view.settings().get("git_savvy.disable_diff"):
             return
@@ -224,17 +225,18 @@ class gs_diff_refresh(TextCommand, GitCommand):
             prelude += "  IGNORING WHITESPACE\n"
 
         try:
-            diff = self.git(
-                "diff",
-                "--ignore-all-space" if ignore_whitespace else None,
-                "--unified={}".format(context_lines) if context_lines is not None else None,
-                "--stat" if show_diffstat else None,
-                "--patch",
-                "--no-color",
-                "--cached" if in_cached_mode else None,
-                base_commit,
-                target_commit,
-                "--", file_path)
+            with supersede(self.view.id(), "diff"):
+                diff = self.git(
+                    "diff",
+                    "--ignore-all-space" if ignore_whitespace else None,
+                    "--unified={}".format(context_lines) if context_lines is not None else None,
+                    "--stat" if show_diffstat else None,
+                    "--patch",
+                    "--no-color",
+                    "--cached" if in_cached_mode else None,
+                    base_commit,
+                    target_commit,
+                    "--", file_path)
         except GitSavvyError as err:
             # When the output of the above Git command fails to correctly parse,
             # the expected notification will be displayed to the user.  However,
@@ -10,7 +10,7 @@ from . import diff
 from .navigate import GsNavigate
 from ..git_command import GitCommand
 from ..parse_diff import SplittedDiff, UnsupportedCombinedDiff
-from ..runtime import enqueue_on_ui, enqueue_on_worker
+from ..runtime import drop_if_cancelled, enqueue_on_ui, enqueue_on_worker, supersede
 from ..utils import flash, focus_view
 from ..view import capture_cur_position, replace_view_content, row_offset, Position
 from ...common import util
@@ -337,6 +337,7 @@ class gs_inline_diff_refresh(TextCommand, GitCommand):
         else:
             sublime.set_timeout_async(lambda: self._run(sync, match_position, raw_diff))
 
+    @drop_if_cancelled
     def _run(self, runs_on_ui_thread, match_position, raw_diff):
         # type: (bool, Optional[Position], Optional[str]) -> None
         file_path = self.file_path
@@ -349,18 +350,19 @@ class gs_inline_diff_refresh(TextCommand, GitCommand):
             target_commit = "{}^".format(target_commit)
 
         if raw_diff is None:
-            raw_diff_output = self.git(
-                "diff",
-                "--no-color",
-                "-U0",
-                "--ignore-space-at-eol" if ignore_eol_ws else None,
-                "--cached" if in_cached_mode else None,
-                base_commit,
-                target_commit,
-                "--",
-                file_path,
-                decode=False
-            )
+            with supersede(self.view.id(), "inline_diff"):
+                raw_diff_output = self.git(
+                    "diff",
+                    "--no-color",
+                    "-U0",
+                    "--ignore-space-at-eol" if ignore_eol_ws else None,
+                    "--cached" if in_cached_mode else None,
+                    base_commit,
+                    target_commit,
+                    "--",
+                    file_path,
+                    decode=False
+                )
             encodings = self.get_encoding_candidates()
             raw_diff, encoding = self.try_decode(raw_diff_output, encodings)
             settings.set("git_savvy.inline_diff.encoding", encoding)
@@ -8,7 +8,8 @@ import sublime
 from ..fns import accumulate, filter_, flatten
 from ..parse_diff import Hunk, SplittedDiff, Region
 from ..utils import eat_but_log_errors, line_indentation
-from ..runtime import cooperative_thread_hopper, AWAIT_WORKER
+from ..view import queue_view_update
+from ..runtime import cooperative_thread_hopper, enqueue_on_worker, latest_only, AWAIT_WORKER
 
 
 MYPY = False
@@ -63,9 +64,8 @@ def block_time_passed_factory(block_time):
     return block_time_passed
 
 
-@cooperative_thread_hopper
 def compute_intra_line_diffs(view, diff):
-    # type: (sublime.View, SplittedDiff) -> HopperR
+    # type: (sublime.View, SplittedDiff) -> None
     viewport = view.visible_region()
     view_has_changed = view_has_changed_factory(view)
 
@@ -80,8 +80,8 @@ def compute_intra_line_diffs(view, diff):
         )
         container.append(chunk)
 
-    from_regions = []
-    to_regions = []
+    from_regions = []  # type: List[Region]
+    to_regions = []  # type: List[Region]
 
     for chunk in in_viewport:
         new_from_regions, new_to_regions = intra_line_diff_for_chunk(chunk)
@@ -90,7 +90,20 @@ def compute_intra_line_diffs(view, diff):
 
     _draw_intra_diff_regions(view, to_regions, from_regions)
 
-    yield AWAIT_WORKER
+    # Only the latest annotation of a view continues with the chunks
+    # outside of the viewport.
+    enqueue_on_worker(latest_only(
+        ("intra_line_colorizer", view.id()),
+        _compute_outside_of_viewport,
+        view, view_has_changed, above_viewport, below_viewport, from_regions, to_regions
+    ))
+
+
+@cooperative_thread_hopper
+def _compute_outside_of_viewport(
+    view, view_has_changed, above_viewport, below_viewport, from_regions, to_regions
+):
+    # type: (sublime.View, Callable[[], bool], List[Chunk], List[Chunk], List[Region], List[Region]) -> HopperR
     if view_has_changed():
         return
     block_time_passed = block_time_passed_factory(MAX_BLOCK_TIME)
@@ -107,14 +120,14 @@ def compute_intra_line_diffs(view, diff):
         if block_time_passed():
             if view_has_changed():
                 return
-            _draw_intra_diff_regions(view, to_regions, from_regions)
+            _queue_intra_diff_regions(view, to_regions, from_regions)
             yield AWAIT_WORKER
             if view_has_changed():
                 return
 
     if view_has_changed():
         return
-    _draw_intra_diff_regions(view, to_regions, from_regions)
+    _queue_intra_diff_regions(view, to_regions, from_regions)
 
 
 def _draw_intra_diff_regions(view, added_regions, removed_regions):
@@ -126,6 +139,21 @@ def _draw_intra_diff_regions(view, added_regions, removed_regions):
     )
 
 
+def _queue_intra_diff_regions(view, added_regions, removed_regions):
+    # type: (sublime.View, List[Region], List[Region]) -> None
+    # Copy the lists as we continue to extend them on the worker.
+    queue_view_update(
+        view, _draw_if_unchanged, view.change_count(), added_regions[:], removed_regions[:],
+        key="intra_line_diff_regions"
+    )
+
+
+def _draw_if_unchanged(view, edit, change_count, added_regions, removed_regions):
+    # type: (sublime.View, sublime.Edit, int, List[Region], List[Region]) -> None
+    if view.change_count() == change_count:
+        _draw_intra_diff_regions(view, added_regions, removed_regions)
+
+
 def group_non_context_lines(hunk):
     # type: (Hunk) -> List[Chunk]
     """Return groups of chunks(?) (without context) from a hunk."""
@@ -1,13 +1,12 @@
+from bisect import bisect_left
 from collections import deque
 from functools import lru_cache, partial
 from itertools import chain, count, islice
-import locale
 import os
 from queue import Empty
 import re
 import shlex
 import subprocess
-import time
 import threading
 
 import sublime
@@ -15,17 +14,18 @@ from sublime_plugin import WindowCommand, TextCommand, EventListener
 
 from . import log_graph_colorizer as colorizer, show_commit_info
 from .log import GsLogCommand
-from .. import utils
+from .. import git_probe, utils
 from ..fns import filter_, flatten, pairwise, partition, take, unique
 from ..git_command import GitCommand, GitSavvyError
+from ..line_offsets import LineOffsets
 from ..parse_diff import Region, TextRange
 from ..settings import GitSavvySettings
 from ..runtime import (
-    enqueue_on_ui, enqueue_on_worker,
-    run_or_timeout, run_on_new_thread,
-    text_command
+    enqueue_on_ui, enqueue_on_worker, latest_only,
+    run_or_timeout, task_scheduler, text_command, throttle,
+    BACKGROUND, FRAME_INTERVAL
 )
-from ..view import join_regions, line_distance, replace_view_content, show_region
+from ..view import join_regions, line_distance, replace_region, replace_view_content, show_region
 from ..ui_mixins.input_panel import show_single_line_input_panel
 from ..ui_mixins.quick_panel import show_branch_panel
 from ..utils import add_selection_to_jump_history, focus_view, show_toast
@@ -60,8 +60,8 @@ __all__ = (
 MYPY = False
 if MYPY:
     from typing import (
-        Callable, Dict, Generic, Iterable, Iterator, List, Optional, Set, Sequence, Tuple,
-        TypeVar, Union
+        Callable, Deque, Dict, Generic, Iterable, Iterator, List, Optional, Set, Sequence,
+        Tuple, TypeVar, Union
     )
     T = TypeVar('T')
 
@@ -179,7 +179,11 @@ class gs_graph(WindowCommand, GitCommand):
             view.set_syntax_file("Packages/GitSavvy/syntax/graph.sublime-syntax")
             view.run_command("gs_handle_vintageous")
             view.run_command("gs_handle_arrow_keys")
-            run_on_new_thread(augment_color_scheme, view)
+            task_scheduler.submit(
+                partial(augment_color_scheme, view),
+                queue=BACKGROUND,
+                key=("augment_color_scheme", view.id())
+            )
 
             settings = view.settings()
             settings.set("git_savvy.repo_path", repo_path)
@@ -282,7 +286,9 @@ else:
     Replace = namedtuple('Replace', 'start end text')
 
 
-MAX_LOOK_AHEAD = 10000
+# Number of lines of the new graph we read ahead to decide whether a
+# commit moved up or the ones in between went away.
+LOOK_AHEAD = 200
 if MYPY:
     from enum import Enum
 
@@ -296,34 +302,113 @@ else:
 
 def diff(a, b):
     # type: (Sequence[str], Iterable[str]) -> Iterator[Union[Ins, Del, FlushT]]
+    """
+    Diff the graph rows `a` against `b` while `b` is still being read.
+
+    Commit rows are matched by their hash, t.i. a row which only changed
+    its decoration or graph characters becomes a one line replacement.
+    Other rows only match the current row of `a`.  If the next commit in
+    `b` is further down in `a`, we look ahead in `b`: if the rows we would
+    skip in `a` come back sooner, the commit moved up and we insert it,
+    otherwise we delete the rows in between.  T.i. moving a commit costs
+    one deletion and one insertion, not a run of them.
+    """
+    keys_a = [_row_key(line) for line in a]
+    positions = {}  # type: Dict[str, List[int]]
+    for idx, key in enumerate(keys_a):
+        if key is not None:
+            positions.setdefault(key, []).append(idx)
+    # `next_commit[i]` is the index of the first commit row in `a[i:]`.
+    len_a = len(a)
+    next_commit = [len_a] * (len_a + 1)
+    for idx in reversed(range(len_a)):
+        next_commit[idx] = idx if keys_a[idx] is not None else next_commit[idx + 1]
+
+    upcoming = {}  # type: Dict[str, Deque[int]]
     a_index = 0
     b_index = -1  # init in case b is empty
-    len_a = len(a)
-    a_set = set(a)
-    for b_index, line in enumerate(b):
-        is_commit_line = re.match(FIND_COMMIT_HASH, line)
-        if is_commit_line and line not in a_set:
-            len_a += 1
-            yield Ins(b_index, line)
+    for b_index, line, key in _read_ahead(b, LOOK_AHEAD, upcoming):
+        if key is None:
+            if a_index < len_a and a[a_index] == line:
+                a_index += 1
+                yield Flush
+            else:
+                yield Ins(b_index, line)
             continue
 
-        look_ahead = MAX_LOOK_AHEAD if is_commit_line else 1
-        try:
-            i = a.index(line, a_index, a_index + look_ahead) - a_index
-        except ValueError:
-            len_a += 1
+        match = _first_at_or_after(positions.get(key), a_index)
+        if match is None:
             yield Ins(b_index, line)
+            continue
+
+        skip = match - a_index
+        if skip:
+            commit = next_commit[a_index]
+            if commit < match:
+                comes_back = upcoming.get(keys_a[commit])  # type: ignore[arg-type]
+                if comes_back and comes_back[0] - b_index < skip:
+                    yield Ins(b_index, line)
+                    continue
+
+        if a[match] == line:
+            yield Del(b_index, b_index + skip) if skip else Flush
         else:
-            if i == 0:
-                a_index += 1
-                yield Flush
-            else:
-                len_a -= i
-                a_index += i + 1
-                yield Del(b_index, b_index + i)
+            yield Ins(b_index, line)
+            yield Del(b_index + 1, b_index + 2 + skip)
+        a_index = match + 1
 
-    if b_index < (len_a - 1):
-        yield Del(b_index + 1, len_a)
+    if a_index < len_a:
+        yield Del(b_index + 1, b_index + 1 + len_a - a_index)
+
+
+def _row_key(line):
+    # type: (str) -> Optional[str]
+    """Return the commit hash of a commit row, None for other rows."""
+    match = COMMIT_LINE.match(line)
+    if match:
+        return match.group("commit_hash")
+    if re.match(FIND_COMMIT_HASH, line):
+        return line
+    return None
+
+
+def _first_at_or_after(positions, idx):
+    # type: (Optional[List[int]], int) -> Optional[int]
+    if not positions:
+        return None
+    i = bisect_left(positions, idx)
+    return positions[i] if i < len(positions) else None
+
+
+def _read_ahead(lines, size, upcoming):
+    # type: (Iterable[str], int, Dict[str, Deque[int]]) -> Iterator[Tuple[int, str, Optional[str]]]
+    """
+    Yield `(index, line, key)` for `lines`, reading `size` lines ahead.
+    `upcoming` maps the keys of the lines read but not yet yielded to
+    their indices.
+    """
+    window = deque()  # type: Deque[Tuple[int, str, Optional[str]]]
+
+    def pop():
+        # type: () -> Tuple[int, str, Optional[str]]
+        item = window.popleft()
+        key = item[2]
+        if key is not None:
+            indices = upcoming[key]
+            indices.popleft()
+            if not indices:
+                del upcoming[key]
+        return item
+
+    for idx, line in enumerate(lines):
+        key = _row_key(line)
+        window.append((idx, line, key))
+        if key is not None:
+            upcoming.setdefault(key, deque()).append(idx)
+        if len(window) > size:
+            yield pop()
+    while window:
+        yield pop()
 
 
 def simplify(diff, max_size):
@@ -386,15 +471,15 @@ def normalize_tokens(tokens):
 
 def apply_diff(a, diff):
     # type: (List[str], Iterable[Union[Ins, Del, Replace]]) -> List[str]
-    a = a[:]
+    lines = LineOffsets(a)
     for token in diff:
         if isinstance(token, Replace):
-            a[token.start:token.end] = token.text
+            lines.splice(token.start, token.end, token.text)
         elif isinstance(token, Ins):
-            a[token.idx:token.idx] = [token.line]
+            lines.splice(token.idx, token.idx, [token.line])
         elif isinstance(token, Del):
-            a[token.start:token.end] = []
-    return a
+            lines.splice(token.start, token.end, [])
+    return list(lines)
 
 
 if MYPY:
@@ -430,25 +515,6 @@ def wait_for_first_item(it):
     return chain(head, iterable)
 
 
-def log_git_command(fn):
-    # type: (Callable[..., Iterator[T]]) -> Callable[..., Iterator[T]]
-    def decorated(self, *args, **kwargs):
-        start_time = time.perf_counter()
-        stderr = ''
-        saved_exception = None
-        try:
-            yield from fn(self, *args, **kwargs)
-        except GitSavvyError as e:
-            stderr = e.stderr
-            saved_exception = e
-        finally:
-            end_time = time.perf_counter()
-            util.debug.log_git(args, None, "<SNIP>", stderr, end_time - start_time)
-            if saved_exception:
-                raise saved_exception from None
-    return decorated
-
-
 class Done(Exception):
     pass
 
@@ -567,6 +633,9 @@ class gs_log_graph_refresh(TextCommand, GitCommand):
         except IndexError:
             current_graph = ''
         current_graph_splitted = current_graph.splitlines(keepends=True)
+        # `diff` reads `current_graph_splitted` on the worker while we
+        # paint, hence `apply_token` edits a copy.
+        current_lines = LineOffsets(current_graph_splitted)
 
         token_queue = SimpleFiniteQueue()  # type: SimpleFiniteQueue[Replace]
         current_proc = None
@@ -628,13 +697,21 @@ class gs_log_graph_refresh(TextCommand, GitCommand):
             drain_and_draw_queue(self.view, PaintingStateMachine(), follow, col_range, visible_selection)
 
         # Sublime will not run any event handlers until the (outermost) TextCommand exits.
-        # T.i. the (inner) commands `replace_view_content` and `set_and_show_cursor` will run
-        # through uninterrupted until `drain_and_draw_queue` yields. Then e.g.
-        # `on_selection_modified` runs *once* even if we painted multiple times.
+        # T.i. the (inner) command `set_and_show_cursor` and the replacements, which
+        # all share the `edit` of this command, will run through uninterrupted until
+        # `drain_and_draw_queue` yields. Then e.g. `on_selection_modified` runs *once*
+        # even if we painted multiple times.
         @ensure_not_aborted
         @text_command
-        def drain_and_draw_queue(view, painter_state, follow, col_range, visible_selection):
-            # type: (sublime.View, PaintingStateMachine, Optional[str], Optional[Tuple[int, int]], bool) -> None
+        def drain_and_draw_queue(
+            view,  # type: sublime.View
+            edit,  # type: sublime.Edit
+            painter_state,  # type: PaintingStateMachine
+            follow,  # type: Optional[str]
+            col_range,  # type: Optional[Tuple[int, int]]
+            visible_selection,  # type: bool
+        ):
+            # type: (...) -> None
             call_again = partial(
                 drain_and_draw_queue,
                 view,
@@ -666,7 +743,7 @@ class gs_log_graph_refresh(TextCommand, GitCommand):
                 except Done:
                     break
 
-                region = apply_token(view, token, graph_offset)
+                region = apply_token(view, edit, token, graph_offset)
 
                 if painter_state == 'initial':
                     if follow:
@@ -694,75 +771,35 @@ class gs_log_graph_refresh(TextCommand, GitCommand):
                     if visible_selection:
                         view.show(view.sel(), True)
 
-        def apply_token(view, token, offset):
-            # type: (sublime.View, Replace, int) -> sublime.Region
-            nonlocal current_graph_splitted
+        def apply_token(view, edit, token, offset):
+            # type: (sublime.View, sublime.Edit, Replace, int) -> sublime.Region
             start, end, text_ = token
             text = ''.join(text_)
-            computed_start = (
-                sum(len(line) for line in current_graph_splitted[:start])
-                + offset
-            )
-            computed_end = (
-                sum(len(line) for line in current_graph_splitted[start:end])
-                + computed_start
-            )
+            computed_start = current_lines.offset(start) + offset
+            computed_end = current_lines.offset(end) + offset
             region = sublime.Region(computed_start, computed_end)
 
-            current_graph_splitted = apply_diff(current_graph_splitted, [token])
-            replace_view_content(view, text, region)
+            current_lines.splice(start, end, text_)
+            replace_region(view, edit, text, region)
             occupied_space = sublime.Region(computed_start, computed_start + len(text))
             return occupied_space
 
-        run_on_new_thread(reader)
+        # A newer refresh supersedes a reader which has not started yet.
+        task_scheduler.submit(reader, key=("log_graph_reader", self.view.id()))
 
-    @log_git_command
-    def git_stdout(self, *args, show_panel_on_stderr=True, throw_on_stderr=True, got_proc=None, **kwargs):
+    def git_stdout(self, *args, got_proc=None, **kwargs):
         # type: (...) -> Iterator[str]
-        # Note: Can't use `self.decode_stdout` because it blocks the
-        # main thread!
-        decode = decoder(self.savvy_settings)
-        proc = self.git(*args, just_the_proc=True, **kwargs)
-        if got_proc:
-            got_proc(proc)
-        received_some_stdout = False
-        with proc:
-            while True:
-                # Block size 2**14 taken from Sublime's `exec.py`. This
-                # may be a hint on how much chars Sublime can draw efficiently.
-                # But here we don't draw every line (except initially) but
-                # a diff. So we oscillate between getting a first meaningful
-                # content fast and not blocking too much here.
-                # TODO: `len(lines)` could be a good indicator of how fast
-                # the system currently is because it seems to vary a lot when
-                # comapring rather short or long (in count of commits) repos.
-                lines = proc.stdout.readlines(2**14)
-                if not lines:
-                    break
-                elif not received_some_stdout:
-                    received_some_stdout = True
-                for line in lines:
-                    yield decode(line)
-
-            stderr = ''.join(map(decode, proc.stderr.readlines()))
-
-        if throw_on_stderr and stderr:
-            stdout = "<STDOUT SNIPPED>\n" if received_some_stdout else ""
-            raise GitSavvyError(
-                "$ {}\n\n{}".format(
-                    " ".join(["git"] + list(filter(None, args))),
-                    ''.join([stdout, stderr])
-                ),
-                cmd=proc.args,
-                stdout=stdout,
-                stderr=stderr,
-                show_panel=show_panel_on_stderr
-            )
+        return self.git_streaming(*args, keepends=True, got_proc=got_proc, **kwargs)
 
     def read_graph(self, got_proc=None):
         # type: (Callable[[subprocess.Popen], None]) -> Iterator[str]
         global DATE_FORMAT, DATE_FORMAT_STATE
 
+        git_info = git_probe.current()
+        if DATE_FORMAT_STATE == 'trying' and git_info and not git_info.capabilities.get("date_human"):
+            DATE_FORMAT = FALLBACK_DATE_FORMAT
+            DATE_FORMAT_STATE = 'final'
+
         args = self.build_git_command()
         if DATE_FORMAT_STATE == 'trying':
             try:
@@ -775,6 +812,7 @@ class gs_log_graph_refresh(TextCommand, GitCommand):
                 )
             except GitSavvyError as e:
                 if e.stderr and DATE_FORMAT in e.stderr:
+                    git_probe.mark_unsupported("date_human")
                     DATE_FORMAT = FALLBACK_DATE_FORMAT
                     DATE_FORMAT_STATE = 'final'
                     enqueue_on_worker(self.view.run_command, "gs_log_graph_refresh")
@@ -834,23 +872,6 @@ class gs_log_graph_refresh(TextCommand, GitCommand):
         return args
 
 
-locally_preferred_encoding = locale.getpreferredencoding()
-
-
-def decoder(settings):
-    encodings = ['utf8', locally_preferred_encoding, settings.get("fallback_encoding")]
-
-    def decode(bytes):
-        # type: (bytes) -> str
-        for encoding in encodings:
-            try:
-                return bytes.decode(encoding)
-            except UnicodeDecodeError:
-                pass
-        return bytes.decode('utf8', errors='replace')
-    return decode
-
-
 def prelude(view):
     # type: (sublime.View) -> str
     prelude = "\n"
@@ -1398,16 +1419,19 @@ class GsLogGraphCursorListener(EventListener, GitCommand):
 
         window = view.window()
         if window and show_commit_info.panel_is_visible(window):
-            draw_info_panel(view)
+            # Holding down an arrow key should not read a commit per line
+            # we pass by but at most one per frame.
+            throttle(("draw_info_panel", window.id()), FRAME_INTERVAL, draw_info_panel, view)
 
         # `colorize_dots` queries the view heavily. We want that to
         # happen on the main thread (t.i. blocking) bc it is way, way
         # faster. But we still defer that task, so others can run code
         # that actually *needs* to be a sync side-effect to this event.
-        enqueue_on_ui(colorize_dots, view)
-        enqueue_on_ui(colorize_fixups, view)
+        vid = view.id()
+        enqueue_on_ui(latest_only(("colorize_dots", vid), colorize_dots, view))
+        enqueue_on_ui(latest_only(("colorize_fixups", vid), colorize_fixups, view))
 
-        enqueue_on_ui(set_symbol_to_follow, view)
+        enqueue_on_ui(latest_only(("set_symbol_to_follow", vid), set_symbol_to_follow, view))
 
     def on_window_command(self, window, command_name, args):
         # type: (sublime.Window, str, Dict) -> None
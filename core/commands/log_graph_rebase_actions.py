@@ -13,7 +13,7 @@ from GitSavvy.core.base_commands import GsTextCommand, GsWindowCommand
 from GitSavvy.core.commands import log_graph
 from GitSavvy.core.git_command import GitCommand, GitSavvyError
 from GitSavvy.core.parse_diff import TextRange
-from GitSavvy.core.runtime import on_new_thread, run_on_new_thread, throttled
+from GitSavvy.core.runtime import debounce, on_new_thread, run_on_new_thread
 from GitSavvy.core.ui_mixins.quick_panel import show_branch_panel
 from GitSavvy.core.utils import flash
 from GitSavvy.core.view import replace_view_content
@@ -384,7 +384,7 @@ def search_git_output(window, needle):
 
 def auto_close_panel(window, after=800):
     # type: (sublime.Window, int) -> None
-    sublime.set_timeout(throttled(_close_panel, window), after)
+    debounce(("auto_close_panel", window.id()), after / 1000, _close_panel, window)
 
 
 def _close_panel(window):
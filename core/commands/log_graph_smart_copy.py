@@ -3,7 +3,7 @@ import sublime_plugin
 
 from . import log_graph
 from ..parse_diff import TextRange
-from ..runtime import throttled
+from ..runtime import debounce
 from ..utils import flash
 
 
@@ -97,10 +97,7 @@ def flash_copied_regions(view, regions):
     region_key = HIGHLIGHT_REGION_KEY.format("flash_copied_regions")
     view.add_regions(region_key, regions, **STYLE)  # type: ignore[arg-type]
 
-    sublime.set_timeout(
-        throttled(erase_regions, view, region_key),
-        int(DURATION * 1000)
-    )
+    debounce(("flash_copied_regions", view.id()), DURATION, erase_regions, view, region_key)
 
 
 def erase_regions(view, region_key):
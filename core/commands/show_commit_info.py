@@ -5,7 +5,7 @@ from sublime_plugin import WindowCommand
 
 from . import intra_line_colorizer
 from ..git_command import GitCommand
-from ..runtime import enqueue_on_worker, enqueue_on_ui, throttled
+from ..runtime import drop_if_cancelled, enqueue_on_worker, enqueue_on_ui, latest_only, supersede
 from ..view import replace_view_content
 
 
@@ -65,8 +65,12 @@ class gs_show_commit_info(WindowCommand, GitCommand):
         ):
             self.run_impl(commit_hash, file_path)
         else:
-            enqueue_on_worker(throttled(self.run_impl, commit_hash, file_path))
+            enqueue_on_worker(latest_only(
+                ("show_commit_info", self.window.id()),
+                self.run_impl, commit_hash, file_path
+            ))
 
+    @drop_if_cancelled
     def run_impl(self, commit_hash, file_path=None):
         output_view = ensure_panel(self.window)
         output_view.settings().set("git_savvy.repo_path", self.repo_path)
@@ -74,11 +78,15 @@ class gs_show_commit_info(WindowCommand, GitCommand):
         if commit_hash:
             show_patch = self.savvy_settings.get("show_full_commit_info")
             show_diffstat = self.savvy_settings.get("show_diffstat")
-            text = self.read_commit(commit_hash, file_path, show_diffstat, show_patch)
+            with supersede(output_view.id(), "show_commit_info"):
+                text = self.read_commit(commit_hash, file_path, show_diffstat, show_patch)
         else:
             text = ''
 
-        enqueue_on_ui(_draw, self.window, output_view, text, commit_hash)
+        enqueue_on_ui(latest_only(
+            ("show_commit_info.draw", self.window.id()),
+            _draw, self.window, output_view, text, commit_hash
+        ))
 
 
 def _draw(window, view, text, commit):
@@ -1,8 +1,9 @@
-import time
 import sublime
 from sublime_plugin import TextCommand, EventListener
 
+from .. import git_dir
 from ..git_command import GitCommand
+from ..runtime import BACKGROUND, enqueue_on_worker, git_scheduler, throttle
 from ...common.util import debug
 
 
@@ -17,8 +18,25 @@ class GsStatusBarEventListener(EventListener):
         view.run_command("gs_update_status_bar")
 
 
-last_execution = 0
-update_status_bar_soon = False
+# Update at most once per interval per view, but always once more after
+# the last event so that we end up showing the final state.
+UPDATE_INTERVAL = 0.1
+
+
+def on_status_snapshot(repo_path, snapshot):
+    """
+    Listener for `status_snapshot`; e.g. when a dashboard fetched a new
+    `git status`, show it in the status bar right away.
+    """
+    def update():
+        for window in sublime.windows():
+            view = window.active_view()
+            if not view:
+                continue
+            view_repo_path = view.settings().get("git_savvy.repo_path")
+            if view_repo_path and git_dir.canonical_path(view_repo_path) == repo_path:
+                view.run_command("gs_update_status_bar")
+    sublime.set_timeout(update)
 
 
 def view_is_transient(view):
@@ -49,29 +67,16 @@ class GsUpdateStatusBarCommand(TextCommand, GitCommand):
         if view_is_transient(self.view):
             return
 
-        global last_execution, update_status_bar_soon
         if self.savvy_settings.get("git_status_in_status_bar"):
-
-            millisec = int(round(time.time() * 1000))
-            # If we updated to less then 100 ms we don't need to update now but
-            # should update in 100 ms in case of current file change.
-            #
-            # So if this get called 4 timer with 20 ms in between each call
-            # it will only update twice. Once at time 0 and one at time 100
-            # even if it got called at 0, 20, 40, 60 and 80.
-
-            if millisec - 100 > last_execution:
-                sublime.set_timeout_async(self.run_async, 0)
-            else:
-                if not update_status_bar_soon:
-                    update_status_bar_soon = True
-                    sublime.set_timeout_async(self.run_async, 100)
-
-            last_execution = int(round(time.time() * 1000))
+            throttle(
+                ("status_bar", self.view.id()),
+                UPDATE_INTERVAL,
+                enqueue_on_worker, self.run_async
+            )
 
     def run_async(self):
         # disable logging and git raise error
-        with debug.disable_logging():
+        with debug.disable_logging(), git_scheduler.lane(BACKGROUND):
             # ignore all other possible errors
             try:
                 self.get_repo_path(offer_init=False)  # check for ValueError
@@ -79,6 +84,3 @@ class GsUpdateStatusBarCommand(TextCommand, GitCommand):
                 self.view.set_status("gitsavvy-repo-status", short_status)
             except Exception:
                 self.view.erase_status("gitsavvy-repo-status")
-
-        global update_status_bar_soon
-        update_status_bar_soon = False
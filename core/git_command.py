@@ -6,18 +6,19 @@ Define a base command class that:
      for Git operations.
 """
 
+import codecs
 import locale
 import os
 import subprocess
-import shutil
-import re
 import time
 import threading
 import traceback
+from itertools import count
 
 import sublime
 
 from ..common import util
+from . import cat_file, git_dir, git_probe, status_snapshot
 from .git_mixins.status import StatusMixin
 from .git_mixins.active_branch import ActiveBranchMixin
 from .git_mixins.branches import BranchesMixin
@@ -31,12 +32,20 @@ from .git_mixins.history import HistoryMixin
 from .git_mixins.rewrite import RewriteMixin
 from .git_mixins.merge import MergeMixin
 from .exceptions import GitSavvyError
-from .settings import SettingsMixin
+from .runtime import (
+    DEFAULT_CONCURRENCY,
+    Cancelled,
+    SingleFlight,
+    current_cancellation_token,
+    git_scheduler
+)
+from .settings import SettingsMixin, settings_generation
 
 
 MYPY = False
 if MYPY:
-    from typing import Sequence, Tuple
+    from typing import IO, ContextManager, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+    from .settings import GitSavvySettings
 
 
 git_path = None
@@ -52,33 +61,220 @@ FALLBACK_PARSE_ERROR_MSG = (
 MIN_GIT_VERSION = (2, 16, 0)
 GIT_TOO_OLD_MSG = "Your Git version is too old. GitSavvy requires {:d}.{:d}.{:d} or above."
 
+# Listeners and dashboards often ask the same read-only questions at the
+# same time, e.g. `git status` on view activation.  Identical concurrent
+# invocations of these share one process and one result.  Any other git
+# command raises a barrier when it starts and again when it finishes so
+# that a read issued during or after e.g. `git add` never joins a process
+# started before it.
+SINGLE_FLIGHT_COMMANDS = {"status", "rev-parse", "for-each-ref"}
+git_single_flight = SingleFlight()
+_barriers = count(1)
+_barrier_lock = threading.Lock()
+_current_barrier = 0
+
+
+class InvocationContext:
+    """
+    Everything `git()` reads from the settings and the environment before
+    it can spawn a process, precomputed per window and repository.  The
+    contexts are rebuilt when the GitSavvy settings or a project file
+    change; changes to `os.environ` after that are not picked up.
+    """
+
+    __slots__ = (
+        "environ",
+        "environ_key",
+        "global_flags",
+        "global_pre_flags",
+        "show_panel_for",
+        "close_panel_for",
+        "live_panel_output",
+        "live_panel_output_timeout",
+        "max_concurrency",
+        "startupinfo",
+    )
+
+    def __init__(self, settings):
+        environ = os.environ.copy()
+        savvy_env = settings.get("env")
+        if savvy_env:
+            environ.update(savvy_env)
+        self.environ = environ  # type: Dict[str, str]
+        self.environ_key = tuple(sorted(environ.items()))
+        self.global_flags = settings.get("global_flags") or {}  # type: Dict[str, List[str]]
+        self.global_pre_flags = settings.get("global_pre_flags") or {}  # type: Dict[str, List[str]]
+        self.show_panel_for = frozenset(settings.get("show_panel_for") or ())
+        self.close_panel_for = frozenset(settings.get("close_panel_for") or ())
+        self.live_panel_output = settings.get("live_panel_output", False)  # type: bool
+        self.live_panel_output_timeout = settings.get("live_panel_output_timeout", 10000)  # type: int
+        self.max_concurrency = settings.get(
+            "max_concurrent_git_processes", DEFAULT_CONCURRENCY)  # type: int
+        self.startupinfo = None
+        if os.name == "nt":
+            self.startupinfo = subprocess.STARTUPINFO()
+            self.startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+
+    def include_global_flags(self, args):
+        """
+        Transforms the Git command arguments with flags indicated in the
+        global GitSavvy settings.
+        """
+        git_cmd, *addl_args = args
+        if git_cmd in self.global_flags:
+            args = [git_cmd] + self.global_flags[git_cmd] + addl_args
+        else:
+            args = [git_cmd] + list(addl_args)
+
+        if git_cmd in self.global_pre_flags:
+            args = self.global_pre_flags[git_cmd] + args
+
+        return args
+
+
+_invocation_contexts = {}  # type: Dict[Tuple[Optional[int], str], InvocationContext]
+_invocation_contexts_generation = None  # type: Optional[Tuple[int, int]]
+
+
+def get_invocation_context(settings, window_id, repo_path):
+    # type: (GitSavvySettings, Optional[int], str) -> InvocationContext
+    global _invocation_contexts_generation
+    generation = settings_generation()
+    if generation != _invocation_contexts_generation:
+        _invocation_contexts.clear()
+        _invocation_contexts_generation = generation
+    key = (window_id, repo_path)
+    try:
+        return _invocation_contexts[key]
+    except KeyError:
+        context = _invocation_contexts[key] = InvocationContext(settings)
+        return context
+
+
+def may_share_process(args):
+    # type: (Sequence[str]) -> bool
+    git_cmd = args[0]
+    if git_cmd in SINGLE_FLIGHT_COMMANDS:
+        return True
+    if git_cmd == "log":
+        return any(arg in ("-1", "-n 1", "-n1", "--max-count=1") for arg in args)
+    if git_cmd == "stash":
+        return args[1:2] == ["list"]
+    return False
+
+
+def decode_stream(chunks, encodings):
+    # type: (Iterable[bytes], Sequence[Optional[str]]) -> Iterator[str]
+    """
+    Incrementally decode `chunks`, starting with the first of `encodings`
+    and switching to the next one as soon as a chunk does not fit.  As we
+    cannot take back what we already yielded, bytes that fit no encoding
+    at all are replaced.
+    """
+    decoders = []
+    for encoding in encodings:
+        if not encoding:
+            continue
+        try:
+            decoders.append(codecs.getincrementaldecoder(encoding)())
+        except LookupError:
+            pass
+    decoders.append(codecs.getincrementaldecoder("utf-8")(errors="replace"))
+    decoders.reverse()
+    decoder = decoders.pop()
+
+    def decode(chunk, final=False):
+        # type: (bytes, bool) -> str
+        nonlocal decoder
+        while True:
+            pending, _ = decoder.getstate()
+            try:
+                return decoder.decode(chunk, final)
+            except UnicodeDecodeError:
+                decoder = decoders.pop()
+                chunk = pending + chunk
+
+    for chunk in chunks:
+        text = decode(chunk)
+        if text:
+            yield text
+    text = decode(b"", final=True)
+    if text:
+        yield text
+
+
+def split_records(texts, separator="\n", keepends=False):
+    # type: (Iterable[str], str, bool) -> Iterator[str]
+    """
+    Re-chunk `texts` into records delimited by `separator`.  A trailing
+    empty record is dropped.
+    """
+    rest = ""
+    for text in texts:
+        rest += text
+        *records, rest = rest.split(separator)
+        for record in records:
+            yield record + separator if keepends else record
+    if rest:
+        yield rest
+
+
+def raise_barrier():
+    # type: () -> None
+    global _current_barrier
+    with _barrier_lock:
+        _current_barrier = next(_barriers)
+
+
+def current_barrier():
+    # type: () -> int
+    with _barrier_lock:
+        return _current_barrier
+
 
 class LoggingProcessWrapper(object):
 
     """
     Wraps a Popen object with support for logging stdin/stderr
     """
-    def __init__(self, process, timeout):
+    def __init__(self, process, timeout, appender=None):
         self.timeout = timeout
         self.process = process
-        self.stdout = b''
-        self.stderr = b''
+        self.appender = appender or util.log.PanelAppender()
+        self.stdout_chunks = []  # type: List[bytes]
+        self.stderr_chunks = []  # type: List[bytes]
+
+    @property
+    def stdout(self):
+        # type: () -> bytes
+        return b"".join(self.stdout_chunks)
+
+    @property
+    def stderr(self):
+        # type: () -> bytes
+        return b"".join(self.stderr_chunks)
 
     def read_stdout(self):
-        try:
-            for line in iter(self.process.stdout.readline, b""):
-                self.stdout = self.stdout + line
-                util.log.panel_append(line.decode(), run_async=False)
-        except IOError as err:
-            util.log.panel_append(err, run_async=False)
+        self._read(self.process.stdout, self.stdout_chunks)
 
     def read_stderr(self):
+        self._read(self.process.stderr, self.stderr_chunks)
+
+    def _read(self, stream, chunks):
+        # type: (IO[bytes], List[bytes]) -> None
+        # Collect the chunks and join them once instead of concatenating
+        # `bytes` per line, which is quadratic.
+        def lines():
+            # type: () -> Iterator[bytes]
+            for line in iter(stream.readline, b""):
+                chunks.append(line)
+                yield line
+
         try:
-            for line in iter(self.process.stderr.readline, b""):
-                self.stderr = self.stderr + line
-                util.log.panel_append(line.decode(), run_async=False)
+            for text in decode_stream(lines(), ["utf-8"]):
+                self.appender.append(text)
         except IOError as err:
-            util.log.panel_append(err, run_async=False)
+            self.appender.append(str(err))
 
     def communicate(self, stdin):
         """
@@ -101,6 +297,7 @@ class LoggingProcessWrapper(object):
 
         stdout_thread.join(self.timeout / 1000)
         stderr_thread.join(self.timeout / 1000)
+        self.appender.flush()
 
         return self.stdout, self.stderr
 
@@ -139,7 +336,9 @@ class GitCommand(StatusMixin,
         encode=True,
         stdin_encoding="UTF-8",
         custom_environ=None,
-        just_the_proc=False
+        just_the_proc=False,
+        lane=None,
+        cancel_token=None
     ):
         """
         Run the git command specified in `*args` and return the output
@@ -149,21 +348,18 @@ class GitCommand(StatusMixin,
         the git process.  If `working_dir` is provided, set this as the
         current working directory for the git process; otherwise,
         the `repo_path` value will be used.
-        """
-        args = self._include_global_flags(args)
-        command = (self.git_binary_path, ) + tuple(arg for arg in args if arg)
-        command_str = " ".join(["git"] + list(filter(None, args)))
 
-        if show_panel is None:
-            show_panel = args[0] in self.savvy_settings.get("show_panel_for")
-
-        if args[0] in self.savvy_settings.get("close_panel_for"):
-            sublime.active_window().run_command("hide_panel", {"cancel": True})
-
-        live_panel_output = self.savvy_settings.get("live_panel_output", False)
-
-        stdout, stderr = None, None
+        Unless the `lane` is "interactive", which is the default on the
+        UI thread, the process waits for a slot of the `git_scheduler`.
 
+        If the `cancel_token`, by default the one active on the current
+        thread, gets cancelled, the process is killed and `Cancelled` raised.
+        """
+        given_args = [arg for arg in args if arg]
+        if cancel_token is None:
+            cancel_token = current_cancellation_token()
+        if cancel_token:
+            cancel_token.raise_if_cancelled()
         try:
             if not working_dir:
                 working_dir = self.repo_path
@@ -173,29 +369,48 @@ class GitCommand(StatusMixin,
         except Exception as e:
             raise GitSavvyError(e, show_panel=show_panel_on_stderr)
 
+        context = self._invocation_context(working_dir)
+        args = context.include_global_flags(args)
+        command = (self.git_binary_path, ) + tuple(arg for arg in args if arg)
+        command_str = " ".join(["git"] + list(filter(None, args)))
+
+        if show_panel is None:
+            show_panel = args[0] in context.show_panel_for
+
+        if args[0] in context.close_panel_for:
+            sublime.active_window().run_command("hide_panel", {"cancel": True})
+
+        live_panel_output = context.live_panel_output
+
+        stdout, stderr = None, None
+        bytes_out = 0
+
         try:
-            startupinfo = None
-            if os.name == "nt":
-                startupinfo = subprocess.STARTUPINFO()
-                startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-
-            environ = os.environ.copy()
-            savvy_env = self.savvy_settings.get("env")
-            if savvy_env:
-                environ.update(savvy_env)
-            environ.update(custom_environ or {})
+            startupinfo = context.startupinfo
+            environ, environ_key = context.environ, context.environ_key
+            if custom_environ:
+                environ = dict(environ, **custom_environ)
+                environ_key = tuple(sorted(environ.items()))
             start = time.time()
-            p = subprocess.Popen(command,
-                                 stdin=subprocess.PIPE,
-                                 stdout=subprocess.PIPE,
-                                 stderr=subprocess.PIPE,
-                                 cwd=working_dir,
-                                 env=environ,
-                                 startupinfo=startupinfo)
 
-            if just_the_proc:
+            def spawn():
+                # type: () -> subprocess.Popen
+                p = subprocess.Popen(command,
+                                     stdin=subprocess.PIPE,
+                                     stdout=subprocess.PIPE,
+                                     stderr=subprocess.PIPE,
+                                     cwd=working_dir,
+                                     env=environ,
+                                     startupinfo=startupinfo,
+                                     # Allow killing the process group on cancellation.
+                                     start_new_session=cancel_token is not None)
+                if cancel_token:
+                    cancel_token.attach(p)
                 return p
 
+            if just_the_proc:
+                return spawn()
+
             def initialize_panel():
                 # clear panel
                 util.log.panel("", run_async=False)
@@ -204,17 +419,55 @@ class GitCommand(StatusMixin,
                 if self.savvy_settings.get("show_input_in_output"):
                     util.log.panel_append("$ {}\n".format(command_str), run_async=False)
 
-            if show_panel and live_panel_output:
-                wrapper = LoggingProcessWrapper(p, self.savvy_settings.get("live_panel_output_timeout", 10000))
-                initialize_panel()
+            def communicate():
+                # type: () -> Tuple[bytes, bytes, int]
+                with self._git_slot(working_dir, lane):
+                    p = spawn()
+                    try:
+                        stdout, stderr = p.communicate(stdin)
+                    finally:
+                        if cancel_token:
+                            cancel_token.detach(p)
+                return stdout, stderr, p.returncode
 
             if stdin is not None and encode:
                 stdin = stdin.encode(encoding=stdin_encoding)
 
             if show_panel and live_panel_output:
-                stdout, stderr = wrapper.communicate(stdin)
+                raise_barrier()
+                try:
+                    with self._git_slot(working_dir, lane):
+                        p = spawn()
+                        wrapper = LoggingProcessWrapper(p, context.live_panel_output_timeout)
+                        initialize_panel()
+                        try:
+                            stdout, stderr = wrapper.communicate(stdin)
+                        finally:
+                            if cancel_token:
+                                cancel_token.detach(p)
+                finally:
+                    raise_barrier()
+                returncode = p.returncode
+            elif (
+                stdin is None
+                and not show_panel
+                and cancel_token is None
+                and may_share_process(given_args)
+            ):
+                key = (command, working_dir, environ_key, current_barrier())
+                stdout, stderr, returncode = git_single_flight.run(key, communicate)
             else:
-                stdout, stderr = p.communicate(stdin)
+                raise_barrier()
+                try:
+                    stdout, stderr, returncode = communicate()
+                finally:
+                    # Reads that started while this command ran must not
+                    # be joined by reads issued after it returned.
+                    raise_barrier()
+
+            bytes_out = len(stdout)
+            if cancel_token:
+                cancel_token.raise_if_cancelled()
 
             if decode:
                 stdout, stderr = self.decode_stdout(stdout), self.decode_stdout(stderr)
@@ -228,6 +481,9 @@ class GitCommand(StatusMixin,
                         util.log.panel_append("\n")
                     util.log.panel_append(stderr)
 
+        except Cancelled:
+            raise
+
         except Exception as e:
             # this should never be reached
             raise GitSavvyError(
@@ -241,7 +497,12 @@ class GitCommand(StatusMixin,
         finally:
             if not just_the_proc:
                 end = time.time()
-                if decode:
+                util.perf.record_git(given_args[0], working_dir, end - start, bytes_out)
+                status_snapshot.invalidate_after(working_dir, given_args)
+                if not util.debug.enabled:
+                    # Do not decode anything just to throw it away.
+                    pass
+                elif decode:
                     util.debug.log_git(args, stdin, stdout, stderr, end - start)
                 else:
                     util.debug.log_git(
@@ -255,36 +516,200 @@ class GitCommand(StatusMixin,
                 if show_panel and self.savvy_settings.get("show_time_elapsed_in_output", True):
                     util.log.panel_append("\n[Done in {:.2f}s]".format(end - start))
 
-        if throw_on_stderr and not p.returncode == 0:
-            if show_status_message_on_stderr:
-                sublime.active_window().status_message(
-                    "`git {}` failed.".format(command[1])
-                    + (" See log for details." if not show_panel_on_stderr else "")
-                )
-
-            if "*** Please tell me who you are." in stderr:
-                sublime.set_timeout_async(
-                    lambda: sublime.active_window().run_command("gs_setup_user"))
-
-            if stdout or stderr:
-                raise GitSavvyError(
-                    "$ {}\n\n{}".format(command_str, ''.join([stdout, stderr])),
-                    cmd=command,
-                    stdout=stdout,
-                    stderr=stderr,
-                    show_panel=show_panel_on_stderr
-                )
-            else:
-                raise GitSavvyError(
-                    "`{}` failed.".format(command_str),
-                    cmd=command,
-                    stdout=stdout,
-                    stderr=stderr,
-                    show_panel=show_panel_on_stderr
-                )
+        if throw_on_stderr and not returncode == 0:
+            self._raise_git_error(
+                command,
+                command_str,
+                stdout,
+                stderr,
+                show_panel_on_stderr=show_panel_on_stderr,
+                show_status_message_on_stderr=show_status_message_on_stderr
+            )
 
         return stdout
 
+    def git_streaming(
+        self,
+        *args,
+        separator="\n",
+        keepends=False,
+        working_dir=None,
+        show_panel_on_stderr=True,
+        show_status_message_on_stderr=True,
+        throw_on_stderr=True,
+        custom_environ=None,
+        got_proc=None,
+        lane=None,
+        cancel_token=None
+    ):
+        # type: (...) -> Iterator[str]
+        """
+        Run the git command specified in `*args` and yield its stdout as
+        decoded records while git is still running.  Records are split on
+        `separator`, e.g. "\\n", "\\x00" or "\\x00\\x00\\n", which is
+        only included if `keepends` is set.
+
+        Raises `GitSavvyError` after the last record if git failed, just
+        like `git()`.  Only if the caller got the process through `got_proc`
+        and it died without a word on stderr, we assume the caller killed it
+        and end the stream silently.  Closing the iterator early kills the
+        process, cancelling the `cancel_token` does too and raises
+        `Cancelled`.
+        """
+        if cancel_token is None:
+            cancel_token = current_cancellation_token()
+        command_str = " ".join(["git"] + list(filter(None, args)))
+        repo_path = working_dir or self._repo_path_or_none()
+        # Hold the slot until the consumer is done with the process.
+        with self._git_slot(repo_path, lane):
+            start = time.time()
+            proc = self.git(
+                *args,
+                working_dir=working_dir,
+                custom_environ=custom_environ,
+                just_the_proc=True,
+                cancel_token=cancel_token
+            )  # type: subprocess.Popen
+            if got_proc:
+                got_proc(proc)
+
+            encodings = self.get_encoding_candidates()
+            stdin, stdout, stderr_ = proc.stdin, proc.stdout, proc.stderr
+            assert stdin and stdout and stderr_
+            stdin.close()
+            received_some_stdout = False
+            stderr = ""
+            bytes_out = 0
+
+            def read_chunk():
+                # type: () -> bytes
+                nonlocal bytes_out
+                # Block size 2**14 taken from Sublime's `exec.py`.
+                chunk = stdout.read1(2**14)  # type: ignore[attr-defined]
+                bytes_out += len(chunk)
+                return chunk
+
+            try:
+                chunks = iter(read_chunk, b"")
+                for record in split_records(decode_stream(chunks, encodings), separator, keepends):
+                    if cancel_token and cancel_token.cancelled:
+                        break
+                    received_some_stdout = True
+                    yield record
+                stderr = "".join(decode_stream([stderr_.read()], encodings))
+                proc.wait()
+            finally:
+                if proc.poll() is None:
+                    # The consumer stopped early.
+                    proc.kill()
+                    proc.wait()
+                if cancel_token:
+                    cancel_token.detach(proc)
+                stdout.close()
+                stderr_.close()
+                end = time.time()
+                util.perf.record_git(args[0], repo_path, end - start, bytes_out)
+                util.debug.log_git(args, None, "<SNIP>", stderr, end - start)
+
+        if cancel_token:
+            cancel_token.raise_if_cancelled()
+
+        killed_by_caller = got_proc is not None and not stderr
+        if throw_on_stderr and proc.returncode != 0 and not killed_by_caller:
+            self._raise_git_error(
+                proc.args,
+                command_str,
+                "<STDOUT SNIPPED>\n" if received_some_stdout else "",
+                stderr,
+                show_panel_on_stderr=show_panel_on_stderr,
+                show_status_message_on_stderr=show_status_message_on_stderr
+            )
+
+    def _repo_path_or_none(self):
+        # type: () -> Optional[str]
+        try:
+            return self.repo_path
+        except Exception:
+            # `git()` will raise a proper error for us.
+            return None
+
+    def _git_slot(self, working_dir, lane):
+        # type: (Optional[str], Optional[str]) -> ContextManager[None]
+        working_dir = working_dir or self._repo_path_or_none() or ""
+        view = getattr(self, "view", None)
+        return git_scheduler.slot(
+            working_dir,
+            lane,
+            max_concurrency=self._invocation_context(working_dir).max_concurrency,
+            is_alive=view.is_valid if view else None
+        )
+
+    def _invocation_context(self, working_dir):
+        # type: (str) -> InvocationContext
+        settings = self.savvy_settings
+        return get_invocation_context(settings, settings.window_id, working_dir)
+
+    def _raise_git_error(
+        self,
+        command,
+        command_str,
+        stdout,
+        stderr,
+        show_panel_on_stderr=True,
+        show_status_message_on_stderr=True
+    ):
+        if show_status_message_on_stderr:
+            sublime.active_window().status_message(
+                "`git {}` failed.".format(command[1])
+                + (" See log for details." if not show_panel_on_stderr else "")
+            )
+
+        if "*** Please tell me who you are." in stderr:
+            sublime.set_timeout_async(
+                lambda: sublime.active_window().run_command("gs_setup_user"))
+
+        if stdout or stderr:
+            raise GitSavvyError(
+                "$ {}\n\n{}".format(command_str, ''.join([stdout, stderr])),
+                cmd=command,
+                stdout=stdout,
+                stderr=stderr,
+                show_panel=show_panel_on_stderr
+            )
+        else:
+            raise GitSavvyError(
+                "`{}` failed.".format(command_str),
+                cmd=command,
+                stdout=stdout,
+                stderr=stderr,
+                show_panel=show_panel_on_stderr
+            )
+
+    def read_object(self, object_name):
+        # type: (str) -> Optional[Tuple[str, bytes]]
+        """
+        Read an object, e.g. "<commit>:<path>", through the long-lived
+        `git cat-file --batch` process of the current repo.  Return
+        `(object_type, contents)` or `None` if the object does not exist.
+
+        Raises `OSError` if the batch process cannot be used.
+        """
+        return self._object_server().read_object(object_name)
+
+    def read_object_info(self, object_name):
+        # type: (str) -> Optional[Tuple[str, str, int]]
+        """
+        Like `read_object` but return `(object_hash, object_type, size)`
+        from `git cat-file --batch-check`.
+        """
+        return self._object_server().object_info(object_name)
+
+    def _object_server(self):
+        # type: () -> cat_file.ObjectServer
+        repo_path = self.repo_path
+        environ = self._invocation_context(repo_path).environ
+        return cat_file.get_server(self.git_binary_path, repo_path, environ)
+
     def git_throwing_silently(self, *args, **kwargs):
         return self.git(
             *args,
@@ -339,34 +764,15 @@ class GitCommand(StatusMixin,
             else:
                 git_path = git_path_setting
 
-            if not git_path:
-                git_path = shutil.which("git")
-
-            try:
-                startupinfo = None
-                if os.name == "nt":
-                    startupinfo = subprocess.STARTUPINFO()
-                    startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-
-                stdout = subprocess.check_output(
-                    [git_path, "--version"],
-                    stderr=subprocess.PIPE,
-                    startupinfo=startupinfo).decode("utf-8")
-
-            except Exception:
-                stdout = ""
+            info = git_probe.resolve(git_path)
+            git_path = info.path if info else None
+            if info and info.version and info.version < MIN_GIT_VERSION:
+                msg = GIT_TOO_OLD_MSG.format(*MIN_GIT_VERSION)
                 git_path = None
-
-            match = re.match(r"git version ([0-9]+)\.([0-9]+)\.([0-9]+)", stdout)
-            if match:
-                version = tuple(map(int, match.groups()))
-                if version < MIN_GIT_VERSION:
-                    msg = GIT_TOO_OLD_MSG.format(*MIN_GIT_VERSION)
-                    git_path = None
-                    if not error_message_displayed:
-                        sublime.error_message(msg)
-                        error_message_displayed = True
-                    raise ValueError("Git binary too old.")
+                if not error_message_displayed:
+                    sublime.error_message(msg)
+                    error_message_displayed = True
+                raise ValueError("Git binary too old.")
 
         if not git_path:
             msg = ("Your Git binary cannot be found.  If it is installed, add it "
@@ -418,9 +824,14 @@ class GitCommand(StatusMixin,
                     repo_path = self.find_git_toplevel(
                         folders[0], throw_on_stderr=False)
 
-        return os.path.realpath(repo_path) if repo_path else None
+        return git_dir.canonical_path(repo_path) if repo_path else None
 
     def find_git_toplevel(self, folder, throw_on_stderr):
+        repo = git_dir.find_toplevel(folder)
+        if repo or not throw_on_stderr:
+            return repo
+
+        # Let git tell the user why `folder` is not within a repository.
         stdout = self.git(
             "rev-parse",
             "--show-toplevel",
@@ -437,6 +848,9 @@ class GitCommand(StatusMixin,
         repo_path = view.settings().get("git_savvy.repo_path") if view else None
 
         if not repo_path or not os.path.exists(repo_path):
+            if repo_path:
+                # The repo has been removed or moved since we last saw it.
+                git_dir.invalidate(repo_path)
             repo_path = self.find_repo_path()
             if not repo_path:
                 window = view.window()
@@ -458,7 +872,7 @@ class GitCommand(StatusMixin,
                 if file_name and os.path.realpath(file_name).startswith(repo_path + os.path.sep):
                     view.settings().set("git_savvy.repo_path", repo_path)
 
-        return os.path.realpath(repo_path) if repo_path else repo_path
+        return git_dir.canonical_path(repo_path) if repo_path else repo_path
 
     @property
     def repo_path(self):
@@ -504,24 +918,7 @@ class GitCommand(StatusMixin,
         return os.path.relpath(os.path.realpath(path), start=self.repo_path)
 
     def _include_global_flags(self, args):
-        """
-        Transforms the Git command arguments with flags indicated in the
-        global GitSavvy settings.
-        """
-        git_cmd, *addl_args = args
-
-        global_flags = self.savvy_settings.get("global_flags")
-        global_pre_flags = self.savvy_settings.get("global_pre_flags")
-
-        if global_flags and git_cmd in global_flags:
-            args = [git_cmd] + global_flags[git_cmd] + addl_args
-        else:
-            args = [git_cmd] + list(addl_args)
-
-        if global_pre_flags and git_cmd in global_pre_flags:
-            args = global_pre_flags[git_cmd] + args
-
-        return args
+        return self._invocation_context(self.repo_path).include_global_flags(args)
 
     @property
     def last_remote_used(self):
@@ -0,0 +1,247 @@
+"""
+Locate repositories and their git directories without spawning git.
+
+`find_toplevel` walks up the filesystem looking for a `.git` directory
+(normal repositories) or a `.git` file (worktrees and submodules) and
+caches the answer per directory.  A cached answer is only trusted as long
+as its `.git` marker still exists, so removing a repository (or one of
+its parents) invalidates it automatically.
+
+`fingerprint` summarizes the state of the refs, HEAD, the index and the
+config of a repository from a few `stat` calls.
+"""
+
+import os
+import threading
+import time
+
+
+__all__ = (
+    "find_toplevel",
+    "canonical_path",
+    "resolve_git_dir",
+    "common_dir",
+    "fingerprint",
+    "directories",
+    "invalidate",
+    "stats",
+)
+
+
+MYPY = False
+if MYPY:
+    from typing import Dict, List, Optional, Tuple
+    Directory = str
+    TopLevel = str
+    Marker = str
+
+
+_toplevels = {}  # type: Dict[Directory, Tuple[TopLevel, Marker]]
+_canonical_paths = {}  # type: Dict[str, str]
+_lock = threading.Lock()
+STATS = {
+    "hits": 0,
+    "misses": 0,
+    "invalidations": 0,
+    "fingerprints": 0,
+}  # type: Dict[str, int]
+
+
+def stats():
+    # type: () -> Dict[str, int]
+    with _lock:
+        return dict(STATS, entries=len(_toplevels))
+
+
+def find_toplevel(directory):
+    # type: (str) -> Optional[str]
+    """
+    Return the (real) root of the working tree containing `directory`,
+    like `git rev-parse --show-toplevel` does, or `None`.
+    """
+    with _lock:
+        entry = _toplevels.get(directory)
+    if entry is not None:
+        toplevel, marker = entry
+        if os.path.exists(marker):
+            with _lock:
+                STATS["hits"] += 1
+            return toplevel
+        invalidate(toplevel)
+
+    with _lock:
+        STATS["misses"] += 1
+    entry = _walk_up(directory)
+    if entry is None:
+        # Do not cache negative answers: the user might `git init` any time,
+        # and walking up is cheap compared to the process we replaced.
+        return None
+
+    with _lock:
+        _toplevels[directory] = entry
+    return entry[0]
+
+
+def _walk_up(directory):
+    # type: (str) -> Optional[Tuple[TopLevel, Marker]]
+    current = os.path.realpath(directory)
+    while True:
+        marker = os.path.join(current, ".git")
+        if _is_git_marker(marker):
+            return current, marker
+        parent = os.path.dirname(current)
+        if parent == current:
+            return None
+        current = parent
+
+
+def _is_git_marker(path):
+    # type: (str) -> bool
+    if os.path.isdir(path):
+        return os.path.isfile(os.path.join(path, "HEAD"))
+    if os.path.isfile(path):
+        return _read_gitdir_file(path) is not None
+    return False
+
+
+def _read_gitdir_file(path):
+    # type: (str) -> Optional[str]
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            line = f.readline().strip()
+    except (OSError, UnicodeDecodeError):
+        return None
+    if not line.startswith("gitdir:"):
+        return None
+    return line[7:].strip() or None
+
+
+def resolve_git_dir(toplevel):
+    # type: (str) -> Optional[str]
+    """
+    Return the git directory of the working tree `toplevel`.  For worktrees
+    and submodules, follow the `gitdir:` pointer of the `.git` file.
+    """
+    marker = os.path.join(toplevel, ".git")
+    if os.path.isdir(marker):
+        return marker
+    git_dir = _read_gitdir_file(marker)
+    if git_dir is None:
+        return None
+    return os.path.normpath(os.path.join(toplevel, git_dir))
+
+
+def common_dir(git_dir):
+    # type: (str) -> str
+    """
+    Return the directory holding the refs, objects and config shared by
+    all worktrees, which is `git_dir` itself for the main worktree.
+    """
+    try:
+        with open(os.path.join(git_dir, "commondir"), "r", encoding="utf-8") as f:
+            path = f.readline().strip()
+    except (OSError, UnicodeDecodeError):
+        return git_dir
+    return os.path.normpath(os.path.join(git_dir, path)) if path else git_dir
+
+
+# Filesystems with a coarse mtime resolution can hide a change made right
+# after we looked, so like git's "racy" check we do not trust fresh stats.
+RACY_THRESHOLD = 2.0  # [s]
+
+
+def fingerprint(repo_path):
+    # type: (str) -> Optional[Tuple]
+    """
+    Return a value which changes whenever HEAD, any ref, the index, the
+    stash or the config of the repository changes, or `None` if that
+    cannot be told right now, e.g. because something changed just now.
+    """
+    toplevel = find_toplevel(repo_path)
+    if toplevel is None:
+        return None
+    git_dir = resolve_git_dir(toplevel)
+    if git_dir is None:
+        return None
+    common = common_dir(git_dir)
+
+    paths = [
+        os.path.join(git_dir, "HEAD"),
+        os.path.join(git_dir, "index"),
+        os.path.join(common, "config"),
+        os.path.join(common, "packed-refs"),
+        os.path.join(common, "logs", "refs", "stash"),
+    ]
+    # Updating a loose ref renames a lock file onto it, which touches the
+    # directory, so stat'ing the directories is enough.
+    paths += directories(os.path.join(common, "refs"))
+
+    rv = []  # type: List[Optional[Tuple[int, int, int]]]
+    newest = 0
+    for path in paths:
+        try:
+            st = os.stat(path)
+        except OSError:
+            rv.append(None)
+            continue
+        rv.append((st.st_mtime_ns, st.st_size, st.st_ino))
+        newest = max(newest, st.st_mtime_ns)
+
+    with _lock:
+        STATS["fingerprints"] += 1
+    if time.time() - newest / 1e9 < RACY_THRESHOLD:
+        return None
+    return tuple(rv)
+
+
+def directories(root):
+    # type: (str) -> List[str]
+    rv = [root]
+    try:
+        # `os.scandir` is not available on Python 3.3.
+        names = os.listdir(root)
+    except OSError:
+        return rv
+    for name in names:
+        path = os.path.join(root, name)
+        if os.path.isdir(path) and not os.path.islink(path):
+            rv += directories(path)
+    return rv
+
+
+def canonical_path(path):
+    # type: (str) -> str
+    """
+    Memoized `os.path.realpath` for repository paths.  Entries are dropped
+    by `invalidate`.
+    """
+    try:
+        return _canonical_paths[path]
+    except KeyError:
+        rv = _canonical_paths[path] = os.path.realpath(path)
+        return rv
+
+
+def invalidate(path=None):
+    # type: (Optional[str]) -> None
+    """
+    Forget cached answers for `path` and everything below it, or everything
+    if no `path` is given.
+    """
+    with _lock:
+        STATS["invalidations"] += 1
+        if path is None:
+            _toplevels.clear()
+            _canonical_paths.clear()
+            return
+
+        prefix = path.rstrip(os.sep) + os.sep
+        for directory, (toplevel, _) in list(_toplevels.items()):
+            if (
+                toplevel == path or toplevel.startswith(prefix)
+                or directory == path or directory.startswith(prefix)
+            ):
+                del _toplevels[directory]
+        for p, real in list(_canonical_paths.items()):
+            if real == path or real.startswith(prefix) or p == path or p.startswith(prefix):
+                del _canonical_paths[p]
@@ -1,7 +1,5 @@
-import re
-import string
-
-from .. import store
+from .. import git_refs, status_snapshot, store
+from .status import untracked_scan_dominates
 
 
 MYPY = False
@@ -15,6 +13,12 @@ class ActiveBranchMixin():
         """
         Return the name of the last checkout-out branch.
         """
+        repo_path = self._repo_path_or_none()
+        if repo_path:
+            branch = git_refs.current_branch(repo_path)
+            if branch:
+                return branch
+
         stdout = self.git("branch", "--no-color")
         try:
             correct_line = next(line for line in stdout.split("\n") if line.startswith("*"))
@@ -22,46 +26,6 @@ class ActiveBranchMixin():
         except StopIteration:
             return None
 
-    def _get_branch_status_components(self, lines):
-        """
-        Return a tuple of:
-
-          0) boolean indicating whether repo is in detached state
-          1) active branch name
-          2) remote branch name
-          3) boolean indicating whether branch is clean
-          4) # commits ahead of remote
-          5) # commits behind of remote
-          6) boolean indicating whether the remote branch is gone
-        """
-
-        first_line, *addl_lines = lines
-        # Any additional lines will mean files have changed or are untracked.
-        clean = len(addl_lines) == 0
-
-        if first_line.startswith("## HEAD (no branch)"):
-            return True, None, None, clean, None, None, False
-
-        if (
-            first_line.startswith("## No commits yet on ")
-            # older git used these
-            or first_line.startswith("## Initial commit on ")
-        ):
-            first_line = first_line[:3] + first_line[21:]
-
-        valid_punctuation = "".join(c for c in string.punctuation if c not in "~^:?*[\\")
-        branch_pattern = "[A-Za-z0-9" + re.escape(valid_punctuation) + "\u263a-\U0001f645]+?"
-        branch_suffix = r"( \[((ahead (\d+))(, )?)?(behind (\d+))?(gone)?\])?)"
-        short_status_pattern = "## (" + branch_pattern + r")(\.\.\.(" + branch_pattern + ")" + branch_suffix + "?$"
-        status_match = re.match(short_status_pattern, first_line)
-
-        if not status_match:
-            return False, None if clean else addl_lines[0], None, clean, None, None, False
-
-        branch, _, remote, _, _, _, ahead, _, _, behind, gone = status_match.groups()
-
-        return False, branch, remote, clean, ahead, behind, bool(gone)
-
     def get_branch_status(self, delim=None):
         """
         Return a tuple of:
@@ -76,12 +40,13 @@ class ActiveBranchMixin():
         If a delimeter is provided, join tuple components with it, and return
         that value.
         """
-        lines = self._get_status()
-        branch_status = self._get_branch_status_components(lines)
-        return self._format_branch_status(branch_status, delim)
+        # We don't show whether the branch is clean, so skip looking
+        # for untracked files.
+        snapshot = status_snapshot.get(self, untracked=False)  # type: ignore[arg-type]
+        return self._format_branch_status(snapshot, delim)
 
-    def _format_branch_status(self, branch_status, delim=None):
-        detached, branch, remote, clean, ahead, behind, gone = branch_status
+    def _format_branch_status(self, snapshot, delim=None):
+        detached, branch, remote, clean, ahead, behind, gone = snapshot.status.branch_status
 
         secondary = []
 
@@ -101,26 +66,28 @@ class ActiveBranchMixin():
             elif gone:
                 secondary.append("The remote branch is gone.")
 
-        if self.in_merge():
-            secondary.append("Merging {}.".format(self.merge_head()))
+        if snapshot.merge_head is not None:
+            secondary.append("Merging {}.".format(snapshot.merge_head))
 
-        if self.in_rebase():
-            secondary.append("Rebasing {}.".format(self.rebase_branch_name()))
+        if snapshot.rebase_branch_name is not None:
+            secondary.append("Rebasing {}.".format(snapshot.rebase_branch_name))
 
         if delim:
             return delim.join([status] + secondary) if secondary else status
         return status, secondary
 
     def get_branch_status_short(self):
-        if self.in_rebase():
-            return "(no branch, rebasing {})".format(self.rebase_branch_name())
-
-        lines = self._get_status()
-        branch_status = self._get_branch_status_components(lines)
-        return self._format_branch_status_short(branch_status)
-
-    def _format_branch_status_short(self, branch_status):
-        detached, branch, remote, clean, ahead, behind, gone = branch_status
+        repo_path = self._repo_path_or_none()
+        # Untracked files only add the "dirty" marker, which is not worth
+        # a slow scan, e.g. in a repository with a huge build directory.
+        untracked = not (repo_path and untracked_scan_dominates(repo_path))
+        snapshot = status_snapshot.get(self, untracked=untracked)  # type: ignore[arg-type]
+        if snapshot.rebase_branch_name is not None:
+            return "(no branch, rebasing {})".format(snapshot.rebase_branch_name)
+        return self._format_branch_status_short(snapshot)
+
+    def _format_branch_status_short(self, snapshot):
+        detached, branch, remote, clean, ahead, behind, gone = snapshot.status.branch_status
 
         dirty = "" if clean else "*"
 
@@ -134,15 +101,26 @@ class ActiveBranchMixin():
         if behind:
             output += "-" + behind
 
-        merge_head = self.merge_head() if self.in_merge() else ""
+        merge_head = snapshot.merge_head
         return output if not merge_head else output + " (merging {})".format(merge_head)
 
     def get_commit_hash_for_head(self):
         """
         Get the SHA1 commit hash for the commit at HEAD.
         """
+        repo_path = self._repo_path_or_none()
+        if repo_path:
+            commit_hash = git_refs.head_commit(repo_path)
+            if commit_hash:
+                return commit_hash
+        return self._rev_parse_head()
+
+    @store.memoize_by_repo_state
+    def _rev_parse_head(self):
+        # type: () -> str
         return self.git("rev-parse", "HEAD").strip()
 
+    @store.memoize_by_repo_state
     def get_latest_commit_msg_for_head(self):
         """
         Get last commit msg for the commit at HEAD.
@@ -164,6 +142,7 @@ class ActiveBranchMixin():
 
         return stdout or "No commits yet."
 
+    @store.memoize_by_repo_state
     def get_upstream_for_active_branch(self):
         """
         Return ref for remote tracking branch.
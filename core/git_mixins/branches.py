@@ -1,6 +1,8 @@
 from collections import namedtuple
 import re
 
+from .. import store
+
 
 MYPY = False
 if MYPY:
@@ -23,33 +25,34 @@ Branch = namedtuple("Branch", (
 
 class BranchesMixin():
 
+    @store.memoize_by_repo_state
     def get_branches(self, sort_by_recent=False, fetch_descriptions=False):
         # type: (bool, bool) -> Iterable[Branch]
         """
         Return a list of all local and remote branches.
         """
-        stdout = self.git(
+        lines = self.git_streaming(
             "for-each-ref",
             "--format=%(HEAD)%00%(refname)%00%(upstream)%00%(upstream:track)%00%(objectname)%00%(contents:subject)",
             "--sort=-committerdate" if sort_by_recent else None,
             "refs/heads",
             "refs/remotes")
-        branches = (
+        # Parse while git is still writing, but do not hand out a generator
+        # which would keep the process alive for as long as the caller
+        # holds on to it.
+        branches = [
             branch
-            for branch in (
-                self._parse_branch_line(line)
-                for line in stdout.split("\n")
-            )
+            for branch in map(self._parse_branch_line, lines)
             if branch and branch.name != "HEAD"
-        )
+        ]
         if not fetch_descriptions:
             return branches
 
         descriptions = self.fetch_branch_description_subjects()
-        return (
+        return [
             branch._replace(description=descriptions.get(branch.name_with_remote, ""))
             for branch in branches
-        )
+        ]
 
     def fetch_branch_description_subjects(self):
         # type: () -> Dict[str, str]
@@ -38,7 +38,7 @@ class HistoryMixin():
             diff_regexp=None, first_parent=False, merges=False, no_merges=False, topo_order=False,
             follow=False):
 
-        log_output = self.git(
+        records = self.git_streaming(
             "log",
             "--max-count={}".format(limit) if limit else None,
             "--skip={}".format(skip) if skip else None,
@@ -58,11 +58,12 @@ class HistoryMixin():
             "{}..{}".format(*start_end) if start_end else None,
             branch if branch else None,
             "--" if file_path else None,
-            file_path if file_path else None
-        ).strip("\x00")
+            file_path if file_path else None,
+            separator="\x00\x00\n"
+        )
 
         entries = []
-        for entry in log_output.split("\x00\x00\n"):
+        for entry in records:
             entry = entry.strip()
             if not entry:
                 continue
@@ -87,16 +88,17 @@ class HistoryMixin():
             skip = skip + limit
 
     def reflog(self, limit=6000, skip=None, all_branches=False):
-        log_output = self.git(
+        records = self.git_streaming(
             "reflog",
             "-{}".format(self._limit),
             "--skip={}".format(skip) if skip else None,
             '--format=%h%n%H%n%s%n%gs%n%gd%n%an%n%at%x00%x00%n',
             "--all" if all_branches else None,
-        ).strip("\x00")
+            separator="\x00\x00\n"
+        )
 
         entries = []
-        for entry in log_output.split("\x00\x00\n"):
+        for entry in records:
             entry = entry.strip()
             if not entry:
                 continue
@@ -201,18 +203,46 @@ class HistoryMixin():
         if not commit_hash or commit_hash == "HEAD":
             return self._get_file_content_at_commit(filename, commit_hash)
 
-        key = ("get_file_content_at_commit", self.repo_path, filename, commit_hash)
-        try:
-            return store.cache[key]
-        except KeyError:
-            rv = store.cache[key] = self._get_file_content_at_commit(filename, commit_hash)
-            return rv
+        return store.get_immutable(
+            self.repo_path,
+            ("get_file_content_at_commit", filename, commit_hash),
+            lambda: self._get_file_content_at_commit(filename, commit_hash),
+            persist=store.is_commit_hash(commit_hash)
+        )
 
     def _get_file_content_at_commit(self, filename, commit_hash):
         # type: (str, Optional[str]) -> str
         filename = self.get_rel_path(filename)
         filename = filename.replace('\\', '/')
-        return self.git("show", "{}:{}".format(commit_hash or "", filename))
+        object_name = "{}:{}".format(commit_hash or "", filename)
+        contents = self._read_blob(object_name)
+        if contents is None:
+            return self.git("show", object_name)
+        return self.decode_stdout(contents)
+
+    def _read_blob(self, object_name):
+        # type: (str) -> Optional[bytes]
+        """
+        Read a blob through the batch process of the repo.  Return `None`
+        if the object is not a blob or the batch process is not usable so
+        that the caller can fallback to the (error reporting) `git show`.
+        """
+        try:
+            rv = self.read_object(object_name)
+        except OSError:
+            return None
+        if rv is None:
+            return None
+        object_type, contents = rv
+        return contents if object_type == "blob" else None
+
+    def _read_object_hash(self, object_name):
+        # type: (str) -> Optional[str]
+        try:
+            rv = self.read_object_info(object_name)
+        except OSError:
+            return None
+        return rv[0] if rv else None
 
     def find_matching_lineno(self, base_commit="HEAD", target_commit="HEAD", line=1, file_path=None):
         # type: (Optional[str], Optional[str], int, str) -> int
@@ -249,12 +279,16 @@ class HistoryMixin():
         ):
             return self._no_context_diff(base_commit, target_commit, file_path)
 
-        key = ("no_context_diff", base_commit, target_commit, file_path)
-        try:
-            return store.cache[key]
-        except KeyError:
-            rv = store.cache[key] = self._no_context_diff(base_commit, target_commit, file_path)
-            return rv
+        # The commits identify the diff; the repo only selects the partition.
+        # The output also depends on the diff config, e.g. `diff.algorithm`,
+        # so keep it in memory only.
+        repo_path = getattr(self, "repo_path", None)
+        return store.get_immutable(
+            repo_path,
+            ("no_context_diff", base_commit, target_commit, file_path),
+            lambda: self._no_context_diff(base_commit, target_commit, file_path),
+            persist=False
+        )
 
     def _no_context_diff(self, base_commit, target_commit, file_path=None):
         # type: (Optional[str], Optional[str], Optional[str]) -> str
@@ -332,24 +366,26 @@ class HistoryMixin():
 
         key = (
             "read_commit",
-            self.repo_path,
             commit_hash,
             file_path,
             show_diffstat,
             show_patch,
             ignore_whitespace
         )
-        try:
-            return store.cache[key]
-        except KeyError:
-            rv = store.cache[key] = self._read_commit(
+        # Decorations, the mailmap and the diff config change the output
+        # without the commit changing, so keep it in memory only.
+        return store.get_immutable(
+            self.repo_path,
+            key,
+            lambda: self._read_commit(
                 commit_hash,
                 file_path,
                 show_diffstat,
                 show_patch,
                 ignore_whitespace
-            )
-            return rv
+            ),
+            persist=False
+        )
 
     def _read_commit(self, commit_hash, file_path, show_diffstat, show_patch, ignore_whitespace):
         # type: (str, Optional[str], bool, bool, bool) -> str
@@ -370,12 +406,12 @@ class HistoryMixin():
         if not current_commit or current_commit == "HEAD":
             return self._previous_commit(current_commit, file_path, follow)
 
-        key = ("previous_commit", self.repo_path, current_commit, file_path, follow)
-        try:
-            return store.cache[key]
-        except KeyError:
-            rv = store.cache[key] = self._previous_commit(current_commit, file_path, follow)
-            return rv
+        return store.get_immutable(
+            self.repo_path,
+            ("previous_commit", current_commit, file_path, follow),
+            lambda: self._previous_commit(current_commit, file_path, follow),
+            persist=store.is_commit_hash(current_commit)
+        )
 
     def _previous_commit(self, current_commit, file_path, follow):
         # type: (str, str, bool) -> Optional[str]
@@ -437,12 +473,7 @@ class HistoryMixin():
         git's internal object hash associated with the version of that
         file in the HEAD.
         """
-        stdout = self.git("ls-tree", "HEAD", file_path)
-
-        # 100644 blob 7317069f30eafd4d7674612679322d59f9fb65a4    SomeFile.py
-        #             ^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^
-        git_file_entry = stdout.split()  # split by spaces and tabs
-        return git_file_entry[2]
+        return self.get_commit_file_object("HEAD", file_path)
 
     def get_commit_file_object(self, commit, file_path):
         """
@@ -450,6 +481,12 @@ class HistoryMixin():
         git's internal object hash associated with the version of that
         file in the commit.
         """
+        object_hash = self._read_object_hash(
+            "{}:{}".format(commit, self.get_rel_path(file_path).replace('\\', '/'))
+        )
+        if object_hash:
+            return object_hash
+
         stdout = self.git("ls-tree", commit, file_path)
 
         # 100644 blob 7317069f30eafd4d7674612679322d59f9fb65a4    SomeFile.py
@@ -462,7 +499,10 @@ class HistoryMixin():
         Given the object hash to a versioned object in the current git repo,
         display the contents of that object.
         """
-        return self.git("show", "--no-color", object_hash)
+        contents = self._read_blob(object_hash)
+        if contents is None:
+            return self.git("show", "--no-color", object_hash)
+        return self.decode_stdout(contents)
 
     def get_object_from_string(self, string):
         """
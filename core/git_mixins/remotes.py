@@ -1,9 +1,12 @@
 import re
 from collections import OrderedDict
 
+from .. import store
+
 
 class RemotesMixin():
 
+    @store.memoize_by_repo_state
     def get_remotes(self):
         """
         Get a list of remotes, provided as tuples of remote name and remote
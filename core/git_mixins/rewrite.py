@@ -2,6 +2,8 @@ import os
 import shutil
 from types import SimpleNamespace
 
+from .. import git_refs
+
 
 class RewriteTemplate(SimpleNamespace):
     # orig_hash
@@ -177,20 +179,27 @@ class RewriteMixin():
             if os.path.exists(self._rebase_replay_dir):
                 shutil.rmtree(self._rebase_replay_dir)
 
+    @property
+    def _git_dir(self):
+        return (
+            git_refs.worktree_git_dir(self.repo_path)
+            or os.path.join(self.repo_path, ".git")
+        )
+
     @property
     def _rebase_replay_dir(self):
         """
         A directory to store meta data for `rewrite_active_branch`
         """
-        return os.path.join(self.repo_path, ".git", "rebase-replay")
+        return os.path.join(self._git_dir, "rebase-replay")
 
     @property
     def _rebase_apply_dir(self):
-        return os.path.join(self.repo_path, ".git", "rebase-apply")
+        return os.path.join(self._git_dir, "rebase-apply")
 
     @property
     def _rebase_merge_dir(self):
-        return os.path.join(self.repo_path, ".git", "rebase-merge")
+        return os.path.join(self._git_dir, "rebase-merge")
 
     @property
     def _rebase_dir(self):
@@ -1,15 +1,16 @@
 class StageUnstageMixin():
 
-    def stage_file(self, *fpath, force=True):
-        # type: (str, bool) -> None
+    def stage_file(self, *fpath, force=True, update=False):
+        # type: (str, bool, bool) -> None
         """
         Given an absolute path or path relative to the repo's root, stage
-        the file.
+        the file.  With `update`, only stage the files git already tracks,
+        e.g. for a whole directory.
         """
         self.git(
             "add",
             "-f" if force else None,
-            "--all",
+            "--update" if update else "--all",
             "--",
             *fpath
         )
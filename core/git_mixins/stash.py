@@ -1,11 +1,15 @@
 import re
 from collections import namedtuple
 
+from .. import store
+
+
 Stash = namedtuple("Stash", ("id", "description"))
 
 
 class StashMixin():
 
+    @store.memoize_by_repo_state
     def get_stashes(self):
         """
         Return a list of stashes in the repo.
@@ -1,8 +1,25 @@
 import os
 from collections import namedtuple
+import threading
+import time
+
+from .. import git_probe, git_refs, status_snapshot
 from ..constants import MERGE_CONFLICT_PORCELAIN_STATUSES
+from ..parse_status import FileStatus, parse_status
+
+
+MYPY = False
+if MYPY:
+    from typing import Dict, List
+    from ..parse_status import WorkingDirStatus
+
+
+__all__ = (
+    "FileStatus",
+    "IndexedEntry",
+    "StatusMixin",
+)
 
-FileStatus = namedtuple("FileStatus", ("path", "path_alt", "index_status", "working_status"))
 
 IndexedEntry = namedtuple("IndexEntry", (
     "src_path",
@@ -16,27 +33,93 @@ IndexedEntry = namedtuple("IndexEntry", (
 ))
 IndexedEntry.__new__.__defaults__ = (None, ) * 8
 
+# If listing the untracked files makes `git status` this many times
+# slower, and it is slow at all, we skip them where we can.
+UNTRACKED_DOMINATES_FACTOR = 4
+SLOW_STATUS = 0.5  # [s]
+# Weight of the latest run in the moving average of the durations.
+TIMING_WEIGHT = 0.3
+# Repo path -> average duration of `git status` with and without
+# untracked files.
+_status_timings = {}  # type: Dict[str, Dict[bool, float]]
+_status_timings_lock = threading.Lock()
+
+
+def record_status_timing(repo_path, untracked, duration):
+    # type: (str, bool, float) -> None
+    with _status_timings_lock:
+        timings = _status_timings.setdefault(repo_path, {})
+        previous = timings.get(untracked)
+        timings[untracked] = (
+            duration if previous is None
+            else previous + TIMING_WEIGHT * (duration - previous)
+        )
+
+
+def untracked_scan_dominates(repo_path):
+    # type: (str) -> bool
+    """
+    Return whether scanning for untracked files makes up most of the
+    time of `git status` in `repo_path`, e.g. in a repository with a
+    huge, not ignored build directory.
+    """
+    with _status_timings_lock:
+        timings = _status_timings.get(repo_path, {})
+        full, tracked_only = timings.get(True), timings.get(False)
+    return (
+        full is not None
+        and tracked_only is not None
+        and full > SLOW_STATUS
+        and full > UNTRACKED_DOMINATES_FACTOR * tracked_only
+    )
+
 
 class StatusMixin():
 
-    def _get_status(self):
-        return self.git("status", "--porcelain", "-z", "-b",
-                        custom_environ={"GIT_OPTIONAL_LOCKS": "0"}).rstrip("\x00").split("\x00")
+    def _get_status(self, untracked=True):
+        # type: (bool) -> List[str]
+        """
+        Return the NUL separated records of `git status`, in porcelain v2
+        if git supports it.  Without `untracked` files git runs a lot
+        faster in some repositories.
+        """
+        args = ["status", "-z", "--branch"]
+        if git_probe.supports("status_porcelain_v2"):
+            args.append("--porcelain=v2")
+            if git_probe.supports("status_show_stash"):
+                args.append("--show-stash")
+        else:
+            args.append("--porcelain")
+        if not untracked:
+            args.append("--untracked-files=no")
+
+        start = time.perf_counter()
+        stdout = self.git(*args, custom_environ={"GIT_OPTIONAL_LOCKS": "0"})
+        repo_path = self._repo_path_or_none()
+        if repo_path:
+            record_status_timing(repo_path, untracked, time.perf_counter() - start)
+        return stdout.rstrip("\x00").split("\x00")
 
     def _parse_status_for_file_statuses(self, lines):
-        porcelain_entries = lines[1:].__iter__()
-        entries = []
-
-        for entry in porcelain_entries:
-            if not entry:
-                continue
-            index_status = entry[0]
-            working_status = entry[1].strip() or None
-            path = entry[3:]
-            path_alt = porcelain_entries.__next__() if index_status in ["R", "C"] else None
-            entries.append(FileStatus(path, path_alt, index_status, working_status))
+        # type: (List[str]) -> List[FileStatus]
+        return parse_status(lines).files
 
-        return entries
+    def get_working_dir_status(self, untracked=True):
+        # type: (bool) -> WorkingDirStatus
+        """
+        Return the branch status, the changed files and, with a recent
+        git, the number of stashes, all from one `git status` call.
+        """
+        lines = self._get_status(untracked)
+        status = parse_status(lines)
+        if (
+            status.stash_count is None
+            and lines[0].startswith("# ")
+            and git_probe.supports("status_show_stash")
+        ):
+            # git omits the header if there are no stashes.
+            status = status._replace(stash_count=0)
+        return status
 
     def get_status(self):
         """
@@ -45,9 +128,8 @@ class StatusMixin():
         5) renamed, or 6) copied as well as additional status information that can
         occur mid-merge.
         """
-
-        lines = self._get_status()
-        return self._parse_status_for_file_statuses(lines)
+        # Commands act on these files, so don't hand out a cached status.
+        return status_snapshot.get(self, fresh=True).status.files  # type: ignore[arg-type]
 
     def _get_indexed_entry(self, raw_entry):
         """
@@ -121,10 +203,20 @@ class StatusMixin():
         return staged, unstaged, untracked, conflicts
 
     def in_merge(self):
+        state = git_refs.operation_state(self.repo_path)
+        if state is not None:
+            return state.merge_head is not None
         return os.path.exists(os.path.join(self.repo_path, ".git", "MERGE_HEAD"))
 
     def merge_head(self):
-        path = os.path.join(self.repo_path, ".git", "MERGE_HEAD")
-        with open(path, "r") as f:
-            commit_hash = f.read().strip()
+        state = git_refs.operation_state(self.repo_path)
+        if state is not None and state.merge_head:
+            commit_hash = state.merge_head
+        else:
+            path = os.path.join(self.repo_path, ".git", "MERGE_HEAD")
+            with open(path, "r") as f:
+                commit_hash = f.read().strip()
+        # The only call to git left: the abbreviation length depends on
+        # the number of objects, so `get_short_hash` asks git once per
+        # repository and slices the hashes itself from then on.
         return self.get_short_hash(commit_hash)
@@ -2,6 +2,8 @@ import re
 from collections import namedtuple
 from distutils.version import LooseVersion
 
+from .. import store
+
 
 TagDetails = namedtuple("TagDetails", ("sha", "tag"))
 
@@ -14,6 +16,15 @@ class TagsMixin():
         to all tags found in the repository, containing abbreviated
         hashes and reference names.
         """
+        if remote:
+            return self._get_tags(remote, reverse)
+        return self._get_local_tags(reverse)
+
+    @store.memoize_by_repo_state
+    def _get_local_tags(self, reverse):
+        return self._get_tags(None, reverse)
+
+    def _get_tags(self, remote, reverse):
         stdout = self.git(
             "ls-remote" if remote else "show-ref",
             "--tags",
@@ -0,0 +1,203 @@
+"""
+Find the git binary, and probe its version and capabilities once.
+
+The results are persisted in Sublime's cache directory, keyed by the
+binary's path, mtime and size, so that neither a restart nor a hot
+reload of the plugin has to spawn `git --version` again.  Capabilities
+are derived from the version, and can be corrected with
+`mark_unsupported` if a feature turns out to be missing anyway.
+"""
+
+from collections import namedtuple
+import json
+import os
+import re
+import shutil
+import subprocess
+import threading
+
+import sublime
+
+
+__all__ = (
+    "GitInfo",
+    "FEATURES",
+    "resolve",
+    "probe",
+    "supports",
+    "mark_unsupported",
+    "current",
+)
+
+
+MYPY = False
+if MYPY:
+    from typing import Any, Dict, Optional, Tuple
+
+
+GitInfo = namedtuple("GitInfo", ("path", "version", "capabilities"))
+
+CACHE_FORMAT = 1
+# Feature -> the first git version which has it.
+FEATURES = {
+    "status_porcelain_v2": (2, 11, 0),
+    "date_human": (2, 21, 0),
+    "for_each_ref_worktreepath": (2, 23, 0),
+    "status_show_stash": (2, 35, 0),
+    "merge_tree_write_tree": (2, 38, 0),
+    "for_each_ref_ahead_behind": (2, 41, 0),
+}
+
+_lock = threading.Lock()
+_entries = None  # type: Optional[Dict[str, Any]]
+_current = None  # type: Optional[GitInfo]
+
+
+def cache_file():
+    # type: () -> str
+    return os.path.join(sublime.cache_path(), "GitSavvy", "git_probe.json")
+
+
+def current():
+    # type: () -> Optional[GitInfo]
+    return _current
+
+
+def supports(feature):
+    # type: (str) -> bool
+    info = _current
+    return bool(info and info.capabilities.get(feature))
+
+
+def resolve(git_path=None):
+    # type: (Optional[str]) -> Optional[GitInfo]
+    """
+    Return info about `git_path`, or the git binary on the PATH if none is
+    given, or `None` if it cannot be run.
+    """
+    global _current
+    info = probe(git_path or _which_git())
+    _current = info
+    return info
+
+
+def probe(git_path):
+    # type: (Optional[str]) -> Optional[GitInfo]
+    if not git_path:
+        return None
+    if not os.path.isabs(git_path):
+        git_path = shutil.which(git_path) or git_path
+    key = _binary_key(git_path)
+
+    with _lock:
+        entry = _load()["binaries"].get(git_path)
+    if key is not None and entry is not None and entry["key"] == list(key):
+        return GitInfo(git_path, tuple(entry["version"]), entry["capabilities"])
+
+    version = _run_version(git_path)
+    if version is None:
+        return None
+    capabilities = {
+        feature: bool(version) and version >= min_version
+        for feature, min_version in FEATURES.items()
+    }
+    if key is not None:
+        with _lock:
+            _load()["binaries"][git_path] = {
+                "key": list(key),
+                "version": list(version),
+                "capabilities": capabilities,
+            }
+            _save()
+    return GitInfo(git_path, version, capabilities)
+
+
+def mark_unsupported(feature):
+    # type: (str) -> None
+    info = _current
+    if info is None:
+        return
+    info.capabilities[feature] = False
+    with _lock:
+        entry = _load()["binaries"].get(info.path)
+        if entry is not None:
+            entry["capabilities"][feature] = False
+            _save()
+
+
+def _which_git():
+    # type: () -> Optional[str]
+    path_env = os.environ.get("PATH", "")
+    with _lock:
+        found = _load()["which"].get(path_env)
+    if found and os.path.isfile(found):
+        return found
+
+    found = shutil.which("git")
+    if found:
+        with _lock:
+            _load()["which"][path_env] = found
+            _save()
+    return found
+
+
+def _binary_key(git_path):
+    # type: (str) -> Optional[Tuple[int, int]]
+    try:
+        st = os.stat(git_path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _run_version(git_path):
+    # type: (str) -> Optional[Tuple[int, ...]]
+    """
+    Return the version of `git_path`, an empty tuple if we cannot parse
+    it, or `None` if it cannot be run at all.
+    """
+    try:
+        startupinfo = None
+        if os.name == "nt":
+            startupinfo = subprocess.STARTUPINFO()  # type: ignore[attr-defined]
+            startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW  # type: ignore[attr-defined]
+
+        stdout = subprocess.check_output(
+            [git_path, "--version"],
+            stderr=subprocess.PIPE,
+            startupinfo=startupinfo).decode("utf-8")
+    except Exception:
+        return None
+
+    match = re.match(r"git version ([0-9]+)\.([0-9]+)\.([0-9]+)", stdout)
+    return tuple(map(int, match.groups())) if match else ()
+
+
+def _load():
+    # type: () -> Dict[str, Any]
+    # Must be called with the lock held.
+    global _entries
+    if _entries is None:
+        try:
+            with open(cache_file(), "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            entries = None
+        if not isinstance(entries, dict) or entries.get("format") != CACHE_FORMAT:
+            entries = {"format": CACHE_FORMAT, "which": {}, "binaries": {}}
+        _entries = entries
+    return _entries
+
+
+def _save():
+    # type: () -> None
+    # Must be called with the lock held.
+    path = cache_file()
+    tmp_path = path + ".tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(_entries, f, indent=2)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
@@ -0,0 +1,269 @@
+"""
+Read HEAD, refs and the state of in-progress operations directly from the
+git directory, without spawning git.
+
+Every reader returns `None` if it cannot answer, e.g. for repositories
+using the reftable backend, for broken or unknown files, or when the ref
+does not exist; callers fall back to asking git then.  File contents are
+cached by their `stat`, so asking repeatedly, e.g. on every view
+activation, costs a few `stat` calls.
+"""
+
+from collections import namedtuple
+import os
+import re
+import stat
+import threading
+import time
+
+from . import git_dir
+
+
+__all__ = (
+    "OperationState",
+    "worktree_git_dir",
+    "read_head",
+    "resolve_ref",
+    "current_branch",
+    "head_commit",
+    "operation_state",
+    "stats",
+)
+
+
+MYPY = False
+if MYPY:
+    from typing import Dict, Optional, Tuple
+    StatKey = Tuple[int, int, int]
+
+
+OperationState = namedtuple("OperationState", (
+    "merge_head",
+    "cherry_pick_head",
+    "revert_head",
+    "rebase",  # None, "apply" or "merge"
+    "rebase_head_name",
+))
+
+HASH_RE = re.compile(r"^(?:[0-9a-f]{40}|[0-9a-f]{64})$")
+SYMREF_PREFIX = "ref: "
+MAX_SYMREF_DEPTH = 5
+# Refs which exist per worktree; all others live in the common directory.
+PER_WORKTREE_PREFIXES = ("refs/bisect/", "refs/worktree/", "refs/rewritten/")
+
+_files = {}  # type: Dict[str, Tuple[StatKey, Optional[str]]]
+_packed_refs = {}  # type: Dict[str, Tuple[StatKey, Dict[str, str]]]
+_lock = threading.Lock()
+STATS = {
+    "hits": 0,
+    "misses": 0,
+}  # type: Dict[str, int]
+
+
+def stats():
+    # type: () -> Dict[str, int]
+    with _lock:
+        return dict(STATS, entries=len(_files) + len(_packed_refs))
+
+
+def worktree_git_dir(repo_path):
+    # type: (str) -> Optional[str]
+    """
+    Return the git directory of the worktree at `repo_path`, following
+    `gitdir:` files of linked worktrees and submodules.
+    """
+    toplevel = git_dir.find_toplevel(repo_path)
+    if toplevel is None:
+        return None
+    return git_dir.resolve_git_dir(toplevel)
+
+
+def read_head(repo_path):
+    # type: (str) -> Optional[str]
+    """
+    Return the raw content of HEAD, either "ref: <refname>" or a hash.
+    """
+    dirs = _git_dirs(repo_path)
+    if dirs is None:
+        return None
+    return _read_file(os.path.join(dirs[0], "HEAD"))
+
+
+def resolve_ref(repo_path, ref):
+    # type: (str, str) -> Optional[str]
+    """
+    Return the commit hash `ref` points to, following symbolic refs.
+    `ref` must be a full refname, e.g. "refs/heads/master", or a
+    pseudo-ref like "HEAD" or "MERGE_HEAD".
+    """
+    dirs = _git_dirs(repo_path)
+    if dirs is None:
+        return None
+    return _resolve(dirs, ref, MAX_SYMREF_DEPTH)
+
+
+def current_branch(repo_path):
+    # type: (str) -> Optional[str]
+    """
+    Return the short name of the checked out branch.  Return `None` if HEAD
+    is detached, or if the branch does not have any commits yet.
+    """
+    content = read_head(repo_path)
+    if content is None or not content.startswith(SYMREF_PREFIX):
+        return None
+    ref = content[len(SYMREF_PREFIX):].strip()
+    if not ref.startswith("refs/heads/"):
+        return None
+    if resolve_ref(repo_path, ref) is None:
+        return None
+    return ref[len("refs/heads/"):]
+
+
+def head_commit(repo_path):
+    # type: (str) -> Optional[str]
+    return resolve_ref(repo_path, "HEAD")
+
+
+def operation_state(repo_path):
+    # type: (str) -> Optional[OperationState]
+    """
+    Tell which merge, cherry-pick, revert or rebase is in progress.
+    """
+    dirs = _git_dirs(repo_path)
+    if dirs is None:
+        return None
+    private = dirs[0]
+
+    rebase = None
+    rebase_head_name = None
+    for kind in ("merge", "apply"):
+        rebase_dir = os.path.join(private, "rebase-" + kind)
+        if os.path.isdir(rebase_dir):
+            rebase = kind
+            head_name = _read_file(os.path.join(rebase_dir, "head-name"))
+            if head_name:
+                rebase_head_name = head_name.strip().replace("refs/heads/", "")
+            break
+
+    return OperationState(
+        _read_hash(os.path.join(private, "MERGE_HEAD")),
+        _read_hash(os.path.join(private, "CHERRY_PICK_HEAD")),
+        _read_hash(os.path.join(private, "REVERT_HEAD")),
+        rebase,
+        rebase_head_name,
+    )
+
+
+def _git_dirs(repo_path):
+    # type: (str) -> Optional[Tuple[str, str]]
+    private = worktree_git_dir(repo_path)
+    if private is None:
+        return None
+    common = git_dir.common_dir(private)
+    if os.path.isdir(os.path.join(common, "reftable")):
+        # HEAD and refs/ only hold placeholders in these repositories.
+        return None
+    return private, common
+
+
+def _resolve(dirs, ref, depth):
+    # type: (Tuple[str, str], str, int) -> Optional[str]
+    if depth < 0:
+        return None
+    private, common = dirs
+    if "/" not in ref or ref.startswith(PER_WORKTREE_PREFIXES):
+        base = private
+    else:
+        base = common
+    content = _read_file(os.path.join(base, *ref.split("/")))
+    if content is None:
+        if not ref.startswith("refs/"):
+            return None
+        content = _read_packed_refs(common).get(ref)
+        if content is None:
+            return None
+
+    content = content.strip()
+    if content.startswith(SYMREF_PREFIX):
+        return _resolve(dirs, content[len(SYMREF_PREFIX):].strip(), depth - 1)
+    return content if HASH_RE.match(content) else None
+
+
+def _read_hash(path):
+    # type: (str) -> Optional[str]
+    content = _read_file(path)
+    if content is None:
+        return None
+    # MERGE_HEAD lists one line per merged commit, the first one wins.
+    first_line = content.split("\n", 1)[0].strip()
+    return first_line if HASH_RE.match(first_line) else None
+
+
+def _stat_key(path):
+    # type: (str) -> Optional[StatKey]
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    if not stat.S_ISREG(st.st_mode):
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def _is_racy(key):
+    # type: (StatKey) -> bool
+    return time.time() - key[0] / 1e9 < git_dir.RACY_THRESHOLD
+
+
+def _read_file(path):
+    # type: (str) -> Optional[str]
+    key = _stat_key(path)
+    if key is None:
+        return None
+    with _lock:
+        entry = _files.get(path)
+        if entry is not None and entry[0] == key:
+            STATS["hits"] += 1
+            return entry[1]
+        STATS["misses"] += 1
+
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            content = f.read()  # type: Optional[str]
+    except (OSError, UnicodeDecodeError):
+        content = None
+    if not _is_racy(key):
+        with _lock:
+            _files[path] = (key, content)
+    return content
+
+
+def _read_packed_refs(common):
+    # type: (str) -> Dict[str, str]
+    path = os.path.join(common, "packed-refs")
+    key = _stat_key(path)
+    if key is None:
+        return {}
+    with _lock:
+        entry = _packed_refs.get(path)
+        if entry is not None and entry[0] == key:
+            STATS["hits"] += 1
+            return entry[1]
+        STATS["misses"] += 1
+
+    refs = {}  # type: Dict[str, str]
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                # Skip the header and the peeled values of annotated tags.
+                if line.startswith(("#", "^")):
+                    continue
+                commit_hash, _, ref = line.rstrip("\n").partition(" ")
+                if ref:
+                    refs[ref] = commit_hash
+    except (OSError, UnicodeDecodeError):
+        return {}
+    if not _is_racy(key):
+        with _lock:
+            _packed_refs[path] = (key, refs)
+    return refs
@@ -0,0 +1,361 @@
+"""
+Watch the git directories of open repositories and publish what changed.
+
+On Linux we ask the kernel via inotify, elsewhere (or if that fails) we
+poll a handful of `stat`s.  Listeners receive the repo path and a set of
+change kinds, coalesced over a short quiet period, so that a `git commit`
+in a terminal results in one event, not in dozens.
+
+The working tree itself is not watched; editors report saved files via
+`notify(repo_path, {WORKTREE})`.
+"""
+
+import ctypes
+import ctypes.util
+from collections import OrderedDict
+import os
+import select
+import struct
+import sys
+import threading
+import traceback
+
+from . import git_dir, git_refs
+
+
+__all__ = (
+    "INDEX",
+    "HEAD",
+    "REFS",
+    "WORKTREE",
+    "ALL_CHANGES",
+    "watch",
+    "is_watched",
+    "notify",
+    "generation",
+    "add_listener",
+    "remove_listener",
+    "stop_all",
+)
+
+
+MYPY = False
+if MYPY:
+    from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+    Listener = Callable[[str, FrozenSet[str]], None]
+
+
+INDEX = "index"
+HEAD = "head"
+REFS = "refs"
+WORKTREE = "worktree"
+ALL_CHANGES = frozenset((INDEX, HEAD, REFS, WORKTREE))
+
+MAX_WATCHED_REPOS = 8
+POLL_INTERVAL = 1.0  # [s]
+QUIET_PERIOD = 0.1  # [s]
+
+OPERATION_FILES = ("HEAD", "MERGE_HEAD", "CHERRY_PICK_HEAD", "REVERT_HEAD")
+OPERATION_DIRS = ("rebase-merge", "rebase-apply")
+
+_watchers = OrderedDict()  # type: OrderedDict[str, RepoWatcher]
+_generations = {}  # type: Dict[Tuple[str, str], int]
+_listeners = []  # type: List[Listener]
+_lock = threading.Lock()
+
+
+def watch(repo_path):
+    # type: (str) -> bool
+    """
+    Ensure `repo_path` is watched.  Only the most recently requested
+    repositories are watched, older ones are dropped.
+    """
+    with _lock:
+        watcher = _watchers.get(repo_path)
+        if watcher is not None:
+            _watchers.move_to_end(repo_path)
+            return True
+
+    watcher = RepoWatcher.start(repo_path)
+    if watcher is None:
+        return False
+
+    with _lock:
+        _watchers[repo_path] = watcher
+        evicted = []
+        while len(_watchers) > MAX_WATCHED_REPOS:
+            evicted.append(_watchers.popitem(last=False)[1])
+    for w in evicted:
+        w.stop()
+    return True
+
+
+def is_watched(repo_path):
+    # type: (str) -> bool
+    with _lock:
+        return repo_path in _watchers
+
+
+def stop_all():
+    # type: () -> None
+    with _lock:
+        watchers = list(_watchers.values())
+        _watchers.clear()
+    for watcher in watchers:
+        watcher.stop()
+
+
+def add_listener(fn):
+    # type: (Listener) -> None
+    with _lock:
+        if fn not in _listeners:
+            _listeners.append(fn)
+
+
+def remove_listener(fn):
+    # type: (Listener) -> None
+    with _lock:
+        if fn in _listeners:
+            _listeners.remove(fn)
+
+
+def generation(repo_path, kinds=ALL_CHANGES):
+    # type: (str, Iterable[str]) -> int
+    """
+    Return a counter which increases whenever one of `kinds` changes.
+    """
+    with _lock:
+        return sum(_generations.get((repo_path, kind), 0) for kind in kinds)
+
+
+def notify(repo_path, kinds):
+    # type: (str, Iterable[str]) -> None
+    kinds = frozenset(kinds)
+    if not kinds:
+        return
+    with _lock:
+        for kind in kinds:
+            key = (repo_path, kind)
+            _generations[key] = _generations.get(key, 0) + 1
+        listeners = list(_listeners)
+    for fn in listeners:
+        try:
+            fn(repo_path, kinds)
+        except Exception:
+            traceback.print_exc()
+
+
+class RepoWatcher:
+    def __init__(self, repo_path, private_dir, common_dir):
+        # type: (str, str, str) -> None
+        self.repo_path = repo_path
+        self.private_dir = private_dir
+        self.common_dir = common_dir
+        self.refs_dir = os.path.join(common_dir, "refs")
+        self.head_commit = git_refs.head_commit(repo_path)
+        self._stopped = threading.Event()
+        self.backend = None  # type: Optional[str]
+
+    @classmethod
+    def start(cls, repo_path):
+        # type: (str) -> Optional[RepoWatcher]
+        private_dir = git_refs.worktree_git_dir(repo_path)
+        if private_dir is None:
+            return None
+        self = cls(repo_path, private_dir, git_dir.common_dir(private_dir))
+        inotify = Inotify.create()
+        if inotify is not None:
+            self.backend = "inotify"
+            target = lambda: self._run_inotify(inotify)  # noqa: E731
+        else:
+            self.backend = "polling"
+            target = self._run_polling
+        threading.Thread(
+            target=target, name="GitSavvy watcher for {}".format(repo_path), daemon=True
+        ).start()
+        return self
+
+    def stop(self):
+        # type: () -> None
+        self._stopped.set()
+
+    def publish(self, kinds):
+        # type: (Set[str]) -> None
+        # A commit moves the branch HEAD points to but leaves HEAD itself
+        # untouched.
+        if REFS in kinds or HEAD in kinds:
+            head_commit = git_refs.head_commit(self.repo_path)
+            if head_commit != self.head_commit:
+                self.head_commit = head_commit
+                kinds.add(HEAD)
+        if kinds and not self._stopped.is_set():
+            notify(self.repo_path, kinds)
+
+    def classify(self, directory, name):
+        # type: (str, str) -> Optional[str]
+        if name.endswith(".lock"):
+            return None
+        if directory == self.refs_dir or directory.startswith(self.refs_dir + os.sep):
+            return REFS
+        if directory == self.common_dir and name == "packed-refs":
+            return REFS
+        if directory == self.private_dir:
+            if name == "index":
+                return INDEX
+            if name in OPERATION_FILES or name in OPERATION_DIRS:
+                return HEAD
+        return None
+
+    def _run_inotify(self, inotify):
+        # type: (Inotify) -> None
+        try:
+            inotify.add_watch(self.private_dir)
+            inotify.add_watch(self.common_dir)
+            for directory in git_dir.directories(self.refs_dir):
+                inotify.add_watch(directory)
+
+            while not self._stopped.is_set():
+                kinds = set()  # type: Set[str]
+                timeout = 0.5
+                while not self._stopped.is_set():
+                    events = inotify.read(timeout)
+                    if events is None:
+                        # The queue overflowed; we lost track of what changed.
+                        kinds |= {INDEX, HEAD, REFS}
+                        continue
+                    if not events:
+                        break
+                    for directory, name, is_new_dir in events:
+                        if is_new_dir and self.classify(directory, name) == REFS:
+                            for d in git_dir.directories(os.path.join(directory, name)):
+                                inotify.add_watch(d)
+                        kind = self.classify(directory, name)
+                        if kind:
+                            kinds.add(kind)
+                    timeout = QUIET_PERIOD
+                self.publish(kinds)
+        finally:
+            inotify.close()
+
+    def _run_polling(self):
+        # type: () -> None
+        snapshot = self._snapshot()
+        while not self._stopped.wait(POLL_INTERVAL):
+            current = self._snapshot()
+            kinds = {
+                kind
+                for path, (kind, stat_key) in current.items()
+                if snapshot.get(path, (kind, None))[1] != stat_key
+            }
+            kinds |= {kind for path, (kind, _) in snapshot.items() if path not in current}
+            snapshot = current
+            self.publish(kinds)
+
+    def _snapshot(self):
+        # type: () -> Dict[str, Tuple[str, Optional[Tuple[int, int, int]]]]
+        paths = [
+            (os.path.join(self.private_dir, name), kind)
+            for name, kind in (
+                [("index", INDEX)]
+                + [(name, HEAD) for name in OPERATION_FILES + OPERATION_DIRS]
+            )
+        ]
+        paths.append((os.path.join(self.common_dir, "packed-refs"), REFS))
+        # Updating a loose ref renames a lock file onto it, which touches
+        # its directory.
+        paths += [(directory, REFS) for directory in git_dir.directories(self.refs_dir)]
+
+        rv = {}
+        for path, kind in paths:
+            try:
+                st = os.stat(path)
+            except OSError:
+                stat_key = None
+            else:
+                stat_key = (st.st_mtime_ns, st.st_size, st.st_ino)
+            rv[path] = (kind, stat_key)
+        return rv
+
+
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = (
+    IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+    | IN_CREATE | IN_DELETE | IN_ONLYDIR
+)
+EVENT_HEADER = struct.Struct("iIII")
+
+
+class Inotify:
+    """
+    Minimal ctypes binding of the Linux inotify API.
+    """
+
+    def __init__(self, libc, fd):
+        self._libc = libc
+        self.fd = fd
+        self._directories = {}  # type: Dict[int, str]
+
+    @classmethod
+    def create(cls):
+        # type: () -> Optional[Inotify]
+        if not sys.platform.startswith("linux"):
+            return None
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+            init = libc.inotify_init1
+        except (OSError, AttributeError):
+            return None
+        fd = init(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            return None
+        return cls(libc, fd)
+
+    def add_watch(self, directory):
+        # type: (str) -> None
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+        if wd >= 0:
+            self._directories[wd] = directory
+
+    def read(self, timeout):
+        # type: (float) -> Optional[List[Tuple[str, str, bool]]]
+        """
+        Wait up to `timeout` seconds for events, and return them as tuples
+        of `(directory, name, is_new_directory)`, or `None` on overflow.
+        """
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        events = []
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(data):
+            wd, mask, _cookie, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+            offset += length
+            if mask & IN_Q_OVERFLOW:
+                return None
+            directory = self._directories.get(wd)
+            if directory is None or not name:
+                continue
+            events.append((directory, name, bool(mask & IN_ISDIR and mask & IN_CREATE)))
+        return events
+
+    def close(self):
+        # type: () -> None
+        os.close(self.fd)
@@ -1,3 +1,4 @@
+from collections import namedtuple
 from functools import partial, wraps
 from itertools import chain
 import os
@@ -9,7 +10,10 @@ from sublime_plugin import WindowCommand, TextCommand
 from ..git_mixins.status import FileStatus
 from ..commands import GsNavigate
 from ...common import ui
+from .. import status_snapshot
 from ..git_command import GitCommand
+from ..fns import accumulate
+from ..view import queue_view_update, writable_view
 from ...common import util
 
 flatten = chain.from_iterable
@@ -17,7 +21,12 @@ flatten = chain.from_iterable
 
 MYPY = False
 if MYPY:
-    from typing import Iterable, Iterator, List, Optional, Tuple
+    from typing import AbstractSet, Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+    Segment = Tuple[Optional[str], str]
+    Directory = NamedTuple("Directory", [("path", str), ("count", int)])
+    Entry = Union[FileStatus, Directory]
+else:
+    Directory = namedtuple("Directory", ("path", "count"))
 
 
 # Expected
@@ -38,6 +47,8 @@ EXTRACT_FILENAME_RE = (
     r"(?!Your working directory is clean\.)"
     #   ^ be aware to *not* match this message which otherwise fulfills our
     #     filename matcher
+    r"(?!.*/ \([\d,]+ files\)$)"
+    #   ^ nor a rolled-up directory
     r"(\S.*)$"
     # ^^^^^^ the actual filename matcher
     # Note: A filename cannot start with a space (which is luckily true anyway)
@@ -109,6 +120,7 @@ class StatusInterface(ui.Interface, GitCommand):
       [d] discard changes to file           [D] discard all unstaged changes
       [h] open file on remote
       [M] launch external merge tool
+      [z] expand/collapse directory
 
       [l] diff file inline                  [f] diff all files
       [e] diff file                         [F] diff all cached files
@@ -182,6 +194,7 @@ class StatusInterface(ui.Interface, GitCommand):
         self.conflicts_keybindings = \
             "\n".join(line[2:] for line in self.conflicts_keybindings.split("\n"))
         self._lock = threading.Lock()
+        self._drawn_segments = None  # type: Optional[List[Segment]]
         self.state = {
             'staged_files': [],
             'unstaged_files': [],
@@ -191,8 +204,10 @@ class StatusInterface(ui.Interface, GitCommand):
             'git_root': '',
             'show_help': True,
             'head': '',
-            'stashes': []
-        }
+            'stashes': [],
+            'rollup_threshold': None,
+            'expanded_directories': frozenset(),
+        }  # type: Dict[str, Any]
         super().__init__(*args, **kwargs)
 
     def title(self):
@@ -208,7 +223,6 @@ class StatusInterface(ui.Interface, GitCommand):
         """
         for thunk in (
             self.fetch_repo_status,
-            lambda: {'head': self.get_latest_commit_msg_for_head()},
             lambda: {'stashes': self.get_stashes()},
         ):
             sublime.set_timeout_async(
@@ -218,7 +232,8 @@ class StatusInterface(ui.Interface, GitCommand):
         # These are cheap to compute, so we just do it!
         self.update_state({
             'git_root': self.short_repo_path,
-            'show_help': not self.view.settings().get("git_savvy.help_hidden")
+            'show_help': not self.view.settings().get("git_savvy.help_hidden"),
+            'rollup_threshold': self.savvy_settings.get("status_dashboard_rollup_threshold")
         })
 
     def update_state(self, data, then=None):
@@ -240,6 +255,9 @@ class StatusInterface(ui.Interface, GitCommand):
 
     def render(self, nuke_cursors=False):
         """Refresh view state and render."""
+        # The user asked for it, and we don't watch the working tree,
+        # so don't show them a cached `git status`.
+        status_snapshot.invalidate(self.repo_path)
         self.refresh_view_state()
         self.just_render(nuke_cursors)
 
@@ -252,42 +270,96 @@ class StatusInterface(ui.Interface, GitCommand):
         # Note: It is forbidden to `update_state` during render, e.g. in
         # any partials.
         with self._lock:
-            self.clear_regions()
-            rendered = self._render_template()
-
-        self.view.run_command("gs_new_content_and_regions", {
-            "content": rendered,
-            "regions": self.regions,
-            "nuke_cursors": nuke_cursors
-        })
+            segments = self._render_segments()
+
+        # We usually render on the worker threads which fetch the state.
+        # Only the latest of the renders pending within a UI tick gets
+        # drawn.
+        queue_view_update(self.view, self._draw, segments, nuke_cursors, key="render")
+
+    def _render_segments(self):
+        # type: () -> List[Segment]
+        """Render the template as a list of `(key, text)` segments."""
+        return [
+            (key, text if key is None else self.partials[key]())
+            for key, text in ui.compile_template(self.template, frozenset(self.partials))
+        ]
+
+    def _draw(self, view, edit, segments, nuke_cursors):
+        previous = self._drawn_segments
+        if (
+            nuke_cursors
+            or previous is None
+            or len(previous) != len(segments)
+            or view.size() != sum(len(text) for _, text in previous)
+        ):
+            # Initial draw, or someone else touched the view.
+            regions = segment_regions(segments)
+            for key in segment_regions(previous or []).keys() - regions.keys():
+                view.erase_regions("git_savvy_interface." + key)
+            content = "".join(text for _, text in segments)
+            ui.draw_content_and_regions(view, edit, content, regions, nuke_cursors)
+        else:
+            self._draw_changed_segments(view, edit, previous, segments)
+        self._drawn_segments = segments
+        self.regions = segment_regions(segments)
 
         on_special_symbol = any(
-            self.view.match_selector(
+            view.match_selector(
                 s.begin(),
                 'meta.git-savvy.section.body.row'
             )
-            for s in self.view.sel()
+            for s in view.sel()
         )
         if not on_special_symbol:
-            self.view.run_command("gs_status_navigate_goto")
+            view.run_command("gs_status_navigate_goto")
+
+    def _draw_changed_segments(self, view, edit, previous, segments):
+        # type: (sublime.View, sublime.Edit, List[Segment], List[Segment]) -> None
+        """
+        Replace only the partials which changed, e.g. just the HEAD line,
+        and not the possibly thousands of lines of the file lists.
+        """
+        starts = list(accumulate((len(text) for _, text in previous), initial=0))
+        cursors = [view.rowcol(s.a) for s in view.sel()]
+        with writable_view(view):
+            # Go backwards so that the offsets of the segments before
+            # stay valid.
+            for i in reversed(range(len(segments))):
+                old_text, new_text = previous[i][1], segments[i][1]
+                if old_text != new_text:
+                    start = starts[i]
+                    view.replace(edit, sublime.Region(start, start + len(old_text)), new_text)
+
+        view.sel().clear()
+        for row, col in cursors:
+            pt = view.text_point(row, col)
+            view.sel().add(sublime.Region(pt, pt))
+
+        old_regions = segment_regions(previous)
+        new_regions = segment_regions(segments)
+        for key in old_regions.keys() - new_regions.keys():
+            view.erase_regions("git_savvy_interface." + key)
+        for key, (a, b) in new_regions.items():
+            if old_regions.get(key) != [a, b]:
+                view.add_regions("git_savvy_interface." + key, [sublime.Region(a, b)])
 
     def fetch_repo_status(self, delim=None):
-        lines = self._get_status()
-        files_statuses = self._parse_status_for_file_statuses(lines)
-        branch_status = self._get_branch_status_components(lines)
+        snapshot = status_snapshot.get(self)
 
         (staged_files,
          unstaged_files,
          untracked_files,
-         merge_conflicts) = self.sort_status_entries(files_statuses)
-        branch_status = self._format_branch_status(branch_status, delim="\n           ")
+         merge_conflicts) = self.sort_status_entries(snapshot.status.files)
+        branch_status = self._format_branch_status(snapshot, delim="\n           ")
 
         return {
             'staged_files': staged_files,
             'unstaged_files': unstaged_files,
             'untracked_files': untracked_files,
             'merge_conflicts': merge_conflicts,
-            'branch_status': branch_status
+            'branch_status': branch_status,
+            'head': snapshot.head
         }
 
     def refresh_repo_status_and_render(self):
@@ -328,8 +400,9 @@ class StatusInterface(ui.Interface, GitCommand):
             return file_status.path
 
         return self.template_staged.format("\n".join(
+            format_directory(f) if isinstance(f, Directory) else
             "  {} {}".format("-" if f.index_status == "D" else " ", get_path(f))
-            for f in staged_files
+            for f in self.roll_up(staged_files)
         ))
 
     @ui.partial("unstaged_files")
@@ -339,8 +412,9 @@ class StatusInterface(ui.Interface, GitCommand):
             return ""
 
         return self.template_unstaged.format("\n".join(
+            format_directory(f) if isinstance(f, Directory) else
             "  {} {}".format("-" if f.working_status == "D" else " ", f.path)
-            for f in unstaged_files
+            for f in self.roll_up(unstaged_files)
         ))
 
     @ui.partial("untracked_files")
@@ -349,8 +423,21 @@ class StatusInterface(ui.Interface, GitCommand):
         if not untracked_files:
             return ""
 
-        return self.template_untracked.format(
-            "\n".join("    " + f.path for f in untracked_files))
+        return self.template_untracked.format("\n".join(
+            format_directory(f) if isinstance(f, Directory) else "    " + f.path
+            for f in self.roll_up(untracked_files)
+        ))
+
+    def roll_up(self, files):
+        # type: (List[FileStatus]) -> List[Entry]
+        """
+        Roll up the files of a section into their directories if there are
+        more of them than the "status_dashboard_rollup_threshold".
+        """
+        threshold = self.state['rollup_threshold']
+        if not threshold or len(files) <= threshold:
+            return files  # type: ignore[return-value]
+        return roll_up(files, self.state['expanded_directories'])
 
     @ui.partial("merge_conflicts")
     def render_merge_conflicts(self):
@@ -394,6 +481,47 @@ class StatusInterface(ui.Interface, GitCommand):
 ui.register_listeners(StatusInterface)
 
 
+def roll_up(files, expanded, prefix=""):
+    # type: (List[FileStatus], AbstractSet[str], str) -> List[Entry]
+    """
+    Group the `files` below `prefix` by their next path component, e.g.
+    "build/" with a count of the files in it.  The directories in
+    `expanded` list their contents instead, again rolled up.  A directory
+    with only one file in it just shows the file.
+    """
+    entries = []  # type: List[Union[FileStatus, str]]
+    children = {}  # type: Dict[str, List[FileStatus]]
+    for file_status in files:
+        name, sep, _ = file_status.path[len(prefix):].partition("/")
+        if not sep:
+            entries.append(file_status)
+            continue
+        directory = prefix + name + "/"
+        if directory not in children:
+            children[directory] = []
+            entries.append(directory)
+        children[directory].append(file_status)
+
+    rv = []  # type: List[Entry]
+    for entry in entries:
+        if not isinstance(entry, str):
+            rv.append(entry)
+            continue
+        contained = children[entry]
+        if len(contained) == 1:
+            rv.append(contained[0])
+        elif entry in expanded:
+            rv.extend(roll_up(contained, expanded, entry))
+        else:
+            rv.append(Directory(entry, len(contained)))
+    return rv
+
+
+def format_directory(directory):
+    # type: (Directory) -> str
+    return "    {} ({:,} files)".format(directory.path, directory.count)
+
+
 def get_subjects(view, *sections):
     # type: (sublime.View, str) -> Iterable[sublime.Region]
     return flatten(
@@ -584,9 +712,19 @@ class GsStatusStageFileCommand(TextCommand, GitCommand):
         if not (window and interface):
             return
 
-        file_paths = get_selected_subjects(self.view, 'unstaged', 'untracked', 'merge-conflicts')
+        unstaged = get_selected_subjects(self.view, 'unstaged')
+        # A rolled-up directory in the unstaged section must not stage the
+        # untracked files in it.
+        directories = [path for path in unstaged if path.endswith("/")]
+        file_paths = (
+            [path for path in unstaged if not path.endswith("/")]
+            + get_selected_subjects(self.view, 'untracked', 'merge-conflicts')
+        )
         if file_paths:
             self.stage_file(*file_paths, force=False)
+        if directories:
+            self.stage_file(*directories, force=False, update=True)
+        if file_paths or directories:
             window.status_message("Staged files successfully.")
             interface.refresh_repo_status_and_render()
 
@@ -611,6 +749,34 @@ class GsStatusUnstageFileCommand(TextCommand, GitCommand):
             interface.refresh_repo_status_and_render()
 
 
+class GsStatusToggleDirectoryCommand(TextCommand):
+
+    """
+    Expand the rolled-up directories under the cursors, or collapse the
+    directory the file under a cursor has been expanded from.
+    """
+
+    def run(self, edit):
+        # type: (sublime.Edit) -> None
+        interface = get_interface(self.view)
+        if not interface:
+            return
+
+        expanded = set(interface.state['expanded_directories'])
+        for path in get_selected_subjects(self.view, 'staged', 'unstaged', 'untracked'):
+            if path.endswith("/") and path not in expanded:
+                expanded.add(path)
+                continue
+            parents = [directory for directory in expanded if path.startswith(directory)]
+            if parents:
+                expanded.remove(max(parents, key=len))
+
+        interface.update_state(
+            {'expanded_directories': frozenset(expanded)},
+            then=interface.just_render
+        )
+
+
 class GsStatusDiscardChangesToFileCommand(TextCommand, GitCommand):
 
     """
@@ -905,3 +1071,15 @@ class GsStatusNavigateGotoCommand(GsNavigate):
             self.view.find_by_selector("gitsavvy.gotosymbol")
             + self.view.find_all("Your working directory is clean", sublime.LITERAL)
         )
+
+
+def segment_regions(segments):
+    # type: (List[Segment]) -> Dict[str, List[int]]
+    """Return the `[start, end]` of each non-empty partial in `segments`."""
+    regions = {}
+    pos = 0
+    for key, text in segments:
+        if key is not None and text:
+            regions[key] = [pos, pos + len(text)]
+        pos += len(text)
+    return regions
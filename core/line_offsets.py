@@ -0,0 +1,160 @@
+"""
+Map line numbers to character offsets in a text which we edit line-wise.
+
+The graph view applies a stream of `Replace(start, end, lines)` tokens
+and for each needs the character offset of `start` and `end`.  Summing
+the line lengths up to there costs O(n) per token, i.e. a refresh of a
+big graph with many small changes is quadratic.
+
+`LineOffsets` keeps the lines in blocks of about `BLOCK_SIZE` lines and
+two Fenwick trees (binary indexed trees) over the blocks, one counting
+lines and one counting characters.  Looking up an offset walks the trees
+in O(log n) and then sums at most one block.  A splice edits the blocks
+it touches in place and updates the trees; only when a block overflows
+or runs empty we rebuild them, which is O(n / BLOCK_SIZE).
+"""
+
+from itertools import islice
+
+
+__all__ = (
+    "LineOffsets",
+)
+
+
+MYPY = False
+if MYPY:
+    from typing import Iterable, Iterator, List, Tuple
+
+
+BLOCK_SIZE = 512
+
+
+class LineOffsets:
+    def __init__(self, lines=(), block_size=BLOCK_SIZE):
+        # type: (Iterable[str], int) -> None
+        self._block_size = block_size
+        self._blocks = _chunk(list(lines), block_size)
+        self._rebuild()
+
+    def __len__(self):
+        # type: () -> int
+        return self._line_count
+
+    def __iter__(self):
+        # type: () -> Iterator[str]
+        for block in self._blocks:
+            yield from block
+
+    def offset(self, idx):
+        # type: (int) -> int
+        """Return the character offset of the start of line `idx`."""
+        if idx >= self._line_count:
+            return self._char_count
+        b, local = self._locate(idx)
+        return (
+            _prefix_sum(self._char_tree, b)
+            + sum(map(len, islice(self._blocks[b], local)))
+        )
+
+    def splice(self, start, end, lines):
+        # type: (int, int, List[str]) -> None
+        """Replace the lines `start` up to `end` with `lines`, like `a[start:end] = lines`."""
+        total = self._line_count
+        start = min(start, total)
+        end = max(start, min(end, total))
+        b, local = self._locate(start)
+        block = self._blocks[b]
+        if local + (end - start) > len(block):
+            # The range spans multiple blocks.  Tokens are small, so
+            # this is rare; merge the blocks and re-chunk them.
+            b_end, local_end = self._locate(end)
+            merged = [line for block in self._blocks[b:b_end + 1] for line in block]
+            merged[local:self._line_offset_of_block(b_end) - self._line_offset_of_block(b) + local_end] = lines
+            self._blocks[b:b_end + 1] = _chunk(merged, self._block_size) if merged else []
+            if not self._blocks:
+                self._blocks = [[]]
+            self._rebuild()
+            return
+
+        removed = block[local:local + end - start]
+        block[local:local + end - start] = lines
+        if len(block) > 2 * self._block_size:
+            self._blocks[b:b + 1] = _chunk(block, self._block_size)
+            self._rebuild()
+        elif not block and len(self._blocks) > 1:
+            del self._blocks[b]
+            self._rebuild()
+        else:
+            line_delta = len(lines) - len(removed)
+            char_delta = sum(map(len, lines)) - sum(map(len, removed))
+            _add(self._line_tree, b, line_delta)
+            _add(self._char_tree, b, char_delta)
+            self._line_count += line_delta
+            self._char_count += char_delta
+
+    def _locate(self, idx):
+        # type: (int) -> Tuple[int, int]
+        """Return the block containing line `idx` and the index within it."""
+        if idx >= self._line_count:
+            b = len(self._blocks) - 1
+            return b, len(self._blocks[b])
+        tree = self._line_tree
+        pos, remaining = 0, idx
+        step = self._top_step
+        while step:
+            nxt = pos + step
+            if nxt < len(tree) and tree[nxt] <= remaining:
+                pos = nxt
+                remaining -= tree[nxt]
+            step >>= 1
+        return pos, remaining
+
+    def _line_offset_of_block(self, b):
+        # type: (int) -> int
+        return _prefix_sum(self._line_tree, b)
+
+    def _rebuild(self):
+        # type: () -> None
+        self._line_tree = _build([len(block) for block in self._blocks])
+        self._char_tree = _build([sum(map(len, block)) for block in self._blocks])
+        self._line_count = _prefix_sum(self._line_tree, len(self._blocks))
+        self._char_count = _prefix_sum(self._char_tree, len(self._blocks))
+        self._top_step = 1 << (len(self._blocks).bit_length() - 1)
+
+
+def _chunk(lines, size):
+    # type: (List[str], int) -> List[List[str]]
+    return [lines[i:i + size] for i in range(0, len(lines), size)] or [[]]
+
+
+# Fenwick tree helpers.  `tree[0]` is unused, element `i` lives at `i + 1`.
+
+def _build(values):
+    # type: (List[int]) -> List[int]
+    tree = [0] + values
+    n = len(tree)
+    for i in range(1, n):
+        parent = i + (i & -i)
+        if parent < n:
+            tree[parent] += tree[i]
+    return tree
+
+
+def _add(tree, i, delta):
+    # type: (List[int], int, int) -> None
+    i += 1
+    n = len(tree)
+    while i < n:
+        tree[i] += delta
+        i += i & -i
+
+
+def _prefix_sum(tree, k):
+    # type: (List[int], int) -> int
+    """Sum of the first `k` elements."""
+    total = 0
+    while k > 0:
+        total += tree[k]
+        k -= k & -k
+    return total
@@ -0,0 +1,184 @@
+"""
+Parse the output of `git status -z --branch`, porcelain v1 or v2.
+
+The parser consumes the NUL separated records one by one, so it works on
+a list as well as on a stream from `git_streaming`.  It detects the
+format from the first record, hence callers don't need to know which
+one git actually emitted, e.g. if an older git ignores `--porcelain=v2`.
+"""
+
+from collections import namedtuple
+from itertools import chain
+import re
+import string
+
+
+__all__ = (
+    "FileStatus",
+    "BranchStatus",
+    "WorkingDirStatus",
+    "iter_status",
+    "parse_status",
+)
+
+
+MYPY = False
+if MYPY:
+    from typing import Iterable, Iterator, List, NamedTuple, Optional, Union
+
+    FileStatus = NamedTuple("FileStatus", [
+        ("path", str),
+        ("path_alt", Optional[str]),
+        ("index_status", str),
+        ("working_status", Optional[str]),
+    ])
+    # Same order as the tuples `_get_branch_status_components` used to
+    # return, so that these unpack as before.
+    BranchStatus = NamedTuple("BranchStatus", [
+        ("detached", bool),
+        ("branch", Optional[str]),
+        ("remote", Optional[str]),
+        ("clean", bool),
+        ("ahead", Optional[str]),
+        ("behind", Optional[str]),
+        ("gone", bool),
+    ])
+    WorkingDirStatus = NamedTuple("WorkingDirStatus", [
+        ("branch_status", BranchStatus),
+        ("files", List[FileStatus]),
+        ("stash_count", Optional[int]),
+    ])
+    Header = NamedTuple("Header", [("key", str), ("value", str)])
+    Record = Union[FileStatus, Header]
+
+else:
+    FileStatus = namedtuple("FileStatus", ("path", "path_alt", "index_status", "working_status"))
+    BranchStatus = namedtuple("BranchStatus", (
+        "detached", "branch", "remote", "clean", "ahead", "behind", "gone"
+    ))
+    WorkingDirStatus = namedtuple("WorkingDirStatus", ("branch_status", "files", "stash_count"))
+    Header = namedtuple("Header", ("key", "value"))
+
+
+VALID_PUNCTUATION = "".join(c for c in string.punctuation if c not in "~^:?*[\\")
+BRANCH_PATTERN = "[A-Za-z0-9" + re.escape(VALID_PUNCTUATION) + "\u263a-\U0001f645]+?"
+BRANCH_SUFFIX = r"( \[((ahead (\d+))(, )?)?(behind (\d+))?(gone)?\])?)"
+V1_BRANCH_LINE = re.compile(
+    "## (" + BRANCH_PATTERN + r")(\.\.\.(" + BRANCH_PATTERN + ")" + BRANCH_SUFFIX + "?$"
+)
+# Number of space separated fields before the path in v2 records.
+V2_FIELDS = {"1": 8, "2": 9, "u": 10}
+
+
+def iter_status(records):
+    # type: (Iterable[str]) -> Iterator[Record]
+    """
+    Yield a `Header` for each branch header and a `FileStatus` for each
+    file in `records`.  v1 yields the raw branch line as the header
+    "v1.branch", v2 e.g. "branch.head" or "stash".
+    """
+    records = iter(records)
+    for record in records:
+        if not record:
+            continue
+        if record.startswith("## "):
+            yield Header("v1.branch", record)
+            yield from _iter_v1(records)
+        else:
+            yield from _iter_v2(record, records)
+        return
+
+
+def _iter_v1(records):
+    # type: (Iterator[str]) -> Iterator[Record]
+    for record in records:
+        if not record:
+            continue
+        index_status = record[0]
+        working_status = record[1].strip() or None
+        path = record[3:]
+        path_alt = next(records, None) if index_status in "RC" else None
+        yield FileStatus(path, path_alt, index_status, working_status)
+
+
+def _iter_v2(first, records):
+    # type: (str, Iterator[str]) -> Iterator[Record]
+    for record in chain([first], records):
+        if not record:
+            continue
+        kind = record[0]
+        if kind == "#":
+            key, _, value = record[2:].partition(" ")
+            yield Header(key, value)
+        elif kind in "?!":
+            yield FileStatus(record[2:], None, kind, kind)
+        elif kind in V2_FIELDS:
+            fields = record.split(" ", V2_FIELDS[kind])
+            index_status, working_status = fields[1][0], fields[1][1]
+            # Renames and copies are followed by a record with the
+            # original path.
+            path_alt = next(records, None) if kind == "2" else None
+            yield FileStatus(
+                fields[-1],
+                path_alt,
+                " " if index_status == "." else index_status,
+                None if working_status == "." else working_status
+            )
+
+
+def parse_status(records):
+    # type: (Iterable[str]) -> WorkingDirStatus
+    headers = {}
+    files = []
+    for record in iter_status(records):
+        if isinstance(record, FileStatus):
+            files.append(record)
+        else:
+            headers[record.key] = record.value
+
+    clean = not files
+    if "v1.branch" in headers:
+        branch_status = _parse_v1_branch_line(headers["v1.branch"], clean, files)
+    else:
+        branch_status = _parse_v2_branch_headers(headers, clean)
+    stash_count = int(headers["stash"]) if "stash" in headers else None
+    return WorkingDirStatus(branch_status, files, stash_count)
+
+
+def _parse_v1_branch_line(line, clean, files):
+    # type: (str, bool, List[FileStatus]) -> BranchStatus
+    if line.startswith("## HEAD (no branch)"):
+        return BranchStatus(True, None, None, clean, None, None, False)
+
+    if (
+        line.startswith("## No commits yet on ")
+        # older git used these
+        or line.startswith("## Initial commit on ")
+    ):
+        line = line[:3] + line[21:]
+
+    match = V1_BRANCH_LINE.match(line)
+    if not match:
+        return BranchStatus(False, None if clean else files[0].path, None, clean, None, None, False)
+
+    branch, _, remote, _, _, _, ahead, _, _, behind, gone = match.groups()
+    return BranchStatus(False, branch, remote, clean, ahead, behind, bool(gone))
+
+
+def _parse_v2_branch_headers(headers, clean):
+    # type: (dict, bool) -> BranchStatus
+    head = headers.get("branch.head")
+    if head == "(detached)":
+        return BranchStatus(True, None, None, clean, None, None, False)
+
+    remote = headers.get("branch.upstream")
+    ahead = behind = None
+    ab = headers.get("branch.ab")
+    if ab:
+        # E.g. "+1 -0", v1 only reports non-zero counts.
+        ahead_, behind_ = (count[1:] for count in ab.split(" "))
+        ahead = ahead_ if ahead_ != "0" else None
+        behind = behind_ if behind_ != "0" else None
+    # git omits the ahead/behind counts if the upstream branch is gone.
+    gone = bool(remote) and ab is None
+    return BranchStatus(False, head, remote, clean, ahead, behind, gone)
@@ -0,0 +1,235 @@
+"""
+Persist immutable, commit-addressed git output on disk.
+
+File contents at a commit, diffs between two commits, `git show` output
+and blame at a commit never change, so we keep them in a SQLite database
+in Sublime's cache directory and survive restarts.  Entries are keyed by
+the repository's (common) git directory plus the caller's key, values
+are stored zlib-compressed, and the least recently read entries are
+pruned once the database grows over its budget.
+
+`sqlite3` is missing in some Python builds; we then just do nothing.
+"""
+
+import json
+import os
+import threading
+import time
+import traceback
+import zlib
+
+import sublime
+
+from . import git_dir
+
+try:
+    import sqlite3
+except ImportError:
+    sqlite3 = None  # type: ignore[assignment]
+
+AVAILABLE = sqlite3 is not None
+
+
+__all__ = (
+    "AVAILABLE",
+    "PersistentCache",
+    "get_instance",
+    "close",
+)
+
+
+MYPY = False
+if MYPY:
+    from typing import Any, Dict, Optional, Tuple
+
+
+MAX_BYTES = 256 * 1024 * 1024
+# After pruning the database holds at most this part of `MAX_BYTES`.
+PRUNE_TO = 0.8
+PRUNE_CHECK_INTERVAL = 100  # writes
+# Reading an entry refreshes its access time, but not more often than this.
+TOUCH_INTERVAL = 24 * 60 * 60  # [s]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    repo TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    accessed REAL NOT NULL,
+    PRIMARY KEY (repo, key)
+);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed);
+"""
+
+
+class PersistentCache:
+    def __init__(self, path, max_bytes=MAX_BYTES):
+        # type: (str, int) -> None
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._repo_ids = {}  # type: Dict[str, Optional[str]]
+        self._writes = 0
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "writes": 0,
+            "pruned": 0,
+            "errors": 0,
+        }
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(SCHEMA)
+
+    def get(self, repo_path, key):
+        # type: (str, Tuple) -> Any
+        """
+        Return the value stored for `key`, or raise `KeyError`.
+        """
+        address = self._address(repo_path, key)
+        if address is None:
+            raise KeyError(key)
+
+        with self._lock:
+            try:
+                row = self._connection.execute(
+                    "SELECT value, accessed FROM entries WHERE repo = ? AND key = ?", address
+                ).fetchone()
+                if row is None:
+                    self.stats["misses"] += 1
+                    raise KeyError(key)
+                blob, accessed = row
+                now = time.time()
+                if now - accessed > TOUCH_INTERVAL:
+                    self._connection.execute(
+                        "UPDATE entries SET accessed = ? WHERE repo = ? AND key = ?",
+                        (now,) + address
+                    )
+                value = json.loads(zlib.decompress(blob).decode("utf-8"))
+            except sqlite3.Error:
+                self._on_error()
+                raise KeyError(key)
+            except (zlib.error, ValueError):
+                self._on_error()
+                self._connection.execute(
+                    "DELETE FROM entries WHERE repo = ? AND key = ?", address)
+                raise KeyError(key)
+            self.stats["hits"] += 1
+            return value
+
+    def set(self, repo_path, key, value):
+        # type: (str, Tuple, Any) -> None
+        address = self._address(repo_path, key)
+        if address is None:
+            return
+
+        blob = zlib.compress(json.dumps(value).encode("utf-8"))
+        with self._lock:
+            try:
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO entries (repo, key, value, size, accessed) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    address + (blob, len(blob), time.time())
+                )
+                self.stats["writes"] += 1
+                self._writes += 1
+                if self._writes % PRUNE_CHECK_INTERVAL == 1:
+                    self._prune()
+            except sqlite3.Error:
+                self._on_error()
+
+    def size(self):
+        # type: () -> int
+        with self._lock:
+            return self._connection.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def close(self):
+        # type: () -> None
+        with self._lock:
+            self._connection.close()
+
+    def _prune(self):
+        # type: () -> None
+        # Must be called with the lock held.
+        total = self._connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        to_free = total - self.max_bytes * PRUNE_TO
+        freed = 0
+        rows = self._connection.execute(
+            "SELECT rowid, size FROM entries ORDER BY accessed").fetchall()
+        doomed = []
+        for rowid, size in rows:
+            if freed >= to_free:
+                break
+            doomed.append((rowid,))
+            freed += size
+        self._connection.executemany("DELETE FROM entries WHERE rowid = ?", doomed)
+        self.stats["pruned"] += len(doomed)
+
+    def _address(self, repo_path, key):
+        # type: (str, Tuple) -> Optional[Tuple[str, str]]
+        try:
+            repo_id = self._repo_ids[repo_path]
+        except KeyError:
+            repo_id = self._repo_ids[repo_path] = _repo_id(repo_path)
+        if repo_id is None:
+            return None
+        return repo_id, json.dumps(key)
+
+    def _on_error(self):
+        # type: () -> None
+        self.stats["errors"] += 1
+        traceback.print_exc()
+
+
+def _repo_id(repo_path):
+    # type: (str) -> Optional[str]
+    """
+    Identify a repository by its common git directory, which all its
+    worktrees share.
+    """
+    toplevel = git_dir.find_toplevel(repo_path)
+    if toplevel is None:
+        return None
+    private_dir = git_dir.resolve_git_dir(toplevel)
+    if private_dir is None:
+        return None
+    return os.path.realpath(git_dir.common_dir(private_dir))
+
+
+_instance = None  # type: Optional[PersistentCache]
+_instance_failed = False
+_instance_lock = threading.Lock()
+
+
+def get_instance():
+    # type: () -> Optional[PersistentCache]
+    global _instance, _instance_failed
+    if not AVAILABLE or _instance_failed:
+        return None
+    with _instance_lock:
+        if _instance is None:
+            path = os.path.join(sublime.cache_path(), "GitSavvy", "objects.sqlite")
+            try:
+                _instance = PersistentCache(path)
+            except (OSError, sqlite3.Error):
+                traceback.print_exc()
+                _instance_failed = True
+                return None
+        return _instance
+
+
+def close():
+    # type: () -> None
+    global _instance
+    with _instance_lock:
+        if _instance is not None:
+            _instance.close()
+            _instance = None
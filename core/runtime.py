@@ -1,22 +1,177 @@
+from collections import deque
 from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from functools import lru_cache, partial, wraps
 import inspect
+from itertools import count
 import threading
+import time
+import traceback
 import uuid
 
 import sublime
 import sublime_plugin
 
+from .utils import kill_proc
+
 
 MYPY = False
 if MYPY:
-    from typing import Any, Callable, Dict, Iterator, Literal, Optional, Tuple, TypeVar
+    import subprocess
+    from typing import (
+        Any, Callable, Deque, Dict, Hashable, Iterator, List, Literal, Optional, Set, Tuple, TypeVar
+    )
     T = TypeVar('T')
     F = TypeVar('F', bound=Callable[..., Any])
     Callback = Tuple[Callable, Tuple[Any, ...], Dict[str, Any]]
     ReturnValue = Any
 
 
+INTERACTIVE = "interactive"
+VISIBLE = "visible"
+BACKGROUND = "background"
+LANES = (INTERACTIVE, VISIBLE, BACKGROUND)
+DEFAULT_CONCURRENCY = 4
+MAX_WORKERS = 16
+
+
+class Task:
+    __slots__ = ("fn", "queue", "key", "submitted", "deadline")
+
+    def __init__(self, fn, queue, key, deadline):
+        # type: (Callable[[], Any], str, Optional[Hashable], Optional[float]) -> None
+        self.fn = fn
+        self.queue = queue
+        self.key = key
+        self.submitted = time.perf_counter()
+        self.deadline = self.submitted + deadline if deadline is not None else None
+
+
+class TaskScheduler:
+    """Run tasks on a bounded pool of worker threads.
+
+    Tasks wait in the queues named after the `LANES`; free workers always
+    serve the interactive queue first and the background queue last, and
+    first come first served within a queue.  Submitting a task with the
+    `key` of a still queued task replaces the latter, and tasks which did
+    not start before their `deadline` are dropped.  Workers are started
+    on demand.
+
+    Submit tasks which may block for long, e.g. on an editor or a merge
+    conflict, as `blocking`.  These never wait for a busy pool: if no
+    worker is idle we start one beyond `max_workers`, which retires as
+    soon as it runs out of work.
+    """
+
+    def __init__(self, max_workers=MAX_WORKERS):
+        # type: (int) -> None
+        self.max_workers = max_workers
+        self._cond = threading.Condition()
+        self._queues = {lane: deque() for lane in LANES}  # type: Dict[str, Deque[Task]]
+        self._keyed = {}  # type: Dict[Hashable, Task]
+        self._workers = 0
+        self._idle = 0
+        self._stats = {
+            lane: {
+                "submitted": 0, "started": 0, "coalesced": 0, "dropped": 0, "failed": 0,
+                "wait_time": 0.0, "max_wait_time": 0.0, "run_time": 0.0,
+            }
+            for lane in LANES
+        }  # type: Dict[str, Dict[str, Any]]
+
+    def submit(self, fn, queue=VISIBLE, key=None, deadline=None, blocking=False):
+        # type: (Callable[[], Any], str, Optional[Hashable], Optional[float], bool) -> None
+        if queue not in self._queues:
+            raise ValueError(
+                "unknown queue {!r}, expected one of {}".format(queue, ", ".join(LANES))
+            )
+        task = Task(fn, queue, key, deadline)
+        with self._cond:
+            stats = self._stats[queue]
+            stats["submitted"] += 1
+            if key is not None:
+                previous = self._keyed.get(key)
+                if previous is not None:
+                    self._queues[previous.queue].remove(previous)
+                    self._stats[previous.queue]["coalesced"] += 1
+                self._keyed[key] = task
+            self._queues[queue].append(task)
+
+            if self._idle:
+                self._cond.notify()
+            # Notified workers count as idle until they wake up.
+            queued = sum(len(q) for q in self._queues.values())
+            if self._idle < queued and (blocking or self._workers < self.max_workers):
+                self._workers += 1
+                threading.Thread(
+                    target=self._work,
+                    name="GitSavvy worker {}".format(self._workers),
+                    daemon=True
+                ).start()
+
+    def _next_task(self):
+        # type: () -> Optional[Task]
+        # Must be called with the lock held.
+        while True:
+            for lane in LANES:
+                queue = self._queues[lane]
+                while queue:
+                    task = queue.popleft()
+                    if task.key is not None:
+                        del self._keyed[task.key]
+                    now = time.perf_counter()
+                    stats = self._stats[lane]
+                    if task.deadline is not None and now > task.deadline:
+                        stats["dropped"] += 1
+                        continue
+                    wait_time = now - task.submitted
+                    stats["started"] += 1
+                    stats["wait_time"] += wait_time
+                    stats["max_wait_time"] = max(stats["max_wait_time"], wait_time)
+                    return task
+            if self._workers > self.max_workers:
+                # An extra worker started for a blocking task retires.
+                self._workers -= 1
+                return None
+            self._idle += 1
+            try:
+                self._cond.wait()
+            finally:
+                self._idle -= 1
+
+    def _work(self):
+        # type: () -> None
+        while True:
+            with self._cond:
+                task = self._next_task()
+            if task is None:
+                return
+            start = time.perf_counter()
+            try:
+                task.fn()
+            except Exception:
+                traceback.print_exc()
+                with self._cond:
+                    self._stats[task.queue]["failed"] += 1
+            finally:
+                with self._cond:
+                    self._stats[task.queue]["run_time"] += time.perf_counter() - start
+
+    def stats(self):
+        # type: () -> Dict[str, Any]
+        with self._cond:
+            return {
+                "workers": self._workers,
+                "idle": self._idle,
+                "queues": {
+                    lane: dict(stats, queued=len(self._queues[lane]))
+                    for lane, stats in self._stats.items()
+                },
+            }
+
+
+task_scheduler = TaskScheduler()
+# Runs the tasks given to `enqueue_on_savvy` one after the other.
 savvy_executor = ThreadPoolExecutor(max_workers=1)
 
 # `enqueue_on_*` functions emphasize that we run two queues and
@@ -48,7 +203,11 @@ def enqueue_on_savvy(fn, *args, **kwargs):
 
 def run_on_new_thread(fn, *args, **kwargs):
     # type: (Callable, Any, Any) -> None
-    threading.Thread(target=fn, args=args, kwargs=kwargs).start()
+    """
+    Run `fn` off the UI and worker threads, on our task scheduler.  `fn`
+    may block, e.g. wait on the user, as it never waits for a busy pool.
+    """
+    task_scheduler.submit(partial(fn, *args, **kwargs), blocking=True)
 
 
 def on_new_thread(fn):
@@ -74,7 +233,7 @@ def run_or_timeout(fn, timeout):
                 cond.notify_all()
 
     with cond:
-        run_on_new_thread(program)
+        task_scheduler.submit(program, queue=INTERACTIVE, blocking=True)
         if not cond.wait(timeout):
             raise TimeoutError()
 
@@ -84,6 +243,343 @@ def run_or_timeout(fn, timeout):
         return result
 
 
+class SingleFlight:
+    """Coalesce concurrent calls with equal keys into one execution.
+
+    The first caller for a key runs `fn`, every caller arriving while it
+    still runs waits for and shares its result (or exception).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights = {}  # type: Dict[Any, _Flight]
+        self.executions = 0
+        self.coalesced = 0
+
+    def run(self, key, fn):
+        # type: (Any, Callable[[], T]) -> T
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is None:
+                flight = self._flights[key] = _Flight()
+                self.executions += 1
+                leader = True
+            else:
+                self.coalesced += 1
+                leader = False
+
+        if not leader:
+            flight.done.wait()
+            if flight.exception is not None:
+                raise flight.exception
+            return flight.result
+
+        try:
+            flight.result = fn()
+        except Exception as e:
+            flight.exception = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        return flight.result
+
+    def stats(self):
+        # type: () -> Dict[str, int]
+        with self._lock:
+            return {
+                "executions": self.executions,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._flights),
+            }
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None  # type: Any
+        self.exception = None  # type: Optional[Exception]
+
+
+class Cancelled(Exception):
+    pass
+
+
+class GitScheduler:
+    """Admit git processes per repository.
+
+    Work on the interactive lane starts right away.  Everything else waits
+    for one of `max_concurrency` slots per repo, visible-view refreshes
+    before background prefetches, first come first served within a lane.
+    Queued work whose `is_alive` check fails is dropped with `Cancelled`.
+
+    A thread which already holds a slot, e.g. while consuming a streaming
+    git command, re-enters without waiting again.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._running = {}  # type: Dict[str, int]
+        self._queues = {}  # type: Dict[str, List[Tuple[int, int]]]
+        self._holders = {}  # type: Dict[int, int]
+        self._tickets = count()
+        self._default_lane = threading.local()
+        self._stats = {
+            lane: {"admitted": 0, "waited": 0, "wait_time": 0.0, "max_wait_time": 0.0}
+            for lane in LANES
+        }  # type: Dict[str, Dict[str, Any]]
+        self.cancelled = 0
+        self.max_queue_depth = 0
+
+    def current_lane(self):
+        # type: () -> str
+        lane = getattr(self._default_lane, "lane", None)
+        if lane:
+            return lane
+        # `threading.main_thread()` is not available on Python 3.3.
+        if threading.current_thread().name == "MainThread":
+            return INTERACTIVE
+        return VISIBLE
+
+    @contextmanager
+    def lane(self, lane):
+        # type: (str) -> Iterator[None]
+        """Set the default lane for git calls made by this thread."""
+        previous = getattr(self._default_lane, "lane", None)
+        self._default_lane.lane = lane
+        try:
+            yield
+        finally:
+            self._default_lane.lane = previous
+
+    @contextmanager
+    def slot(self, repo, lane=None, max_concurrency=DEFAULT_CONCURRENCY, is_alive=None):
+        # type: (str, Optional[str], int, Optional[Callable[[], bool]]) -> Iterator[None]
+        lane = lane or self.current_lane()
+        owner = threading.get_ident()
+        with self._cond:
+            if self._holders.get(owner):
+                self._holders[owner] += 1
+                reentered = True
+            else:
+                reentered = False
+        if reentered:
+            try:
+                yield
+            finally:
+                self._release(owner, None)
+            return
+
+        self._acquire(repo, lane, max(1, max_concurrency), is_alive, owner)
+        try:
+            yield
+        finally:
+            self._release(owner, repo)
+
+    def _acquire(self, repo, lane, max_concurrency, is_alive, owner):
+        # type: (str, str, int, Optional[Callable[[], bool]], int) -> None
+        start = time.perf_counter()
+        with self._cond:
+            waited = False
+            if lane != INTERACTIVE:
+                queue = self._queues.setdefault(repo, [])
+                ticket = (LANES.index(lane), next(self._tickets))
+                queue.append(ticket)
+                queue.sort()
+                self.max_queue_depth = max(self.max_queue_depth, self._queue_depth())
+                try:
+                    while not (
+                        queue[0] == ticket
+                        and self._running.get(repo, 0) < max_concurrency
+                    ):
+                        waited = True
+                        if is_alive and not is_alive():
+                            self.cancelled += 1
+                            raise Cancelled()
+                        self._cond.wait(0.1)
+                finally:
+                    queue.remove(ticket)
+                    if not queue:
+                        del self._queues[repo]
+                    # Whoever is next in line re-checks its admission.
+                    self._cond.notify_all()
+
+            self._running[repo] = self._running.get(repo, 0) + 1
+            self._holders[owner] = 1
+            wait_time = time.perf_counter() - start
+            stats = self._stats[lane]
+            stats["admitted"] += 1
+            if waited:
+                stats["waited"] += 1
+                stats["wait_time"] += wait_time
+                stats["max_wait_time"] = max(stats["max_wait_time"], wait_time)
+
+    def _release(self, owner, repo):
+        # type: (int, Optional[str]) -> None
+        with self._cond:
+            self._holders[owner] -= 1
+            if not self._holders[owner]:
+                del self._holders[owner]
+            if repo is not None:
+                self._running[repo] -= 1
+                if not self._running[repo]:
+                    del self._running[repo]
+                self._cond.notify_all()
+
+    def _queue_depth(self):
+        # type: () -> int
+        return sum(len(queue) for queue in self._queues.values())
+
+    def stats(self):
+        # type: () -> Dict[str, Any]
+        with self._cond:
+            return {
+                "running": sum(self._running.values()),
+                "queue_depth": self._queue_depth(),
+                "max_queue_depth": self.max_queue_depth,
+                "cancelled": self.cancelled,
+                "lanes": {lane: dict(stats) for lane, stats in self._stats.items()},
+            }
+
+
+git_scheduler = GitScheduler()
+
+
+CANCELLATION_STATS = {
+    "cancelled": 0,
+    "killed_early": 0,
+}  # type: Dict[str, int]
+cancellation_lock = threading.Lock()
+
+
+class CancellationToken:
+    """Cancel the git processes of one unit of work.
+
+    Processes attached to the token are killed, together with their
+    process group, as soon as the token is cancelled, and `git()` drops
+    their results by raising `Cancelled`.  Use the token as a context
+    manager to make it the default for all git calls of the current
+    thread.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._procs = set()  # type: Set[subprocess.Popen]
+        self._key = None  # type: Optional[Tuple[int, str]]
+        self.cancelled = False
+
+    def cancel(self):
+        # type: () -> None
+        with self._lock:
+            if self.cancelled:
+                return
+            self.cancelled = True
+            procs, self._procs = self._procs, set()
+        with cancellation_lock:
+            CANCELLATION_STATS["cancelled"] += 1
+        for proc in procs:
+            _kill_early(proc)
+
+    def raise_if_cancelled(self):
+        # type: () -> None
+        if self.cancelled:
+            raise Cancelled()
+
+    def attach(self, proc):
+        # type: (subprocess.Popen) -> None
+        with self._lock:
+            if not self.cancelled:
+                self._procs.add(proc)
+                return
+        _kill_early(proc)
+
+    def detach(self, proc):
+        # type: (subprocess.Popen) -> None
+        with self._lock:
+            self._procs.discard(proc)
+
+    def __enter__(self):
+        # type: () -> CancellationToken
+        stack = _active_tokens.__dict__.setdefault("stack", [])
+        stack.append(self)
+        return self
+
+    def __exit__(self, *exc):
+        # type: (object) -> None
+        _active_tokens.stack.pop()
+        if self._key is not None:
+            # The work is done, there is nothing left to supersede.
+            with cancellation_lock:
+                if _tokens.get(self._key) is self:
+                    del _tokens[self._key]
+
+
+_active_tokens = threading.local()
+
+
+def current_cancellation_token():
+    # type: () -> Optional[CancellationToken]
+    stack = getattr(_active_tokens, "stack", None)
+    return stack[-1] if stack else None
+
+
+def _kill_early(proc):
+    # type: (subprocess.Popen) -> None
+    if proc.poll() is not None:
+        return
+    try:
+        # `git()` starts cancellable processes in their own session, so
+        # this also kills their children, e.g. hooks or ssh.
+        kill_proc(proc)
+    except OSError:
+        proc.kill()
+    with cancellation_lock:
+        CANCELLATION_STATS["killed_early"] += 1
+
+
+_tokens = {}  # type: Dict[Tuple[int, str], CancellationToken]
+
+
+def supersede(owner_id, purpose):
+    # type: (int, str) -> CancellationToken
+    """Return a new token for `purpose` and cancel its predecessor.
+
+    `owner_id` is the id of the view the work renders into; closing it
+    cancels the token as well, see `cancel_tokens_of`.  The token is
+    forgotten once the work leaves its context.
+    """
+    token = CancellationToken()
+    token._key = (owner_id, purpose)
+    with cancellation_lock:
+        previous = _tokens.get((owner_id, purpose))
+        _tokens[(owner_id, purpose)] = token
+    if previous:
+        previous.cancel()
+    return token
+
+
+def cancel_tokens_of(owner_id):
+    # type: (int) -> None
+    with cancellation_lock:
+        keys = [key for key in _tokens if key[0] == owner_id]
+        tokens = [_tokens.pop(key) for key in keys]
+    for token in tokens:
+        token.cancel()
+
+
+def drop_if_cancelled(fn):
+    # type: (F) -> F
+    """Swallow `Cancelled` as the work has been superseded anyway."""
+    @wraps(fn)
+    def decorated(*args, **kwargs):
+        try:
+            return fn(*args, **kwargs)
+        except Cancelled:
+            return None
+    return decorated  # type: ignore[return-value]
+
+
 lock = threading.Lock()
 COMMANDS = {}  # type: Dict[str, Callback]
 RESULTS = {}  # type: Dict[str, ReturnValue]
@@ -145,26 +641,74 @@ class gs_generic_text_cmd(sublime_plugin.TextCommand):
             RESULTS[token] = rv
 
 
-THROTTLED_CACHE = {}
-THROTTLED_LOCK = threading.Lock()
+# Keyed rate limiting.  Keys are arbitrary hashables, typically tuples
+# like `("show_commit_info", window.id())`, so that e.g. two windows do
+# not cancel each other out.  Entries are removed as soon as no call for
+# their key is pending anymore.
+FRAME_INTERVAL = 1 / 60  # [s]
+KEYED_LOCK = threading.Lock()
+LATEST = {}  # type: Dict[Hashable, object]
+THROTTLED = {}  # type: Dict[Hashable, Optional[Callable[[], None]]]
 
 
-def throttled(fn, *args, **kwargs):
-    # type: (...) -> Callable[[], None]
-    token = (fn,)
-    action = partial(fn, *args, **kwargs)
-    with THROTTLED_LOCK:
-        THROTTLED_CACHE[token] = action
+def latest_only(key, fn, *args, **kwargs):
+    # type: (Hashable, Callable, Any, Any) -> Callable[[], None]
+    """Return a task which runs `fn` unless superseded by then.
+
+    A task is superseded if `latest_only` has been called again with the
+    same `key` before the task runs.
+    """
+    token = object()
+    with KEYED_LOCK:
+        LATEST[key] = token
 
     def task():
-        with THROTTLED_LOCK:
-            ok = THROTTLED_CACHE[token] == action
+        with KEYED_LOCK:
+            ok = LATEST.get(key) is token
+            if ok:
+                del LATEST[key]
         if ok:
-            action()
+            fn(*args, **kwargs)
 
     return task
 
 
+def debounce(key, wait, fn, *args, **kwargs):
+    # type: (Hashable, float, Callable, Any, Any) -> None
+    """Run `fn` on the UI thread once `key` has been quiet for `wait` seconds."""
+    sublime.set_timeout(latest_only(("debounce", key), fn, *args, **kwargs), int(wait * 1000))
+
+
+def throttle(key, interval, fn, *args, **kwargs):
+    # type: (Hashable, float, Callable, Any, Any) -> None
+    """Run `fn` at most once per `interval` seconds per `key`.
+
+    The first call runs immediately on the calling thread.  Calls within
+    the `interval` are collapsed into one trailing call, with the latest
+    arguments, which runs on the UI thread at the end of the interval.
+    """
+    action = partial(fn, *args, **kwargs)
+    with KEYED_LOCK:
+        # An entry means we're within an interval and its timer is set.
+        if key in THROTTLED:
+            THROTTLED[key] = action
+            return
+        THROTTLED[key] = None
+    action()
+    sublime.set_timeout(partial(_end_interval, key, interval), int(interval * 1000))
+
+
+def _end_interval(key, interval):
+    # type: (Hashable, float) -> None
+    with KEYED_LOCK:
+        pending = THROTTLED.pop(key, None)
+        if pending is not None:
+            THROTTLED[key] = None
+    if pending is not None:
+        pending()
+        sublime.set_timeout(partial(_end_interval, key, interval), int(interval * 1000))
+
+
 AWAIT_UI_THREAD = 'AWAIT_UI_THREAD'  # type: Literal["AWAIT_UI_THREAD"]
 AWAIT_WORKER = 'AWAIT_WORKER'  # type: Literal["AWAIT_WORKER"]
 if MYPY:
@@ -10,7 +10,7 @@ __all__ = (
 
 MYPY = False
 if MYPY:
-    from typing import Callable, Dict, Optional, TypeVar
+    from typing import Callable, Dict, Optional, Tuple, TypeVar
     T = TypeVar("T")
 
 
@@ -20,6 +20,11 @@ class GitSavvySettings:
         self._window = window or sublime.active_window()
         self._global_settings = get_global_settings()
 
+    @property
+    def window_id(self):
+        # type: () -> Optional[sublime.WindowId]
+        return self._window.id() if self._window else None
+
     def get(self, key, default=None):
         try:
             return get_project_settings(self._window)[key]
@@ -31,6 +36,16 @@ class GitSavvySettings:
 
 
 CHANGE_COUNT = 0
+GLOBAL_CHANGE_COUNT = 0
+
+
+def settings_generation():
+    # type: () -> Tuple[int, int]
+    """
+    Return a value which changes whenever the GitSavvy settings or a
+    project file change.
+    """
+    return GLOBAL_CHANGE_COUNT, CHANGE_COUNT
 
 
 class ProjectFileChanges(sublime_plugin.EventListener):
@@ -81,6 +96,8 @@ class GlobalSettings:
         self._settings.set(name, value)
 
     def _on_update(self):
+        global GLOBAL_CHANGE_COUNT
+        GLOBAL_CHANGE_COUNT += 1
         self._cache.clear()
 
 
@@ -0,0 +1,192 @@
+"""
+Share one `git status` per repository between the status bar and the
+dashboards.
+
+A snapshot holds the parsed `git status`, the merge and rebase state and
+the subject of HEAD.  We reuse it until
+
+- the git directory changes (see `git_dir.fingerprint`),
+- the repository watcher reports a change,
+- GitSavvy runs a git command which may write, or
+- it is older than `MAX_AGE`, as nobody tells us about edits to the
+  working tree made outside of Sublime, or
+- the user refreshes the status dashboard.
+
+Only passive readers such as the status bar or the headers of the
+branch and tags dashboards should rely on the cache alone.
+
+Concurrent readers of an outdated snapshot wait for a single refresh,
+and listeners receive each new snapshot.
+"""
+
+from collections import namedtuple
+import threading
+import time
+import traceback
+
+from . import git_dir, git_watcher
+from .runtime import SingleFlight
+
+
+__all__ = (
+    "Snapshot",
+    "get",
+    "invalidate",
+    "invalidate_after",
+    "add_listener",
+    "remove_listener",
+    "stats",
+)
+
+
+MYPY = False
+if MYPY:
+    from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+    from .git_command import GitCommand
+    from .parse_status import WorkingDirStatus
+
+    Snapshot = NamedTuple("Snapshot", [
+        ("status", WorkingDirStatus),
+        ("untracked", bool),
+        ("merge_head", Optional[str]),
+        ("rebase_branch_name", Optional[str]),
+        ("head", str),
+    ])
+    Version = Tuple[Tuple, int, int]
+    Listener = Callable[[str, Snapshot], None]
+
+else:
+    Snapshot = namedtuple("Snapshot", (
+        "status", "untracked", "merge_head", "rebase_branch_name", "head"
+    ))
+
+
+MAX_AGE = 5.0  # [s]
+# Subcommands which never change the status of the working directory.
+READ_ONLY_COMMANDS = {
+    "blame", "cat-file", "check-ignore", "describe", "diff", "for-each-ref",
+    "log", "ls-files", "ls-remote", "ls-tree", "merge-base", "rev-list",
+    "rev-parse", "show", "show-ref", "status", "version",
+}
+
+_snapshots = {}  # type: Dict[str, Tuple[Version, float, Snapshot]]
+_generations = {}  # type: Dict[str, int]
+_listeners = []  # type: List[Listener]
+_lock = threading.Lock()
+_refreshes = SingleFlight()
+STATS = {
+    "hits": 0,
+    "refreshes": 0,
+    "invalidations": 0,
+}  # type: Dict[str, int]
+
+
+def stats():
+    # type: () -> Dict[str, int]
+    with _lock:
+        return dict(STATS, repositories=len(_snapshots))
+
+
+def get(git, untracked=True, fresh=False):
+    # type: (GitCommand, bool, bool) -> Snapshot
+    """
+    Return the current snapshot of the repository of `git`.  Without
+    `untracked`, a snapshot which does not list the untracked files will
+    do, as git runs a lot faster without them in some repositories.
+    With `fresh`, always run `git status`, e.g. for commands which act on
+    the files it lists; the result still refreshes the cache.
+    """
+    repo_path = git._repo_path_or_none()
+    if fresh and repo_path:
+        invalidate(repo_path)
+    version = _version(repo_path) if repo_path else None
+    if repo_path is None or version is None:
+        # We cannot tell when it changes, so don't keep it.
+        return _compute(git, untracked)
+
+    with _lock:
+        cached = _snapshots.get(repo_path)
+        if (
+            cached is not None
+            and cached[0] == version
+            and time.monotonic() - cached[1] < MAX_AGE
+            and (cached[2].untracked or not untracked)
+        ):
+            STATS["hits"] += 1
+            return cached[2]
+
+    return _refreshes.run(
+        (repo_path, version, untracked),
+        lambda: _refresh(git, repo_path, version, untracked)
+    )
+
+
+def _version(repo_path):
+    # type: (str) -> Optional[Version]
+    fingerprint = git_dir.fingerprint(repo_path)
+    if fingerprint is None:
+        return None
+    with _lock:
+        generation = _generations.get(repo_path, 0)
+    return fingerprint, generation, git_watcher.generation(repo_path)
+
+
+def _refresh(git, repo_path, version, untracked):
+    # type: (GitCommand, str, Version, bool) -> Snapshot
+    snapshot = _compute(git, untracked)
+    with _lock:
+        STATS["refreshes"] += 1
+        _snapshots[repo_path] = (version, time.monotonic(), snapshot)
+        listeners = list(_listeners)
+    for fn in listeners:
+        try:
+            fn(repo_path, snapshot)
+        except Exception:
+            traceback.print_exc()
+    return snapshot
+
+
+def _compute(git, untracked):
+    # type: (GitCommand, bool) -> Snapshot
+    return Snapshot(
+        git.get_working_dir_status(untracked),
+        untracked,
+        git.merge_head() if git.in_merge() else None,
+        git.rebase_branch_name() if git.in_rebase() else None,
+        git.get_latest_commit_msg_for_head()
+    )
+
+
+def invalidate(repo_path):
+    # type: (str) -> None
+    with _lock:
+        STATS["invalidations"] += 1
+        _generations[repo_path] = _generations.get(repo_path, 0) + 1
+
+
+def invalidate_after(repo_path, args):
+    # type: (str, Sequence[str]) -> None
+    """Invalidate the snapshot of `repo_path` unless `args` only read."""
+    git_cmd = args[0] if args else None
+    if git_cmd in READ_ONLY_COMMANDS:
+        return
+    if git_cmd == "stash" and args[1:2] in (["list"], ["show"]):
+        return
+    if git_cmd == "config" and any(arg.startswith(("--get", "--list")) for arg in args[1:]):
+        return
+    invalidate(repo_path)
+
+
+def add_listener(fn):
+    # type: (Listener) -> None
+    """Call `fn(repo_path, snapshot)` after each refresh, on its thread."""
+    with _lock:
+        if fn not in _listeners:
+            _listeners.append(fn)
+
+
+def remove_listener(fn):
+    # type: (Listener) -> None
+    with _lock:
+        if fn in _listeners:
+            _listeners.remove(fn)
@@ -1,12 +1,19 @@
 from collections import defaultdict
+import copy
+from functools import wraps
+import re
 import threading
 
 
-from .utils import Cache
+from . import git_dir, persistent_cache
+from .settings import get_global_settings
+from .utils import RepoCache
 
 MYPY = False
 if MYPY:
-    from typing import Any, DefaultDict, Dict, Tuple, TypedDict
+    from typing import Any, Callable, DefaultDict, Dict, Optional, Tuple, TypedDict, TypeVar
+    F = TypeVar("F", bound=Callable[..., Any])
+    T = TypeVar("T")
 
     RepoPath = str
     RepoStore = TypedDict(
@@ -18,7 +25,10 @@ if MYPY:
     )
 
 state = defaultdict(lambda: {})  # type: DefaultDict[RepoPath, RepoStore]
-cache = Cache(maxsize=512)  # type: Dict[Tuple, Any]
+# Budget for cached git output, e.g. file contents at some commit.
+CACHE_MAX_BYTES = 64 * 1024 * 1024
+CACHE_MAX_BYTES_PER_REPO = 32 * 1024 * 1024
+cache = RepoCache(CACHE_MAX_BYTES, CACHE_MAX_BYTES_PER_REPO)
 
 
 lock = threading.Lock()
@@ -33,3 +43,96 @@ def update_state(repo_path, partial_state):
 def current_state(repo_path):
     # type: (RepoPath) -> RepoStore
     return state[repo_path]
+
+
+MEMO_STATS = {
+    "hits": 0,
+    "misses": 0,
+    "bypassed": 0,
+}  # type: Dict[str, int]
+
+
+def memoize_by_repo_state(fn):
+    # type: (F) -> F
+    """
+    Memoize a read-only query of a `GitCommand` per repository as long as
+    the repository's `git_dir.fingerprint` does not change.  Results are
+    handed out as shallow copies so that callers may mutate them.
+    """
+    @wraps(fn)
+    def decorated(self, *args, **kwargs):
+        try:
+            repo_path = self.repo_path
+        except Exception:
+            repo_path = None
+        fingerprint = git_dir.fingerprint(repo_path) if repo_path else None
+        if fingerprint is None:
+            with lock:
+                MEMO_STATS["bypassed"] += 1
+            return fn(self, *args, **kwargs)
+
+        key = ("memoize_by_repo_state", fn.__name__, args, tuple(sorted(kwargs.items())))
+        try:
+            cached_fingerprint, rv = cache[repo_path, key]
+        except KeyError:
+            pass
+        else:
+            if cached_fingerprint == fingerprint:
+                with lock:
+                    MEMO_STATS["hits"] += 1
+                return copy.copy(rv)
+
+        with lock:
+            MEMO_STATS["misses"] += 1
+        rv = fn(self, *args, **kwargs)
+        cache[repo_path, key] = (fingerprint, rv)
+        return copy.copy(rv)
+    return decorated  # type: ignore[return-value]
+
+
+def get_immutable(repo_path, key, compute, persist=True):
+    # type: (Optional[RepoPath], Tuple, Callable[[], T], bool) -> T
+    """
+    Return `compute()`, cached in memory and, unless the "persistent_cache"
+    setting is off, on disk.  Only for data addressed by commits, which
+    never changes; but since refs move, only persist if the commits are
+    given as hashes (see `is_commit_hash`).  The result must be JSON
+    serializable.
+    """
+    try:
+        return cache[repo_path, key]
+    except KeyError:
+        pass
+
+    tier = persistent_tier() if persist else None
+    if tier and repo_path:
+        try:
+            rv = tier.get(repo_path, key)
+        except KeyError:
+            pass
+        else:
+            cache[repo_path, key] = rv
+            return rv
+
+    rv = compute()
+    cache[repo_path, key] = rv
+    if tier and repo_path:
+        tier.set(repo_path, key, rv)
+    return rv
+
+
+# Only full SHA-1 or SHA-256 object names are immutable.  An abbreviated
+# hash may as well be the name of a branch or tag, e.g. "deadbee".
+COMMIT_HASH_RE = re.compile(r"(?:[0-9a-f]{40}|[0-9a-f]{64})\Z")
+
+
+def is_commit_hash(*values):
+    # type: (Optional[str]) -> bool
+    return all(value and COMMIT_HASH_RE.match(value) for value in values)
+
+
+def persistent_tier():
+    # type: () -> Optional[persistent_cache.PersistentCache]
+    if not get_global_settings().get("persistent_cache", True):
+        return None
+    return persistent_cache.get_instance()
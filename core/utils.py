@@ -16,7 +16,7 @@ import sublime
 
 MYPY = False
 if MYPY:
-    from typing import Callable, Dict, Iterator, Tuple, Type
+    from typing import Any, Callable, Dict, Iterator, Optional, Tuple, Type
 
 
 @contextmanager
@@ -223,20 +223,150 @@ def kill_proc(proc):
         proc.terminate()
 
 
-class Cache(OrderedDict):
-    def __init__(self, maxsize=128):
-        assert maxsize > 0
-        self.maxsize = maxsize
-        super().__init__()
+def estimate_size(value, _depth=0):
+    # type: (object, int) -> int
+    """
+    Roughly estimate how many bytes `value` holds, counting characters for
+    strings and walking (shallowly) into containers.
+    """
+    if isinstance(value, (str, bytes)):
+        return 49 + len(value)
+    if _depth < 4:
+        if isinstance(value, dict):
+            return sys.getsizeof(value) + sum(
+                estimate_size(k, _depth + 1) + estimate_size(v, _depth + 1)
+                for k, v in value.items()
+            )
+        if isinstance(value, (list, tuple, set, frozenset)):
+            return sys.getsizeof(value) + sum(estimate_size(v, _depth + 1) for v in value)
+    return sys.getsizeof(value)
+
+
+class RepoCache:
+    """
+    Thread-safe LRU cache with a byte budget, partitioned by repository.
 
-    def __getitem__(self, key):
-        value = super().__getitem__(key)
-        self.move_to_end(key)
-        return value
+    Items are addressed by `(repo_path, key)`.  Each repository may use at
+    most `max_bytes_per_repo`.  If all of them together use more than
+    `max_bytes`, the least recently used repositories give up their least
+    recently used entries first, so the repository one is working in keeps
+    its cache.  Entries may expire after a `ttl`.
+    """
 
-    def __setitem__(self, key, value):
-        if key in self:
-            self.move_to_end(key)
-        super().__setitem__(key, value)
-        if len(self) > self.maxsize:
-            self.popitem(last=False)
+    def __init__(self, max_bytes, max_bytes_per_repo=None):
+        # type: (int, Optional[int]) -> None
+        assert max_bytes > 0
+        self.max_bytes = max_bytes
+        self.max_bytes_per_repo = max_bytes_per_repo or max_bytes
+        # repo_path -> key -> (value, size, expires_at)
+        self._partitions = OrderedDict()  # type: OrderedDict[Any, OrderedDict[Any, Tuple[Any, int, Optional[float]]]]
+        self._partition_bytes = {}  # type: Dict[Any, int]
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "rejected": 0,
+        }
+
+    def __getitem__(self, item):
+        # type: (Tuple[Any, Any]) -> Any
+        repo_path, key = item
+        with self._lock:
+            partition = self._partitions.get(repo_path)
+            entry = partition.get(key) if partition is not None else None
+            if partition is None or entry is None:
+                self._stats["misses"] += 1
+                raise KeyError(item)
+            value, _, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                self._stats["expirations"] += 1
+                self._stats["misses"] += 1
+                self._remove(repo_path, key)
+                raise KeyError(item)
+            partition.move_to_end(key)
+            self._partitions.move_to_end(repo_path)
+            self._stats["hits"] += 1
+            return value
+
+    def __setitem__(self, item, value):
+        # type: (Tuple[Any, Any], Any) -> None
+        repo_path, key = item
+        self.set(repo_path, key, value)
+
+    def __contains__(self, item):
+        # type: (Tuple[Any, Any]) -> bool
+        repo_path, key = item
+        with self._lock:
+            return key in self._partitions.get(repo_path, {})
+
+    def __len__(self):
+        # type: () -> int
+        with self._lock:
+            return sum(len(partition) for partition in self._partitions.values())
+
+    def set(self, repo_path, key, value, ttl=None):
+        # type: (Any, Any, Any, Optional[float]) -> None
+        size = estimate_size(key) + estimate_size(value)
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._remove(repo_path, key)
+            if size > self.max_bytes_per_repo or size > self.max_bytes:
+                self._stats["rejected"] += 1
+                return
+
+            partition = self._partitions.get(repo_path)
+            if partition is None:
+                partition = self._partitions[repo_path] = OrderedDict()
+                self._partition_bytes[repo_path] = 0
+            partition[key] = (value, size, expires_at)
+            self._partitions.move_to_end(repo_path)
+            self._partition_bytes[repo_path] += size
+            self._bytes += size
+
+            while self._partition_bytes[repo_path] > self.max_bytes_per_repo:
+                self._evict_oldest(repo_path)
+            while self._bytes > self.max_bytes:
+                self._evict_oldest(next(iter(self._partitions)))
+
+    def invalidate(self, repo_path=None):
+        # type: (Any) -> None
+        with self._lock:
+            for path in ([repo_path] if repo_path is not None else list(self._partitions)):
+                for key in list(self._partitions.get(path, ())):
+                    self._remove(path, key)
+
+    def clear(self):
+        # type: () -> None
+        self.invalidate()
+
+    def stats(self):
+        # type: () -> Dict[str, int]
+        with self._lock:
+            return dict(
+                self._stats,
+                entries=sum(len(partition) for partition in self._partitions.values()),
+                bytes=self._bytes,
+                repos=len(self._partitions),
+            )
+
+    def _evict_oldest(self, repo_path):
+        # type: (Any) -> None
+        key = next(iter(self._partitions[repo_path]))
+        self._remove(repo_path, key)
+        self._stats["evictions"] += 1
+
+    def _remove(self, repo_path, key):
+        # type: (Any, Any) -> None
+        # Must be called with the lock held.
+        partition = self._partitions.get(repo_path)
+        if partition is None or key not in partition:
+            return
+        _, size, _ = partition.pop(key)
+        self._partition_bytes[repo_path] -= size
+        self._bytes -= size
+        if not partition:
+            del self._partitions[repo_path]
+            del self._partition_bytes[repo_path]
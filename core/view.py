@@ -1,15 +1,21 @@
 from collections import namedtuple
 from contextlib import contextmanager, ExitStack
+from functools import partial
+import threading
+import time
+import traceback
 
 import sublime
 
 from .runtime import text_command
+from .settings import get_global_settings
 
 
 MYPY = False
 if MYPY:
-    from typing import Callable, ContextManager, Iterator, List, NamedTuple, Optional
+    from typing import Any, Callable, ContextManager, Dict, Hashable, Iterator, List, NamedTuple, Optional, Tuple
     WrapperFn = Callable[[sublime.View], ContextManager[None]]
+    ViewUpdate = Tuple[Optional[Hashable], Callable[..., None], Tuple[Any, ...]]
 
     from .types import Row, Col
     Position = NamedTuple("Position", [("row", Row), ("col", Col), ("offset", Optional[float])])
@@ -127,9 +133,9 @@ def replace_view_content(view, text, region=None, wrappers=[]):
     _replace_region(view, text, region, wrappers)  # type: ignore[arg-type]
 
 
-@text_command
-def _replace_region(view, edit, text, region=None, wrappers=[]):
+def replace_region(view, edit, text, region=None, wrappers=[]):
     # type: (sublime.View, sublime.Edit, str, sublime.Region, List[WrapperFn]) -> None
+    """Like `replace_view_content` but within a running text command."""
     if region is None:
         # If you "replace" (or expand) directly at the cursor,
         # the cursor expands into a selection.
@@ -151,6 +157,9 @@ def _replace_region(view, edit, text, region=None, wrappers=[]):
         view.replace(edit, region, text)
 
 
+_replace_region = text_command(replace_region)
+
+
 @contextmanager
 def writable_view(view):
     # type: (sublime.View) -> Iterator[None]
@@ -192,3 +201,103 @@ def stable_viewport(view):
     finally:
         view.set_viewport_position((0, 0), animate=False)  # intentional!
         view.set_viewport_position((vx, vy), animate=False)
+
+
+# Batched view updates
+#
+# Worker threads queue their changes to a view, and we apply them on the
+# UI thread within one text command per tick.  A queued update with a
+# `key` replaces a still pending update with the same key in its place,
+# e.g. only the latest set of regions under some name gets drawn.  If
+# the updates of a view take longer than the frame budget, the rest
+# waits for the next tick so that Sublime stays responsive.
+
+DEFAULT_FRAME_BUDGET = 8  # [ms]
+_pending_updates = {}  # type: Dict[sublime.ViewId, List[ViewUpdate]]
+_pending_lock = threading.Lock()
+VIEW_UPDATE_STATS = {
+    "queued": 0,
+    "coalesced": 0,
+    "applied": 0,
+    "flushes": 0,
+    "over_budget": 0,
+}
+
+
+def queue_view_update(view, fn, *args, key=None):
+    # type: (sublime.View, Callable[..., None], Any, Optional[Hashable]) -> None
+    """Run `fn(view, edit, *args)` on the UI thread, batched per tick."""
+    vid = view.id()
+    with _pending_lock:
+        VIEW_UPDATE_STATS["queued"] += 1
+        try:
+            updates = _pending_updates[vid]
+        except KeyError:
+            updates = _pending_updates[vid] = []
+            sublime.set_timeout(partial(_flush_view_updates, vid))
+        if key is not None:
+            for i, (key_, _, _) in enumerate(updates):
+                if key_ == key:
+                    # Keep its place relative to the other updates.
+                    updates[i] = (key, fn, args)
+                    VIEW_UPDATE_STATS["coalesced"] += 1
+                    return
+        updates.append((key, fn, args))
+
+
+def queue_replace(view, text, region=None):
+    # type: (sublime.View, str, Optional[sublime.Region]) -> None
+    # Replacing the whole content supersedes a pending replacement of it.
+    key = ("content",) if region is None else None
+    queue_view_update(view, replace_region, text, region, key=key)
+
+
+def queue_regions(view, name, regions, scope="", flags=0):
+    # type: (sublime.View, str, List[sublime.Region], str, int) -> None
+    queue_view_update(view, _add_regions, name, regions, scope, flags, key=("regions", name))
+
+
+def _add_regions(view, edit, name, regions, scope, flags):
+    # type: (sublime.View, sublime.Edit, str, List[sublime.Region], str, int) -> None
+    view.add_regions(name, regions, scope=scope, flags=flags)
+
+
+def frame_budget():
+    # type: () -> float
+    return get_global_settings().get("ui_frame_budget_ms", DEFAULT_FRAME_BUDGET) / 1000
+
+
+def _flush_view_updates(vid):
+    # type: (sublime.ViewId) -> None
+    view = sublime.View(vid)
+    if not view.is_valid():
+        with _pending_lock:
+            _pending_updates.pop(vid, None)
+        return
+    _apply_view_updates(view, frame_budget())  # type: ignore[call-arg]
+
+
+@text_command
+def _apply_view_updates(view, edit, budget):
+    # type: (sublime.View, sublime.Edit, float) -> None
+    vid = view.id()
+    start = time.perf_counter()
+    while True:
+        with _pending_lock:
+            updates = _pending_updates.get(vid)
+            if not updates:
+                _pending_updates.pop(vid, None)
+                break
+            if time.perf_counter() - start > budget:
+                VIEW_UPDATE_STATS["over_budget"] += 1
+                sublime.set_timeout(partial(_flush_view_updates, vid))
+                break
+            _, fn, args = updates.pop(0)
+            VIEW_UPDATE_STATS["applied"] += 1
+        try:
+            fn(view, edit, *args)
+        except Exception:
+            traceback.print_exc()
+
+    with _pending_lock:
+        VIEW_UPDATE_STATS["flushes"] += 1
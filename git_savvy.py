@@ -32,6 +32,17 @@ def plugin_loaded():
     prepare_gitsavvy()
 
 
+def plugin_unloaded():
+    from .common import util
+    from .core import cat_file, git_watcher, persistent_cache, status_snapshot
+    from .core.commands.status_bar import on_status_snapshot
+    cat_file.shutdown_all()
+    persistent_cache.close()
+    git_watcher.remove_listener(util.view.on_repo_changed)
+    status_snapshot.remove_listener(on_status_snapshot)
+    git_watcher.stop_all()
+
+
 def reload_plugin():
     from .common import util
     print("GitSavvy: Reloading plugin after install.")
@@ -40,7 +51,11 @@ def reload_plugin():
 
 def prepare_gitsavvy():
     from .common import util
+    from .core import git_watcher, status_snapshot
+    from .core.commands.status_bar import on_status_snapshot
     sublime.set_timeout_async(util.file.determine_syntax_files)
+    git_watcher.add_listener(util.view.on_repo_changed)
+    status_snapshot.add_listener(on_status_snapshot)
 
     # Ensure all interfaces are ready.
     sublime.set_timeout_async(
@@ -0,0 +1,76 @@
+import subprocess
+
+from unittesting import DeferrableTestCase
+from GitSavvy.core import runtime
+from GitSavvy.core.runtime import (
+    CANCELLATION_STATS,
+    Cancelled,
+    CancellationToken,
+    cancel_tokens_of,
+    current_cancellation_token,
+    drop_if_cancelled,
+    supersede,
+)
+
+
+def spawn_idle_git():
+    # `cat-file --batch` waits for input forever.
+    return subprocess.Popen(
+        ["git", "cat-file", "--batch"],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.DEVNULL,
+        start_new_session=True
+    )
+
+
+class TestCancellationToken(DeferrableTestCase):
+
+    def test_cancel_kills_attached_processes(self):
+        token = CancellationToken()
+        proc = spawn_idle_git()
+        token.attach(proc)
+        killed_early = CANCELLATION_STATS["killed_early"]
+
+        token.cancel()
+        proc.wait(5)
+        self.assertIsNotNone(proc.returncode)
+        self.assertEqual(CANCELLATION_STATS["killed_early"], killed_early + 1)
+        self.assertRaises(Cancelled, token.raise_if_cancelled)
+
+    def test_attach_to_cancelled_token_kills_immediately(self):
+        token = CancellationToken()
+        token.cancel()
+        proc = spawn_idle_git()
+        token.attach(proc)
+        proc.wait(5)
+        self.assertIsNotNone(proc.returncode)
+
+    def test_newer_request_supersedes_older(self):
+        first = supersede(-1, "diff")
+        second = supersede(-1, "diff")
+        other = supersede(-1, "blame")
+        self.assertTrue(first.cancelled)
+        self.assertFalse(second.cancelled)
+
+        cancel_tokens_of(-1)
+        self.assertTrue(second.cancelled)
+        self.assertTrue(other.cancelled)
+
+    def test_forget_tokens_of_finished_work(self):
+        with supersede(-1, "diff"):
+            pass
+        self.assertNotIn((-1, "diff"), runtime._tokens)
+
+    def test_token_as_thread_default(self):
+        token = CancellationToken()
+        self.assertIsNone(current_cancellation_token())
+        with token:
+            self.assertIs(current_cancellation_token(), token)
+        self.assertIsNone(current_cancellation_token())
+
+    def test_drop_results_of_cancelled_work(self):
+        @drop_if_cancelled
+        def work():
+            raise Cancelled()
+
+        self.assertIsNone(work())
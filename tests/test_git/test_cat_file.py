@@ -0,0 +1,36 @@
+import os
+from .common import GitRepoTestCase
+from GitSavvy.core import cat_file, git_command
+from GitSavvy.core.exceptions import GitSavvyError
+
+
+class TestCatFileServer(GitRepoTestCase, git_command.GitCommand):
+
+    def tearDown(self):
+        cat_file.shutdown_all()
+
+    def test_read_file_content_at_commit(self):
+        readme = os.path.join(self.repo_path, "README.md")
+        content = self.get_file_content_at_commit(readme, "HEAD")
+        self.assertEqual(content, "README")
+
+    def test_read_object_info(self):
+        object_hash, object_type, size = self.read_object_info("HEAD:README.md")
+        self.assertEqual(object_type, "blob")
+        self.assertEqual(size, len("README"))
+        self.assertEqual(self.get_object_contents(object_hash), "README")
+
+    def test_missing_objects_fallback_to_git_show(self):
+        self.assertIsNone(self.read_object("HEAD:not-here"))
+        missing = os.path.join(self.repo_path, "not-here")
+        self.assertRaises(
+            GitSavvyError,
+            lambda: self._get_file_content_at_commit(missing, "HEAD")
+        )
+
+    def test_restarts_crashed_process(self):
+        server = self._object_server()
+        self.read_object("HEAD:README.md")
+        server.contents.proc.kill()
+        server.contents.proc.wait()
+        self.assertEqual(self.read_object("HEAD:README.md"), ("blob", b"README"))
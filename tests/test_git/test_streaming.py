@@ -0,0 +1,66 @@
+from unittesting import DeferrableTestCase
+from .common import GitRepoTestCase
+from GitSavvy.core import git_command
+from GitSavvy.core.git_command import decode_stream, split_records
+from GitSavvy.core.exceptions import GitSavvyError
+
+
+class TestStreamHelpers(DeferrableTestCase):
+
+    def test_split_records_across_chunks(self):
+        chunks = ["a\x00", "\x00\nb", "c\x00\x00", "\nd"]
+        self.assertEqual(
+            list(split_records(chunks, "\x00\x00\n")),
+            ["a", "bc", "d"]
+        )
+
+    def test_split_records_keepends(self):
+        self.assertEqual(
+            list(split_records(["a\nb", "\n"], keepends=True)),
+            ["a\n", "b\n"]
+        )
+
+    def test_decode_multibyte_chars_split_across_chunks(self):
+        encoded = "Grüße".encode("utf-8")
+        chunks = [encoded[:3], encoded[3:]]
+        self.assertEqual("".join(decode_stream(chunks, ["utf-8"])), "Grüße")
+
+    def test_decode_switches_to_fallback_encoding(self):
+        chunks = ["ä\n".encode("utf-8"), "ö\n".encode("latin-1")]
+        self.assertEqual(
+            "".join(decode_stream(chunks, ["utf-8", None, "latin-1"])),
+            "ä\nö\n"
+        )
+
+    def test_decode_replaces_as_last_resort(self):
+        self.assertEqual("".join(decode_stream([b"a\xff"], ["utf-8"])), "a�")
+
+
+class TestGitStreaming(GitRepoTestCase, git_command.GitCommand):
+
+    def test_stream_log(self):
+        entries = self.log()
+        self.assertEqual(len(entries), 1)
+        self.assertEqual(entries[0].summary, "Add README.md")
+
+    def test_stream_records(self):
+        self.assertEqual(
+            list(self.git_streaming("ls-files", "-z", separator="\x00")),
+            ["README.md"]
+        )
+
+    def test_raise_after_the_last_record(self):
+        records = self.git_streaming(
+            "log", "not-a-revision",
+            show_status_message_on_stderr=False,
+            show_panel_on_stderr=False
+        )
+        self.assertRaises(GitSavvyError, lambda: list(records))
+
+    def test_raise_on_failure_without_stderr(self):
+        records = self.git_streaming(
+            "rev-parse", "--verify", "--quiet", "not-a-revision",
+            show_status_message_on_stderr=False,
+            show_panel_on_stderr=False
+        )
+        self.assertRaises(GitSavvyError, lambda: list(records))
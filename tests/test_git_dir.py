@@ -0,0 +1,105 @@
+import os
+import shutil
+import tempfile
+
+from unittesting import DeferrableTestCase
+
+from GitSavvy.core import git_dir
+
+
+class TestFindToplevel(DeferrableTestCase):
+    def setUp(self):
+        self.tmp = os.path.realpath(tempfile.mkdtemp())
+        git_dir.invalidate()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+        git_dir.invalidate()
+
+    def make_repo(self, *parts):
+        root = os.path.join(self.tmp, *parts)
+        os.makedirs(os.path.join(root, ".git"))
+        with open(os.path.join(root, ".git", "HEAD"), "w") as f:
+            f.write("ref: refs/heads/master\n")
+        return root
+
+    def test_walks_up_to_the_git_dir(self):
+        root = self.make_repo("repo")
+        sub = os.path.join(root, "a", "b")
+        os.makedirs(sub)
+
+        self.assertEqual(git_dir.find_toplevel(sub), root)
+        self.assertEqual(git_dir.resolve_git_dir(root), os.path.join(root, ".git"))
+
+    def test_follows_gitdir_files(self):
+        self.make_repo("main")
+        worktree = os.path.join(self.tmp, "worktree")
+        os.makedirs(worktree)
+        with open(os.path.join(worktree, ".git"), "w") as f:
+            f.write("gitdir: ../main/.git/worktrees/worktree\n")
+
+        self.assertEqual(git_dir.find_toplevel(worktree), worktree)
+        self.assertEqual(
+            git_dir.resolve_git_dir(worktree),
+            os.path.join(self.tmp, "main", ".git", "worktrees", "worktree")
+        )
+
+    def test_caches_until_the_repo_is_removed(self):
+        root = self.make_repo("repo")
+        before = git_dir.stats()
+
+        git_dir.find_toplevel(root)
+        git_dir.find_toplevel(root)
+        after = git_dir.stats()
+        self.assertEqual(after["misses"] - before["misses"], 1)
+        self.assertEqual(after["hits"] - before["hits"], 1)
+
+        shutil.rmtree(os.path.join(root, ".git"))
+        self.assertIsNone(git_dir.find_toplevel(root))
+
+    def test_not_a_repo(self):
+        self.assertIsNone(git_dir.find_toplevel(self.tmp))
+
+
+class TestFingerprint(DeferrableTestCase):
+    def setUp(self):
+        self.tmp = os.path.realpath(tempfile.mkdtemp())
+        self.git_dir = os.path.join(self.tmp, ".git")
+        os.makedirs(os.path.join(self.git_dir, "refs", "heads"))
+        self.write("HEAD", "ref: refs/heads/master\n")
+        self.write("refs/heads/master", "a" * 40 + "\n")
+        self.age_tree(60)
+        git_dir.invalidate()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+        git_dir.invalidate()
+
+    def write(self, path, content):
+        with open(os.path.join(self.git_dir, *path.split("/")), "w") as f:
+            f.write(content)
+
+    def age_tree(self, seconds):
+        for root, dirs, files in os.walk(self.git_dir):
+            for path in [root] + [os.path.join(root, name) for name in files]:
+                then = os.stat(path).st_mtime - seconds
+                os.utime(path, (then, then))
+
+    def test_stable_while_nothing_changes(self):
+        self.assertIsNotNone(git_dir.fingerprint(self.tmp))
+        self.assertEqual(git_dir.fingerprint(self.tmp), git_dir.fingerprint(self.tmp))
+
+    def test_changes_with_new_refs(self):
+        before = git_dir.fingerprint(self.tmp)
+        os.makedirs(os.path.join(self.git_dir, "refs", "heads", "feature"))
+        self.write("refs/heads/feature/x", "b" * 40 + "\n")
+        self.age_tree(30)
+        self.assertNotEqual(git_dir.fingerprint(self.tmp), before)
+
+    def test_no_fingerprint_right_after_a_change(self):
+        self.write("HEAD", "ref: refs/heads/other\n")
+        self.assertIsNone(git_dir.fingerprint(self.tmp))
+
+    def test_no_fingerprint_outside_of_repos(self):
+        shutil.rmtree(self.git_dir)
+        self.assertIsNone(git_dir.fingerprint(self.tmp))
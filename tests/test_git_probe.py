@@ -0,0 +1,70 @@
+import os
+import shutil
+import stat
+import tempfile
+
+from unittesting import DeferrableTestCase
+from mockito import unstub, when
+
+from GitSavvy.core import git_probe
+
+
+class TestGitProbe(DeferrableTestCase):
+    def setUp(self):
+        if os.name == "nt":
+            self.skipTest("uses shell scripts as fake git binaries")
+        self.tmp = tempfile.mkdtemp()
+        when(git_probe).cache_file().thenReturn(os.path.join(self.tmp, "cache", "git_probe.json"))
+        git_probe._entries = None
+
+    def tearDown(self):
+        unstub()
+        git_probe._entries = None
+        git_probe._current = None
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def fake_git(self, version):
+        path = os.path.join(self.tmp, "git")
+        with open(path, "w") as f:
+            f.write("#!/bin/sh\necho 'git version {}'\n".format(version))
+        os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+        return path
+
+    def probe(self, path):
+        info = git_probe.probe(path)
+        assert info
+        return info
+
+    def test_capabilities_follow_the_version(self):
+        info = self.probe(self.fake_git("2.20.1"))
+        self.assertEqual(info.version, (2, 20, 1))
+        self.assertTrue(info.capabilities["status_porcelain_v2"])
+        self.assertFalse(info.capabilities["date_human"])
+
+    def test_persist_across_reloads(self):
+        path = self.fake_git("2.39.0")
+        git_probe.probe(path)
+
+        git_probe._entries = None  # as after a plugin reload
+        when(git_probe)._run_version(path).thenReturn(None)
+        info = self.probe(path)
+        self.assertEqual(info.version, (2, 39, 0))
+        self.assertTrue(info.capabilities["merge_tree_write_tree"])
+
+    def test_changed_binary_is_probed_again(self):
+        path = self.fake_git("2.39.0")
+        git_probe.probe(path)
+        self.fake_git("2.41.10")
+        self.assertEqual(self.probe(path).version, (2, 41, 10))
+
+    def test_mark_unsupported_is_persisted(self):
+        path = self.fake_git("2.39.0")
+        git_probe.resolve(path)
+        self.assertTrue(git_probe.supports("date_human"))
+        git_probe.mark_unsupported("date_human")
+
+        git_probe._entries = None
+        self.assertFalse(self.probe(path).capabilities["date_human"])
+
+    def test_not_runnable(self):
+        self.assertIsNone(git_probe.probe(os.path.join(self.tmp, "missing")))
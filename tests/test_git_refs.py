@@ -0,0 +1,90 @@
+import os
+import shutil
+import subprocess
+import tempfile
+
+from unittesting import DeferrableTestCase
+
+from GitSavvy.core import git_dir, git_refs
+
+
+def git(cwd, *args):
+    return subprocess.check_output(
+        ["git", "-c", "user.name=Test", "-c", "user.email=test@example.com"] + list(args),
+        cwd=cwd, universal_newlines=True
+    ).strip()
+
+
+class TestGitRefs(DeferrableTestCase):
+    def setUp(self):
+        self.tmp = os.path.realpath(tempfile.mkdtemp())
+        self.repo = os.path.join(self.tmp, "repo")
+        os.makedirs(self.repo)
+        git(self.repo, "init", "-q")
+        git(self.repo, "checkout", "-q", "-b", "master")
+        git(self.repo, "commit", "-q", "--allow-empty", "-m", "Initial")
+        git_dir.invalidate()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+        git_dir.invalidate()
+
+    def test_resolve_head_and_loose_refs(self):
+        self.assertEqual(git_refs.current_branch(self.repo), "master")
+        self.assertEqual(git_refs.head_commit(self.repo), git(self.repo, "rev-parse", "HEAD"))
+
+    def test_resolve_packed_refs(self):
+        git(self.repo, "branch", "side")
+        git(self.repo, "pack-refs", "--all")
+        self.assertFalse(os.path.exists(os.path.join(self.repo, ".git", "refs", "heads", "side")))
+        self.assertEqual(
+            git_refs.resolve_ref(self.repo, "refs/heads/side"),
+            git(self.repo, "rev-parse", "side")
+        )
+        self.assertIsNone(git_refs.resolve_ref(self.repo, "refs/heads/unknown"))
+
+    def test_detached_and_unborn_heads_are_not_branches(self):
+        git(self.repo, "checkout", "-q", "--detach")
+        self.assertIsNone(git_refs.current_branch(self.repo))
+        self.assertEqual(git_refs.head_commit(self.repo), git(self.repo, "rev-parse", "HEAD"))
+
+        git(self.repo, "checkout", "-q", "--orphan", "fresh")
+        self.assertIsNone(git_refs.current_branch(self.repo))
+
+    def test_follow_gitdir_files_of_worktrees(self):
+        worktree = os.path.join(self.tmp, "worktree")
+        git(self.repo, "worktree", "add", "-q", "-b", "feature", worktree)
+        self.assertEqual(git_refs.current_branch(worktree), "feature")
+        self.assertEqual(git_refs.current_branch(self.repo), "master")
+
+    def test_operation_state(self):
+        state = git_refs.operation_state(self.repo)
+        self.assertEqual(state, git_refs.OperationState(None, None, None, None, None))
+
+        merge_head = git(self.repo, "rev-parse", "HEAD")
+        with open(os.path.join(self.repo, ".git", "MERGE_HEAD"), "w") as f:
+            f.write(merge_head + "\n")
+        os.makedirs(os.path.join(self.repo, ".git", "rebase-merge"))
+        with open(os.path.join(self.repo, ".git", "rebase-merge", "head-name"), "w") as f:
+            f.write("refs/heads/master\n")
+
+        state = git_refs.operation_state(self.repo)
+        assert state
+        self.assertEqual(state.merge_head, merge_head)
+        self.assertEqual(state.rebase, "merge")
+        self.assertEqual(state.rebase_head_name, "master")
+
+    def test_cache_by_stat(self):
+        path = os.path.join(self.repo, ".git", "HEAD")
+        past = os.stat(path).st_mtime - 10
+        os.utime(path, (past, past))
+
+        git_refs.read_head(self.repo)
+        before = git_refs.stats()
+        self.assertEqual(git_refs.read_head(self.repo), "ref: refs/heads/master\n")
+        self.assertEqual(git_refs.stats()["hits"], before["hits"] + 1)
+
+        with open(path, "w") as f:
+            f.write("ref: refs/heads/other\n")
+        os.utime(path, (past + 1, past + 1))
+        self.assertEqual(git_refs.read_head(self.repo), "ref: refs/heads/other\n")
@@ -0,0 +1,71 @@
+import threading
+import time
+
+from unittesting import DeferrableTestCase
+from GitSavvy.core.runtime import (
+    BACKGROUND, INTERACTIVE, VISIBLE, Cancelled, GitScheduler
+)
+
+
+class TestGitScheduler(DeferrableTestCase):
+
+    def run_in_slot(self, scheduler, lane, log, name, hold=0.05, **kwargs):
+        def program():
+            try:
+                with scheduler.slot("repo", lane, **kwargs):
+                    log.append(name)
+                    time.sleep(hold)
+            except Cancelled:
+                log.append("cancelled " + name)
+        thread = threading.Thread(target=program)
+        thread.start()
+        return thread
+
+    def test_caps_concurrency_and_serves_visible_before_background(self):
+        scheduler = GitScheduler()
+        log = []
+        blocker = self.run_in_slot(scheduler, VISIBLE, log, "first", hold=0.2, max_concurrency=1)
+        time.sleep(0.05)
+        threads = [
+            self.run_in_slot(scheduler, BACKGROUND, log, "prefetch", max_concurrency=1),
+            self.run_in_slot(scheduler, VISIBLE, log, "refresh", max_concurrency=1),
+        ]
+        time.sleep(0.05)
+        self.assertEqual(scheduler.stats()["queue_depth"], 2)
+        for thread in [blocker] + threads:
+            thread.join()
+        self.assertEqual(log, ["first", "refresh", "prefetch"])
+        stats = scheduler.stats()
+        self.assertEqual(stats["max_queue_depth"], 2)
+        self.assertEqual(stats["lanes"][BACKGROUND]["waited"], 1)
+
+    def test_interactive_lane_is_never_queued(self):
+        scheduler = GitScheduler()
+        log = []
+        blocker = self.run_in_slot(scheduler, VISIBLE, log, "first", hold=0.2, max_concurrency=1)
+        time.sleep(0.05)
+        with scheduler.slot("repo", INTERACTIVE, max_concurrency=1):
+            log.append("interactive")
+        blocker.join()
+        self.assertEqual(log, ["first", "interactive"])
+
+    def test_reentering_thread_does_not_wait(self):
+        scheduler = GitScheduler()
+        with scheduler.slot("repo", VISIBLE, max_concurrency=1):
+            with scheduler.slot("repo", VISIBLE, max_concurrency=1):
+                pass
+        self.assertEqual(scheduler.stats()["running"], 0)
+
+    def test_drop_queued_work_of_closed_views(self):
+        scheduler = GitScheduler()
+        log = []
+        alive = True
+        blocker = self.run_in_slot(scheduler, VISIBLE, log, "first", hold=0.3, max_concurrency=1)
+        time.sleep(0.05)
+        waiting = self.run_in_slot(
+            scheduler, VISIBLE, log, "closed", max_concurrency=1, is_alive=lambda: alive)
+        alive = False
+        waiting.join()
+        blocker.join()
+        self.assertEqual(log, ["first", "cancelled closed"])
+        self.assertEqual(scheduler.stats()["cancelled"], 1)
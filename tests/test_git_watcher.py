@@ -0,0 +1,82 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+
+from unittesting import DeferrableTestCase
+from mockito import unstub, when
+
+from GitSavvy.core import git_dir, git_watcher
+from GitSavvy.core.git_watcher import HEAD, INDEX, REFS
+
+
+def git(cwd, *args):
+    return subprocess.check_output(
+        ["git", "-c", "user.name=Test", "-c", "user.email=test@example.com"] + list(args),
+        cwd=cwd, universal_newlines=True
+    ).strip()
+
+
+class TestInotifyWatcher(DeferrableTestCase):
+    def setUp(self):
+        if not sys.platform.startswith("linux"):
+            self.skipTest("inotify is Linux only")
+        self.start_repo()
+
+    def start_repo(self):
+        self.tmp = os.path.realpath(tempfile.mkdtemp())
+        git(self.tmp, "init", "-q")
+        git(self.tmp, "commit", "-q", "--allow-empty", "-m", "Initial")
+        git_dir.invalidate()
+
+        self.changes = set()
+        self.changed = threading.Event()
+        git_watcher.add_listener(self.on_change)
+
+    def tearDown(self):
+        git_watcher.remove_listener(self.on_change)
+        git_watcher.stop_all()
+        unstub()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+        git_dir.invalidate()
+
+    def on_change(self, repo_path, kinds):
+        if repo_path == self.tmp:
+            self.changes |= kinds
+            self.changed.set()
+
+    def wait_for(self, *kinds):
+        for _ in range(50):
+            if self.changes >= set(kinds):
+                return
+            self.changed.wait(0.1)
+            self.changed.clear()
+        self.fail("expected {}, got {}".format(set(kinds), self.changes))
+
+    def test_commit_moves_head_and_refs(self):
+        self.assertTrue(git_watcher.watch(self.tmp))
+        before = git_watcher.generation(self.tmp, {HEAD})
+        git(self.tmp, "commit", "-q", "--allow-empty", "-m", "Second")
+        self.wait_for(HEAD, REFS)
+        self.assertGreater(git_watcher.generation(self.tmp, {HEAD}), before)
+
+    def test_staging_changes_the_index(self):
+        self.assertTrue(git_watcher.watch(self.tmp))
+        with open(os.path.join(self.tmp, "foo"), "w") as f:
+            f.write("foo")
+        git(self.tmp, "add", "foo")
+        self.wait_for(INDEX)
+        self.assertNotIn(HEAD, self.changes)
+
+
+class TestPollingWatcher(TestInotifyWatcher):
+    def setUp(self):
+        when(git_watcher.Inotify).create().thenReturn(None)
+        self.start_repo()
+        git_watcher.POLL_INTERVAL = 0.1
+
+    def tearDown(self):
+        git_watcher.POLL_INTERVAL = 1.0
+        super().tearDown()
@@ -1,11 +1,15 @@
 
+import random
+import time
+
 from unittesting import DeferrableTestCase
 from GitSavvy.tests.parameterized import parameterized as p
 
 
 from GitSavvy.core.commands.log_graph import (
-    diff, simplify, normalize_tokens, apply_diff, Ins, Del, Replace, Flush
+    diff, simplify, normalize_tokens, apply_diff, Ins, Del, Replace, Flush, LOOK_AHEAD
 )
+from GitSavvy.core.line_offsets import LineOffsets
 
 
 def _(string):
@@ -103,3 +107,134 @@ class TestGraphDiff(DeferrableTestCase):
         B = _(B)
         ops = tx(ops)
         self.assertEqual(apply_diff(A, normalize_tokens(simplify(diff(A, B), 100))), B)
+
+
+def commit(hash, message="", decoration=""):
+    return "● {}{} {}\n".format(hash, " (" + decoration + ")" if decoration else "", message)
+
+
+COMMITS = [commit("{:07x}".format(0xa000000 + n), "Commit {}".format(n)) for n in range(8)]
+
+
+class TestGraphDiffByCommitHash(DeferrableTestCase):
+    @p.expand([
+        (
+            "commit moved down",
+            COMMITS,
+            COMMITS[1:4] + COMMITS[:1] + COMMITS[4:],
+            [Del(0, 1), Ins(3, COMMITS[0])],
+        ),
+        (
+            "commit moved up",
+            COMMITS,
+            COMMITS[5:6] + COMMITS[:5] + COMMITS[6:],
+            [Ins(0, COMMITS[5]), Del(6, 7)],
+        ),
+        (
+            "decoration changed",
+            COMMITS,
+            [commit("a000000", "Commit 0", "HEAD -> master")] + COMMITS[1:],
+            [Ins(0, commit("a000000", "Commit 0", "HEAD -> master")), Del(1, 2)],
+        ),
+        (
+            "rewritten commits",
+            COMMITS,
+            [commit("b000000", "Commit 0"), commit("b000001", "Commit 1")] + COMMITS[2:],
+            [Ins(0, commit("b000000", "Commit 0")), Ins(1, commit("b000001", "Commit 1")), Del(2, 4)],
+        ),
+    ])
+    def test_minimal_edits(self, _, A, B, ops):
+        self.assertEqual(list(filter_same(diff(A, B))), ops)
+        self.assertEqual(apply_diff(A, normalize_tokens(simplify(diff(A, B), 100))), B)
+
+    def test_stream_while_reading(self):
+        read = []  # type: list
+
+        def next_graph():
+            for line in [commit("b000000", "New")] + COMMITS * 100:
+                read.append(line)
+                yield line
+
+        first = next(diff(COMMITS, next_graph()))
+        self.assertEqual(first, Ins(0, commit("b000000", "New")))
+        self.assertLessEqual(len(read), LOOK_AHEAD + 1)
+
+
+def graph_lines(n, prefix="a"):
+    return ["* {} {:06} {}\n".format(prefix, i, "message" * (i % 7)) for i in range(n)]
+
+
+def legacy_apply_tokens(lines, tokens):
+    """What `apply_token` did before `LineOffsets`, for comparison."""
+    regions = []
+    for token in tokens:
+        start = sum(len(line) for line in lines[:token.start])
+        end = sum(len(line) for line in lines[token.start:token.end]) + start
+        regions.append((start, end))
+        lines = apply_diff(lines, [token])
+    return regions
+
+
+def apply_tokens(lines, tokens):
+    offsets = LineOffsets(lines)
+    regions = []
+    for token in tokens:
+        regions.append((offsets.offset(token.start), offsets.offset(token.end)))
+        offsets.splice(token.start, token.end, token.text)
+    return regions
+
+
+def every_nth_line_changed(lines, step):
+    rv = lines[:]
+    for i in range(0, len(rv), step):
+        rv[i] = "* b" + rv[i][3:]
+    return rv
+
+
+class TestLineOffsets(DeferrableTestCase):
+    @p.expand([(1,), (3,), (512,)])
+    def test_offsets_follow_random_splices(self, block_size):
+        rnd = random.Random(block_size)
+        lines = graph_lines(200)
+        offsets = LineOffsets(lines, block_size=block_size)
+        for _ in range(500):
+            start = rnd.randint(0, len(lines))
+            end = rnd.randint(start, min(len(lines), start + 30))
+            new = graph_lines(rnd.randint(0, 30), prefix="x")
+            lines[start:end] = new
+            offsets.splice(start, end, new)
+
+            self.assertEqual(len(offsets), len(lines))
+            idx = rnd.randint(0, len(lines))
+            self.assertEqual(offsets.offset(idx), sum(map(len, lines[:idx])))
+        self.assertEqual(list(offsets), lines)
+
+    def test_splice_everything(self):
+        offsets = LineOffsets(graph_lines(2000), block_size=16)
+        offsets.splice(0, 2000, [])
+        self.assertEqual(list(offsets), [])
+        self.assertEqual(offsets.offset(0), 0)
+        offsets.splice(0, 0, ["a\n", "b\n"])
+        self.assertEqual(list(offsets), ["a\n", "b\n"])
+        self.assertEqual(offsets.offset(1), 2)
+
+    @p.expand([(5000,), (20000,), (50000,)])
+    def test_apply_tokens_like_the_legacy_implementation(self, n):
+        current = graph_lines(n)
+        next_ = every_nth_line_changed(current, 50)
+        tokens = list(normalize_tokens(simplify(diff(current, next_), max_size=100)))
+
+        start = time.perf_counter()
+        regions = apply_tokens(current, tokens)
+        elapsed = time.perf_counter() - start
+        if n <= 20000:
+            start = time.perf_counter()
+            expected = legacy_apply_tokens(current, tokens)
+            legacy_elapsed = "{:.4f}s".format(time.perf_counter() - start)
+            self.assertEqual(regions, expected)
+        else:
+            legacy_elapsed = "skipped"
+
+        self.assertEqual(apply_diff(current, tokens), next_)
+        print("\n{} lines, {} tokens: {:.4f}s, legacy {}".format(
+            n, len(tokens), elapsed, legacy_elapsed))
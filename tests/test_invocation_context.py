@@ -0,0 +1,32 @@
+from unittesting import DeferrableTestCase
+from GitSavvy.core import settings
+from GitSavvy.core.git_command import get_invocation_context
+
+
+class FakeSettings(dict):
+    def get(self, key, default=None):
+        return super().get(key, default)
+
+
+class TestInvocationContext(DeferrableTestCase):
+
+    def test_include_global_flags(self):
+        context = get_invocation_context(FakeSettings(
+            global_flags={"status": ["--no-renames"]},
+            global_pre_flags={"status": ["-c", "core.quotepath=off"]},
+        ), -1, "/flags")
+        self.assertEqual(
+            context.include_global_flags(("status", "-z")),
+            ["-c", "core.quotepath=off", "status", "--no-renames", "-z"]
+        )
+        self.assertEqual(context.include_global_flags(("log",)), ["log"])
+
+    def test_reuse_context_until_settings_change(self):
+        first = get_invocation_context(FakeSettings(env={"A": "1"}), -1, "/repo")
+        self.assertIs(first, get_invocation_context(FakeSettings(), -1, "/repo"))
+        self.assertEqual(first.environ["A"], "1")
+
+        settings.get_global_settings()._on_update()
+        second = get_invocation_context(FakeSettings(), -1, "/repo")
+        self.assertIsNot(first, second)
+        self.assertNotIn("A", second.environ)
@@ -0,0 +1,51 @@
+import io
+import time
+
+from unittesting import DeferrableTestCase
+from GitSavvy.common.util.log import PanelAppender
+from GitSavvy.core.git_command import LoggingProcessWrapper
+
+
+class FakeProcess:
+    def __init__(self, stdout, stderr=b""):
+        self.stdin = None
+        self.stdout = io.BytesIO(stdout)
+        self.stderr = io.BytesIO(stderr)
+
+    def wait(self):
+        pass
+
+
+class TestLiveOutputThroughput(DeferrableTestCase):
+
+    def test_batches_a_100k_line_producer(self):
+        lines = 100000
+        stdout = b"".join(
+            "remote: Counting objects: {}\n".format(n).encode() for n in range(lines)
+        )
+        messages = []
+        appender = PanelAppender(sink=messages.append)
+        wrapper = LoggingProcessWrapper(FakeProcess(stdout, b"done\n"), 10000, appender)
+
+        start = time.perf_counter()
+        out, err = wrapper.communicate(None)
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(out, stdout)
+        self.assertEqual(err, b"done\n")
+        panel_output = "".join(messages)
+        self.assertEqual(len(panel_output), len(stdout) + len("done\n"))
+        self.assertLess(appender.flushes, lines / 100)
+        print("\n{} lines in {:.3f}s with {} panel appends".format(
+            lines, elapsed, appender.flushes))
+
+    def test_flush_writes_pending_output_in_order(self):
+        messages = []
+        appender = PanelAppender(interval=10000, sink=messages.append)
+        for n in range(10):
+            appender.append("{}\n".format(n))
+        appender.flush()
+        appender.flush()
+        # The first line is shown right away, the rest is batched.
+        self.assertEqual("".join(messages), "".join("{}\n".format(n) for n in range(10)))
+        self.assertLessEqual(len(messages), 2)
@@ -0,0 +1,97 @@
+from unittesting import DeferrableTestCase
+from GitSavvy.tests.parameterized import parameterized as p
+
+from GitSavvy.core.git_mixins import status
+from GitSavvy.core.parse_status import BranchStatus, FileStatus, parse_status
+
+
+V1_OUTPUT = "\x00".join([
+    "## feature...origin/feature [ahead 2, behind 1]",
+    " M b c.txt",
+    "R  renamed.txt",
+    "a.txt",
+    "AM s.txt",
+    "UU conflict.txt",
+    "?? new.txt",
+    "",
+])
+
+V2_OUTPUT = "\x00".join([
+    "# branch.oid 3f6fc21d2e0c7ad7a5c8e2d1d8e9f7f1c3b1a2b4",
+    "# branch.head feature",
+    "# branch.upstream origin/feature",
+    "# branch.ab +2 -1",
+    "# stash 3",
+    "1 .M N... 100644 100644 100644 e69de29 e69de29 b c.txt",
+    "2 R. N... 100644 100644 100644 e69de29 e69de29 R100 renamed.txt",
+    "a.txt",
+    "1 AM N... 000000 100644 100644 0000000 e69de29 s.txt",
+    "u UU N... 100644 100644 100644 100644 e69de29 e69de29 e69de29 conflict.txt",
+    "? new.txt",
+    "",
+])
+
+EXPECTED_FILES = [
+    FileStatus("b c.txt", None, " ", "M"),
+    FileStatus("renamed.txt", "a.txt", "R", None),
+    FileStatus("s.txt", None, "A", "M"),
+    FileStatus("conflict.txt", None, "U", "U"),
+    FileStatus("new.txt", None, "?", "?"),
+]
+
+
+class TestParseStatus(DeferrableTestCase):
+    @p.expand([("v1", V1_OUTPUT), ("v2", V2_OUTPUT)])
+    def test_files_and_branch(self, _, output):
+        actual = parse_status(output.rstrip("\x00").split("\x00"))
+        self.assertEqual(actual.files, EXPECTED_FILES)
+        self.assertEqual(
+            actual.branch_status,
+            BranchStatus(False, "feature", "origin/feature", False, "2", "1", False)
+        )
+
+    def test_stash_count(self):
+        self.assertEqual(parse_status(V2_OUTPUT.split("\x00")).stash_count, 3)
+        self.assertIsNone(parse_status(V1_OUTPUT.split("\x00")).stash_count)
+
+    @p.expand([
+        (
+            ["# branch.oid (initial)", "# branch.head master"],
+            BranchStatus(False, "master", None, True, None, None, False)
+        ),
+        (
+            ["# branch.oid 3f6fc21", "# branch.head (detached)", "? foo"],
+            BranchStatus(True, None, None, False, None, None, False)
+        ),
+        (
+            ["# branch.oid 3f6fc21", "# branch.head dev", "# branch.upstream origin/dev"],
+            BranchStatus(False, "dev", "origin/dev", True, None, None, True)
+        ),
+        (
+            ["# branch.oid 3f6fc21", "# branch.head dev", "# branch.upstream origin/dev",
+             "# branch.ab +0 -7"],
+            BranchStatus(False, "dev", "origin/dev", True, None, "7", False)
+        ),
+    ])
+    def test_v2_branch_headers(self, records, expected):
+        self.assertEqual(parse_status(records).branch_status, expected)
+
+    def test_parse_a_stream(self):
+        records = iter(V2_OUTPUT.split("\x00"))
+        self.assertEqual(parse_status(records).files, EXPECTED_FILES)
+
+
+class TestUntrackedScanHint(DeferrableTestCase):
+    def tearDown(self):
+        status._status_timings.pop("/repo", None)
+
+    def test_untracked_scan_dominates(self):
+        status.record_status_timing("/repo", True, 2.0)
+        self.assertFalse(status.untracked_scan_dominates("/repo"))
+        status.record_status_timing("/repo", False, 0.1)
+        self.assertTrue(status.untracked_scan_dominates("/repo"))
+
+    def test_fast_status_needs_no_tuning(self):
+        status.record_status_timing("/repo", True, 0.2)
+        status.record_status_timing("/repo", False, 0.01)
+        self.assertFalse(status.untracked_scan_dominates("/repo"))
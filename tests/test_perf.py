@@ -0,0 +1,31 @@
+from unittesting import DeferrableTestCase
+from GitSavvy.common.util import perf
+
+
+class TestLatencyHistogram(DeferrableTestCase):
+
+    def test_percentiles_are_bucket_bounds(self):
+        histogram = perf.LatencyHistogram()
+        for _ in range(90):
+            histogram.add(0.003, bytes_out=10)
+        for _ in range(10):
+            histogram.add(0.5)
+
+        summary = histogram.summary()
+        self.assertEqual(summary["count"], 100)
+        self.assertEqual(summary["p50"], 0.004)
+        self.assertEqual(summary["p95"], 0.5)
+        self.assertEqual(summary["max"], 0.5)
+        self.assertEqual(summary["bytes_out"], 900)
+
+    def test_record_per_subcommand_and_repo(self):
+        perf.reset()
+        perf.record_git("status", "/repo", 0.01, 100)
+        perf.record_git("status", "/other", 0.02, 100)
+        perf.record_git("log", "/repo", 0.1)
+
+        by_subcommand, by_repo = perf.git_latencies()
+        self.assertEqual(by_subcommand["status"]["count"], 2)
+        self.assertEqual(by_subcommand["status"]["bytes_out"], 200)
+        self.assertEqual(by_repo["/repo"]["count"], 2)
+        self.assertIn("status", "\n".join(perf.format_table("", by_subcommand)))
@@ -0,0 +1,78 @@
+import os
+import shutil
+import tempfile
+
+from unittesting import DeferrableTestCase
+
+from GitSavvy.core import git_dir, persistent_cache
+from GitSavvy.core.persistent_cache import PersistentCache
+
+
+class TestPersistentCache(DeferrableTestCase):
+    def setUp(self):
+        if not persistent_cache.AVAILABLE:
+            self.skipTest("sqlite3 is not available")
+        self.tmp = os.path.realpath(tempfile.mkdtemp())
+        self.db = os.path.join(self.tmp, "cache", "objects.sqlite")
+        self.repo = self.make_repo("repo")
+        git_dir.invalidate()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+        git_dir.invalidate()
+
+    def make_repo(self, name):
+        root = os.path.join(self.tmp, name)
+        os.makedirs(os.path.join(root, ".git"))
+        with open(os.path.join(root, ".git", "HEAD"), "w") as f:
+            f.write("ref: refs/heads/master\n")
+        return root
+
+    def test_survive_reopening(self):
+        cache = PersistentCache(self.db)
+        cache.set(self.repo, ("read_commit", "abcdef1", None), "commit abcdef1\n")
+        cache.set(self.repo, ("previous_commit", "abcdef1"), None)
+        cache.close()
+
+        cache = PersistentCache(self.db)
+        self.assertEqual(cache.get(self.repo, ("read_commit", "abcdef1", None)), "commit abcdef1\n")
+        self.assertIsNone(cache.get(self.repo, ("previous_commit", "abcdef1")))
+        self.assertRaises(KeyError, lambda: cache.get(self.repo, ("read_commit", "1234567", None)))
+        self.assertEqual(cache.stats["hits"], 2)
+        cache.close()
+
+    def test_partition_by_repository(self):
+        other = self.make_repo("other")
+        cache = PersistentCache(self.db)
+        cache.set(self.repo, ("key",), "value")
+        self.assertRaises(KeyError, lambda: cache.get(other, ("key",)))
+        # Not a repository at all.
+        cache.set(self.tmp, ("key",), "value")
+        self.assertRaises(KeyError, lambda: cache.get(self.tmp, ("key",)))
+        cache.close()
+
+    def test_values_are_compressed(self):
+        cache = PersistentCache(self.db)
+        cache.set(self.repo, ("key",), "x" * 100000)
+        self.assertLess(cache.size(), 1000)
+        cache.close()
+
+    def test_prune_least_recently_used(self):
+        cache = PersistentCache(self.db, max_bytes=1)
+        cache.set(self.repo, ("old",), "value")
+        cache.set(self.repo, ("new",), "value")
+        cache._prune()
+        self.assertRaises(KeyError, lambda: cache.get(self.repo, ("old",)))
+        self.assertGreater(cache.stats["pruned"], 0)
+        cache.close()
+
+
+class TestIsCommitHash(DeferrableTestCase):
+    def test_only_full_object_names_are_commit_hashes(self):
+        from GitSavvy.core import store
+        self.assertTrue(store.is_commit_hash("a" * 40))
+        self.assertTrue(store.is_commit_hash("a" * 64))
+        self.assertFalse(store.is_commit_hash("deadbee"))
+        self.assertFalse(store.is_commit_hash("a" * 41))
+        self.assertFalse(store.is_commit_hash("a" * 40 + "\n"))
+        self.assertFalse(store.is_commit_hash("a" * 40, None))
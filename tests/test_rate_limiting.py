@@ -0,0 +1,59 @@
+import sublime
+
+from unittesting import DeferrableTestCase
+from mockito import unstub, when
+
+from GitSavvy.core import runtime
+from GitSavvy.core.runtime import debounce, latest_only, throttle
+
+
+class TestRateLimiting(DeferrableTestCase):
+    def setUp(self):
+        self.timers = []  # type: list
+        when(sublime).set_timeout(...).thenAnswer(
+            lambda fn, delay=0: self.timers.append(fn)
+        )
+
+    def tearDown(self):
+        unstub()
+
+    def fire_timers(self):
+        while self.timers:
+            self.timers.pop(0)()
+
+    def test_latest_only_is_keyed(self):
+        log = []  # type: list
+        first = latest_only(("panel", 1), log.append, "first")
+        second = latest_only(("panel", 1), log.append, "second")
+        other_window = latest_only(("panel", 2), log.append, "other window")
+        first()
+        second()
+        other_window()
+        self.assertEqual(log, ["second", "other window"])
+        self.assertNotIn(("panel", 1), runtime.LATEST)
+        self.assertNotIn(("panel", 2), runtime.LATEST)
+
+    def test_debounce(self):
+        log = []  # type: list
+        for n in range(3):
+            debounce("key", 0.1, log.append, n)
+        self.fire_timers()
+        self.assertEqual(log, [2])
+
+    def test_throttle_runs_first_and_last_call(self):
+        log = []  # type: list
+        for n in range(5):
+            throttle("key", 0.1, log.append, n)
+        self.assertEqual(log, [0])
+        self.fire_timers()
+        self.assertEqual(log, [0, 4])
+        self.assertNotIn("key", runtime.THROTTLED)
+
+    def test_throttle_is_keyed(self):
+        log = []  # type: list
+        throttle(("status_bar", 1), 0.1, log.append, 1)
+        throttle(("status_bar", 2), 0.1, log.append, 2)
+        self.assertEqual(log, [1, 2])
+        self.fire_timers()
+        self.assertNotIn(("status_bar", 1), runtime.THROTTLED)
+        self.assertNotIn(("status_bar", 2), runtime.THROTTLED)
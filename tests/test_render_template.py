@@ -0,0 +1,175 @@
+from collections import OrderedDict
+import re
+import time
+
+from unittesting import DeferrableTestCase
+from GitSavvy.tests.mockito import mock, unstub, when
+from GitSavvy.tests.parameterized import parameterized as p
+
+from GitSavvy.common import ui
+from GitSavvy.core.interfaces.branch import BranchInterface
+from GitSavvy.core.interfaces.rebase import RebaseInterface
+from GitSavvy.core.interfaces.status import StatusInterface
+from GitSavvy.core.interfaces.tags import TagsInterface
+
+
+LINES = 20000
+
+
+def legacy_render_template(interface):
+    """The regex based `_render_template` we used before, for comparison."""
+    regions = {}  # type: dict
+
+    def adjust(idx, orig_len, new_len):
+        shift = new_len - orig_len
+        for region in regions.values():
+            if region[0] > idx:
+                region[0] += shift
+                region[1] += shift
+            elif region[1] > idx or region[0] == idx:
+                region[1] += shift
+
+    keyed_content = OrderedDict(
+        (key, render_fn())
+        for key, render_fn in interface.partials.items()
+    )
+    for key in list(keyed_content):
+        output = keyed_content[key]
+        if isinstance(output, tuple):
+            sub_template, complex_partials = output
+            keyed_content[key] = sub_template
+            for render_fn in complex_partials:
+                keyed_content[render_fn.key] = render_fn()
+
+    rendered = interface.template
+    for key, new_content in keyed_content.items():
+        new_content_len = len(new_content)
+        pattern = re.compile(r"\{(<+ )?" + key + r"\}")
+        match = pattern.search(rendered)
+        while match:
+            start, end = match.span()
+            backspace_group = match.groups()[0]
+            backspaces = backspace_group.count("<") if backspace_group else 0
+            start -= backspaces
+            rendered = rendered[:start] + new_content + rendered[end:]
+            adjust(start, end - start, new_content_len)
+            if new_content_len:
+                regions[key] = [start, start + new_content_len]
+            match = pattern.search(rendered)
+
+    return rendered, regions
+
+
+def lines(prefix):
+    return "\n".join("    {} {:05}".format(prefix, n) for n in range(LINES))
+
+
+def remote_lists(prefix, remotes):
+    def render_remote(key):
+        output = "\n  REMOTE ({}):\n{}".format(key, lines(prefix))
+
+        @ui.partial(key)
+        def render():
+            return output
+        return render
+
+    keys = [prefix + "_list_" + remote for remote in remotes]
+    return (
+        "\n" + "".join("{" + key + "}\n" for key in keys),
+        [render_remote(key) for key in keys]
+    )
+
+
+CONTENT = {
+    StatusInterface: {
+        "branch_status": "On branch `master` tracking `origin/master`.",
+        "git_root": "~/GitSavvy",
+        "head": "3f6fc21 Watch git directories",
+        "unstaged_files": "  UNSTAGED:\n" + lines("M"),
+        "untracked_files": "  UNTRACKED:\n" + lines("?"),
+        "staged_files": "  STAGED:\n" + lines("A"),
+        "merge_conflicts": "",
+        "conflicts_bindings": "",
+        "no_status_message": "",
+        "stashes": "  STASHES:\n    (0) WIP on master",
+        "help": "\n  [?] toggle this help menu\n",
+    },
+    BranchInterface: {
+        "branch_status": "On branch `master`.",
+        "git_root": "~/GitSavvy",
+        "head": "3f6fc21 Watch git directories",
+        "branch_list": lines("branch"),
+        "remotes": remote_lists("branch", ["origin", "upstream"]),
+        "help": "\n  [?] toggle this help menu\n",
+    },
+    TagsInterface: {
+        "branch_status": "On branch `master`.",
+        "repo_root": "~/GitSavvy",
+        "head": "3f6fc21 Watch git directories",
+        "local_tags": lines("tag"),
+        "remote_tags": remote_lists("remote_tags", ["origin"]),
+        "help": "",
+    },
+    RebaseInterface: {
+        "active_branch": "feature",
+        "base_ref": "master",
+        "base_commit": "3f6fc21",
+        "preserve_merges": "",
+        "status": "Ready.",
+        "diverged_commits": lines("commit"),
+        "super_key": "CTRL",
+        "conflicts_bindings": "",
+        "help": "\n  [?] toggle this help menu\n",
+    },
+}
+
+
+class TestRenderTemplate(DeferrableTestCase):
+    def setUp(self):
+        self.view = mock()
+        when(self.view).id().thenReturn(-1)
+        when(self.view).settings().thenReturn(mock())
+
+    def tearDown(self):
+        ui.interfaces.pop(self.view.id(), None)
+        unstub()
+
+    def create_interface(self, cls):
+        interface = cls(view=self.view)
+        content = CONTENT[cls]
+        self.assertEqual(interface.partials.keys(), content.keys())
+        interface.partials = {
+            key: (lambda output=output: output)
+            for key, output in content.items()
+        }
+        return interface
+
+    @p.expand([
+        (StatusInterface,),
+        (BranchInterface,),
+        (TagsInterface,),
+        (RebaseInterface,),
+    ])
+    def test_render_like_the_legacy_implementation(self, cls):
+        interface = self.create_interface(cls)
+
+        start = time.perf_counter()
+        expected, expected_regions = legacy_render_template(interface)
+        legacy_elapsed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        rendered = interface._render_template()
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(rendered, expected)
+        self.assertEqual(interface.regions, expected_regions)
+        print("\n{}: {} chars in {:.4f}s, legacy {:.4f}s".format(
+            cls.__name__, len(rendered), elapsed, legacy_elapsed))
+
+    def test_keep_unknown_placeholders(self):
+        segments = ui.compile_template("a\n{< known} {unknown}\n", frozenset(["known"]))
+        self.assertEqual(segments, (
+            (None, "a"),
+            ("known", ""),
+            (None, " {unknown}\n"),
+        ))
@@ -0,0 +1,60 @@
+import time
+
+from unittesting import DeferrableTestCase
+from GitSavvy.core.utils import RepoCache, estimate_size
+
+
+class TestRepoCache(DeferrableTestCase):
+
+    def test_evict_by_bytes_not_by_count(self):
+        cache = RepoCache(max_bytes=100000)
+        for n in range(100):
+            cache["repo", ("small", n)] = "x"
+        self.assertEqual(len(cache), 100)
+
+        cache["repo", "huge"] = "x" * 90000
+        self.assertIn(("repo", "huge"), cache)
+        self.assertLessEqual(cache.stats()["bytes"], 100000)
+        self.assertGreater(cache.stats()["evictions"], 0)
+        # The oldest entries go first.
+        self.assertNotIn(("repo", ("small", 0)), cache)
+
+    def test_reject_values_larger_than_the_budget(self):
+        cache = RepoCache(max_bytes=1000)
+        cache["repo", "huge"] = "x" * 2000
+        self.assertNotIn(("repo", "huge"), cache)
+        self.assertEqual(cache.stats()["rejected"], 1)
+
+    def test_least_recently_used_repo_gives_up_entries_first(self):
+        size = estimate_size("a") + estimate_size("x" * 1000)
+        cache = RepoCache(max_bytes=size * 4, max_bytes_per_repo=size * 3)
+        cache["old", "a"] = "x" * 1000
+        cache["old", "b"] = "x" * 1000
+        cache["current", "a"] = "x" * 1000
+        cache["current", "b"] = "x" * 1000
+        cache["current", "c"] = "x" * 1000
+
+        self.assertNotIn(("old", "a"), cache)
+        self.assertIn(("old", "b"), cache)
+        self.assertEqual(cache.stats()["repos"], 2)
+
+        # A single repository cannot take the whole budget.
+        cache["current", "d"] = "x" * 1000
+        self.assertNotIn(("current", "a"), cache)
+        self.assertIn(("old", "b"), cache)
+
+    def test_ttl(self):
+        cache = RepoCache(max_bytes=1000)
+        cache.set("repo", "key", "value", ttl=0.01)
+        self.assertEqual(cache["repo", "key"], "value")
+        time.sleep(0.02)
+        self.assertRaises(KeyError, lambda: cache["repo", "key"])
+        self.assertEqual(cache.stats()["expirations"], 1)
+
+    def test_invalidate_a_repo(self):
+        cache = RepoCache(max_bytes=1000)
+        cache["a", "key"] = "value"
+        cache["b", "key"] = "value"
+        cache.invalidate("a")
+        self.assertNotIn(("a", "key"), cache)
+        self.assertIn(("b", "key"), cache)
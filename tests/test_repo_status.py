@@ -96,6 +96,7 @@ class TestShortBranchStatus(DeferrableTestCase):
         git = GitCommand()
         when(git).in_rebase().thenReturn(False)
         when(git).in_merge().thenReturn(False)
+        when(git).get_latest_commit_msg_for_head().thenReturn("3f6fc21 Initial commit")
 
         when(git).git("status", ...).thenReturn(status_lines)
 
@@ -231,6 +232,7 @@ class TestLongBranchStatus(DeferrableTestCase):
         git = GitCommand()
         when(git).in_rebase().thenReturn(False)
         when(git).in_merge().thenReturn(False)
+        when(git).get_latest_commit_msg_for_head().thenReturn("3f6fc21 Initial commit")
 
         when(git).git("status", ...).thenReturn(status_lines)
 
@@ -0,0 +1,54 @@
+import threading
+import time
+
+from unittesting import DeferrableTestCase
+
+from GitSavvy.core.git_command import current_barrier, raise_barrier
+from GitSavvy.core.runtime import SingleFlight
+
+
+class TestSingleFlight(DeferrableTestCase):
+    def test_concurrent_calls_share_one_execution(self):
+        single_flight = SingleFlight()
+        calls = []
+        results = []
+
+        def fn():
+            calls.append(1)
+            time.sleep(0.05)
+            return "result"
+
+        threads = [
+            threading.Thread(target=lambda: results.append(single_flight.run("key", fn)))
+            for _ in range(5)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ["result"] * 5)
+        self.assertEqual(single_flight.stats()["coalesced"], 4)
+
+    def test_sequential_calls_run_again(self):
+        single_flight = SingleFlight()
+        self.assertEqual(single_flight.run("key", lambda: 1), 1)
+        self.assertEqual(single_flight.run("key", lambda: 2), 2)
+        self.assertEqual(single_flight.stats()["executions"], 2)
+
+    def test_reraises_exception_for_every_caller(self):
+        single_flight = SingleFlight()
+
+        def fn():
+            1 / 0
+
+        self.assertRaises(ZeroDivisionError, lambda: single_flight.run("key", fn))
+        self.assertEqual(single_flight.stats()["in_flight"], 0)
+
+
+class TestBarrier(DeferrableTestCase):
+    def test_raise_barrier_changes_the_flight_key(self):
+        before = current_barrier()
+        raise_barrier()
+        self.assertNotEqual(current_barrier(), before)
@@ -0,0 +1,98 @@
+import re
+
+from unittesting import DeferrableTestCase
+from GitSavvy.tests.mockito import mock, unstub, when
+
+from GitSavvy.common import ui
+from GitSavvy.core.interfaces.status import (
+    EXTRACT_FILENAME_RE,
+    Directory,
+    StatusInterface,
+    roll_up,
+    segment_regions,
+)
+from GitSavvy.core.parse_status import FileStatus
+
+
+class TestStatusSegments(DeferrableTestCase):
+    def setUp(self):
+        self.view = mock()
+        when(self.view).id().thenReturn(-1)
+        when(self.view).settings().thenReturn(mock())
+        self.interface = StatusInterface(view=self.view)
+
+    def tearDown(self):
+        ui.interfaces.pop(self.view.id(), None)
+        unstub()
+
+    def set_state(self, **state):
+        self.interface.state.update(state)
+
+    def test_segments_render_like_the_template(self):
+        self.set_state(
+            branch_status="On branch `master`.",
+            git_root="~/GitSavvy",
+            head="3f6fc21 Watch git directories",
+            unstaged_files=[FileStatus("core/view.py", None, " ", "M")],
+            untracked_files=[FileStatus("new.txt", None, "?", "?")],
+        )
+        segments = self.interface._render_segments()
+        rendered = self.interface._render_template()
+
+        self.assertEqual("".join(text for _, text in segments), rendered)
+        self.assertEqual(segment_regions(segments), self.interface.regions)
+
+    def test_only_the_changed_partial_differs(self):
+        self.set_state(unstaged_files=[FileStatus("core/view.py", None, " ", "M")])
+        before = self.interface._render_segments()
+        self.set_state(head="3f6fc21 Watch git directories")
+        after = self.interface._render_segments()
+
+        changed = [key for (key, old), (_, new) in zip(before, after) if old != new]
+        self.assertEqual(changed, ["head"])
+
+    def test_roll_up_above_the_threshold(self):
+        self.set_state(
+            rollup_threshold=2,
+            untracked_files=untracked("build/1.o", "build/2.o", "build/3.o"),
+        )
+        self.assertIn("    build/ (3 files)\n", self.interface.render_untracked_files())
+
+        self.set_state(expanded_directories=frozenset(["build/"]))
+        self.assertIn("    build/3.o\n", self.interface.render_untracked_files())
+
+    def test_list_all_files_below_the_threshold(self):
+        self.set_state(
+            rollup_threshold=5,
+            untracked_files=untracked("build/1.o", "build/2.o", "build/3.o"),
+        )
+        self.assertNotIn("files)", self.interface.render_untracked_files())
+
+
+def untracked(*paths):
+    return [FileStatus(path, None, "?", "?") for path in paths]
+
+
+class TestRollUp(DeferrableTestCase):
+    FILES = untracked("a.txt", "build/x/1.o", "build/x/2.o", "build/y.o", "core/view.py", "z.txt")
+
+    def test_roll_up_into_directories(self):
+        self.assertEqual(roll_up(self.FILES, frozenset()), [
+            FileStatus("a.txt", None, "?", "?"),
+            Directory("build/", 3),
+            FileStatus("core/view.py", None, "?", "?"),
+            FileStatus("z.txt", None, "?", "?"),
+        ])
+
+    def test_expand_directories(self):
+        self.assertEqual(roll_up(self.FILES, frozenset(["build/"])), [
+            FileStatus("a.txt", None, "?", "?"),
+            Directory("build/x/", 2),
+            FileStatus("build/y.o", None, "?", "?"),
+            FileStatus("core/view.py", None, "?", "?"),
+            FileStatus("z.txt", None, "?", "?"),
+        ])
+
+    def test_extract_filename_skips_directories(self):
+        self.assertIsNone(re.match(EXTRACT_FILENAME_RE, "    build/ (12,340 files)"))
+        self.assertEqual(re.findall(EXTRACT_FILENAME_RE, "    build/y.o"), ["build/y.o"])
@@ -0,0 +1,102 @@
+from unittesting import DeferrableTestCase
+from GitSavvy.tests.mockito import mock, unstub, verify, when
+
+from GitSavvy.core import git_dir, git_watcher, status_snapshot
+from GitSavvy.core.parse_status import BranchStatus, WorkingDirStatus
+
+
+REPO = "/repo"
+STATUS = WorkingDirStatus(
+    BranchStatus(False, "master", None, True, None, None, False), [], None
+)
+
+
+class TestStatusSnapshot(DeferrableTestCase):
+    def setUp(self):
+        self.git = mock()
+        when(self.git)._repo_path_or_none().thenReturn(REPO)
+        when(self.git).get_working_dir_status(...).thenReturn(STATUS)
+        when(self.git).in_merge().thenReturn(False)
+        when(self.git).in_rebase().thenReturn(False)
+        when(self.git).get_latest_commit_msg_for_head().thenReturn("3f6fc21 Initial commit")
+        when(git_dir).fingerprint(REPO).thenReturn(("fingerprint",))
+        when(git_watcher).generation(REPO).thenReturn(0)
+
+    def tearDown(self):
+        status_snapshot._snapshots.pop(REPO, None)
+        status_snapshot._generations.pop(REPO, None)
+        unstub()
+
+    def test_reuse_snapshot_while_the_repo_does_not_change(self):
+        first = status_snapshot.get(self.git)
+        second = status_snapshot.get(self.git)
+        self.assertIs(first, second)
+        self.assertEqual(first.head, "3f6fc21 Initial commit")
+        verify(self.git, times=1).get_working_dir_status(True)
+
+    def test_snapshot_with_untracked_files_serves_both(self):
+        status_snapshot.get(self.git)
+        status_snapshot.get(self.git, untracked=False)
+        verify(self.git, times=1).get_working_dir_status(...)
+
+    def test_snapshot_without_untracked_files_does_not_serve_all(self):
+        status_snapshot.get(self.git, untracked=False)
+        status_snapshot.get(self.git)
+        verify(self.git, times=1).get_working_dir_status(False)
+        verify(self.git, times=1).get_working_dir_status(True)
+
+    def test_refresh_after_invalidate(self):
+        status_snapshot.get(self.git)
+        status_snapshot.invalidate(REPO)
+        status_snapshot.get(self.git)
+        verify(self.git, times=2).get_working_dir_status(True)
+
+    def test_fresh_always_refreshes(self):
+        status_snapshot.get(self.git)
+        status_snapshot.get(self.git, fresh=True)
+        status_snapshot.get(self.git)
+        verify(self.git, times=2).get_working_dir_status(True)
+
+    def test_refresh_if_the_watcher_reports_a_change(self):
+        status_snapshot.get(self.git)
+        when(git_watcher).generation(REPO).thenReturn(1)
+        status_snapshot.get(self.git)
+        verify(self.git, times=2).get_working_dir_status(True)
+
+    def test_do_not_keep_snapshots_of_racy_repositories(self):
+        when(git_dir).fingerprint(REPO).thenReturn(None)
+        status_snapshot.get(self.git)
+        status_snapshot.get(self.git)
+        verify(self.git, times=2).get_working_dir_status(True)
+        self.assertNotIn(REPO, status_snapshot._snapshots)
+
+    def test_read_only_commands_keep_the_snapshot(self):
+        status_snapshot.get(self.git)
+        for args in (
+            ["log", "--oneline"],
+            ["stash", "list"],
+            ["config", "--get", "user.name"],
+        ):
+            status_snapshot.invalidate_after(REPO, args)
+        status_snapshot.get(self.git)
+        verify(self.git, times=1).get_working_dir_status(True)
+
+    def test_writing_commands_invalidate_the_snapshot(self):
+        status_snapshot.get(self.git)
+        status_snapshot.invalidate_after(REPO, ["add", "--", "a.txt"])
+        status_snapshot.get(self.git)
+        verify(self.git, times=2).get_working_dir_status(True)
+
+    def test_listeners_receive_new_snapshots(self):
+        received = []  # type: list
+
+        def listener(repo_path, snapshot):
+            received.append((repo_path, snapshot))
+
+        status_snapshot.add_listener(listener)
+        try:
+            snapshot = status_snapshot.get(self.git)
+            status_snapshot.get(self.git)
+        finally:
+            status_snapshot.remove_listener(listener)
+        self.assertEqual(received, [(REPO, snapshot)])
@@ -0,0 +1,93 @@
+import threading
+import time
+
+from unittesting import DeferrableTestCase
+from GitSavvy.core.runtime import BACKGROUND, INTERACTIVE, VISIBLE, TaskScheduler
+
+
+class TestTaskScheduler(DeferrableTestCase):
+
+    def block(self, scheduler):
+        started, release = threading.Event(), threading.Event()
+
+        def program():
+            started.set()
+            release.wait(1)
+
+        scheduler.submit(program)
+        started.wait(1)
+        return release
+
+    def drain(self, scheduler):
+        done = threading.Event()
+        scheduler.submit(done.set, queue=BACKGROUND)
+        self.assertTrue(done.wait(1))
+
+    def test_serve_interactive_before_background(self):
+        scheduler = TaskScheduler(max_workers=1)
+        log = []
+        release = self.block(scheduler)
+        scheduler.submit(lambda: log.append("prefetch"), queue=BACKGROUND)
+        scheduler.submit(lambda: log.append("refresh"), queue=VISIBLE)
+        scheduler.submit(lambda: log.append("key press"), queue=INTERACTIVE)
+        release.set()
+        self.drain(scheduler)
+        self.assertEqual(log, ["key press", "refresh", "prefetch"])
+
+    def test_coalesce_queued_tasks_by_key(self):
+        scheduler = TaskScheduler(max_workers=1)
+        log = []
+        release = self.block(scheduler)
+        for n in range(3):
+            scheduler.submit(lambda n=n: log.append(n), key="refresh")
+        release.set()
+        self.drain(scheduler)
+        self.assertEqual(log, [2])
+        self.assertEqual(scheduler.stats()["queues"][VISIBLE]["coalesced"], 2)
+
+    def test_drop_tasks_past_their_deadline(self):
+        scheduler = TaskScheduler(max_workers=1)
+        log = []
+        release = self.block(scheduler)
+        scheduler.submit(lambda: log.append("late"), deadline=0.01)
+        time.sleep(0.02)
+        release.set()
+        self.drain(scheduler)
+        self.assertEqual(log, [])
+        self.assertEqual(scheduler.stats()["queues"][VISIBLE]["dropped"], 1)
+
+    def test_bound_the_number_of_workers(self):
+        scheduler = TaskScheduler(max_workers=2)
+        releases = [self.block(scheduler) for _ in range(2)]
+        scheduler.submit(lambda: None)
+        stats = scheduler.stats()
+        self.assertEqual(stats["workers"], 2)
+        self.assertEqual(stats["queues"][VISIBLE]["queued"], 1)
+        for release in releases:
+            release.set()
+        self.drain(scheduler)
+
+    def test_blocking_tasks_do_not_wait_for_a_busy_pool(self):
+        scheduler = TaskScheduler(max_workers=1)
+        release = self.block(scheduler)
+        done = threading.Event()
+        scheduler.submit(done.set, blocking=True)
+        self.assertTrue(done.wait(1))
+        release.set()
+        self.drain(scheduler)
+        # The extra worker retires once it runs out of work.
+        time.sleep(0.05)
+        self.assertEqual(scheduler.stats()["workers"], 1)
+
+    def test_reject_unknown_queues(self):
+        scheduler = TaskScheduler(max_workers=1)
+        self.assertRaises(ValueError, lambda: scheduler.submit(lambda: None, queue="urgent"))
+
+    def test_survive_failing_tasks(self):
+        def program():
+            raise RuntimeError("boom")
+
+        scheduler = TaskScheduler(max_workers=1)
+        scheduler.submit(program)
+        self.drain(scheduler)
+        self.assertEqual(scheduler.stats()["queues"][VISIBLE]["failed"], 1)
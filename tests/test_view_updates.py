@@ -0,0 +1,66 @@
+import sublime
+
+from unittesting import DeferrableTestCase
+from mockito import mock, unstub, when
+
+from GitSavvy.core import view as view_module
+from GitSavvy.core.view import queue_regions, queue_replace, queue_view_update
+
+
+class TestQueueViewUpdates(DeferrableTestCase):
+    def setUp(self):
+        self.timers = []  # type: list
+        when(sublime).set_timeout(...).thenAnswer(
+            lambda fn, delay=0: self.timers.append(fn)
+        )
+        self.view = mock({"id": lambda: -1})
+        self.stats = dict(view_module.VIEW_UPDATE_STATS)
+
+    def tearDown(self):
+        unstub()
+        view_module._pending_updates.pop(self.view.id(), None)
+
+    def pending(self):
+        return [key for key, _, _ in view_module._pending_updates[self.view.id()]]
+
+    def test_flush_once_per_tick(self):
+        queue_replace(self.view, "foo", sublime.Region(0, 1))
+        queue_replace(self.view, "bar", sublime.Region(1, 2))
+        self.assertEqual(len(self.timers), 1)
+        self.assertEqual(len(self.pending()), 2)
+
+    def test_latest_update_per_key_wins(self):
+        queue_regions(self.view, "dots", [sublime.Region(0, 1)])
+        queue_replace(self.view, "foo")
+        queue_regions(self.view, "dots", [sublime.Region(1, 2)])
+        queue_replace(self.view, "bar")
+        self.assertEqual(self.pending(), [("regions", "dots"), ("content",)])
+        self.assertEqual(
+            view_module.VIEW_UPDATE_STATS["coalesced"] - self.stats["coalesced"], 2)
+
+    def test_coalesced_update_keeps_its_place(self):
+        queue_regions(self.view, "dots", [sublime.Region(0, 1)])
+        queue_replace(self.view, "foo", sublime.Region(0, 1))
+        queue_regions(self.view, "dots", [sublime.Region(1, 2)])
+        self.assertEqual(self.pending(), [("regions", "dots"), None])
+        _, _, args = view_module._pending_updates[self.view.id()][0]
+        self.assertEqual(args[1], [sublime.Region(1, 2)])
+
+
+class TestApplyViewUpdates(DeferrableTestCase):
+    def setUp(self):
+        self.view = sublime.active_window().new_file()
+        self.view.set_scratch(True)
+
+    def tearDown(self):
+        self.view.close()
+
+    def test_apply_in_order(self):
+        log = []  # type: list
+        queue_replace(self.view, "foo bar")
+        queue_regions(self.view, "bar", [sublime.Region(4, 7)])
+        queue_view_update(self.view, lambda view, edit: log.append(view.substr(view.get_regions("bar")[0])))
+
+        yield lambda: log
+        self.assertEqual(log, ["bar"])
+        self.assertEqual(self.view.substr(sublime.Region(0, self.view.size())), "foo bar")